@@ -33,6 +33,9 @@ from chaoslib.types import (
 
 from chaosazure.auth import auth
 from chaosazure.common.config import load_configuration, load_secrets
+from chaosazure.common.plan import planned
+from chaosazure.common.session import reused
+from chaosazure.common.transport import transport_options
 
 
 __all__ = [
@@ -66,6 +69,7 @@ def discover(discover_system: bool = True) -> Discovery:
     return discovery
 
 
+@reused
 def init_compute_management_client(
     experiment_secrets: Secrets, experiment_configuration: Configuration
 ) -> ComputeManagementClient:
@@ -85,11 +89,13 @@ def init_compute_management_client(
                 "subscription_id", os.getenv("AZURE_SUBSCRIPTION_ID")
             ),
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
-        return client
+        return planned(client, experiment_configuration)
 
 
+@reused
 def init_containerservice_management_client(
     experiment_secrets: Secrets, experiment_configuration: Configuration
 ) -> ContainerServiceClient:
@@ -109,11 +115,13 @@ def init_containerservice_management_client(
                 "subscription_id", os.getenv("AZURE_SUBSCRIPTION_ID")
             ),
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
-        return client
+        return planned(client, experiment_configuration)
 
 
+@reused
 def init_postgresql_flexible_management_client(
     experiment_secrets: Secrets, experiment_configuration: Configuration
 ) -> PostgreSQLFlexibleManagementClient:
@@ -133,11 +141,13 @@ def init_postgresql_flexible_management_client(
                 "subscription_id", os.getenv("AZURE_SUBSCRIPTION_ID")
             ),
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
-        return client
+        return planned(client, experiment_configuration)
 
 
+@reused
 def init_postgresql_management_client(
     experiment_secrets: Secrets, experiment_configuration: Configuration
 ) -> PostgreSQLManagementClient:
@@ -157,11 +167,13 @@ def init_postgresql_management_client(
                 "subscription_id", os.getenv("AZURE_SUBSCRIPTION_ID")
             ),
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
-        return client
+        return planned(client, experiment_configuration)
 
 
+@reused
 def init_network_management_client(
     experiment_secrets: Secrets, experiment_configuration: Configuration
 ) -> NetworkManagementClient:
@@ -181,11 +193,13 @@ def init_network_management_client(
                 "subscription_id", os.getenv("AZURE_SUBSCRIPTION_ID")
             ),
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
-        return client
+        return planned(client, experiment_configuration)
 
 
+@reused
 def init_website_management_client(
     experiment_secrets: Secrets, experiment_configuration: Configuration
 ) -> WebSiteManagementClient:
@@ -205,13 +219,16 @@ def init_website_management_client(
                 "subscription_id", os.getenv("AZURE_SUBSCRIPTION_ID")
             ),
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
-        return client
+        return planned(client, experiment_configuration)
 
 
+@reused
 def init_resource_graph_client(
     experiment_secrets: Secrets,
+    experiment_configuration: Configuration = None,
 ) -> ResourceGraphClient:
     """
     Initializes Resource Graph client.
@@ -224,11 +241,13 @@ def init_resource_graph_client(
             credential=authentication,
             credential_scopes=scopes,
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
         return client
 
 
+@reused
 def init_netapp_management_client(
     experiment_secrets: Secrets, experiment_configuration: Configuration
 ) -> NetAppManagementClient:
@@ -247,11 +266,13 @@ def init_netapp_management_client(
                 "subscription_id", os.getenv("fi")
             ),
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
-        return client
+        return planned(client, experiment_configuration)
 
 
+@reused
 def init_storage_management_client(
     experiment_secrets: Secrets, experiment_configuration: Configuration
 ) -> StorageManagementClient:
@@ -270,9 +291,10 @@ def init_storage_management_client(
                 "subscription_id", os.getenv("AZURE_SUBSCRIPTION_ID")
             ),
             base_url=base_url,
+            **transport_options(experiment_configuration),
         )
 
-        return client
+        return planned(client, experiment_configuration)
 
 
 ###############################################################################
@@ -288,6 +310,7 @@ def __load_exported_activities() -> List[DiscoveredActivities]:
     activities.extend(discover_actions("chaosazure.aks.actions"))
     activities.extend(discover_probes("chaosazure.aks.probes"))
     activities.extend(discover_actions("chaosazure.vmss.actions"))
+    activities.extend(discover_probes("chaosazure.vmss.probes"))
     activities.extend(discover_actions("chaosazure.webapp.actions"))
     activities.extend(discover_probes("chaosazure.webapp.probes"))
     activities.extend(
@@ -304,6 +327,9 @@ def __load_exported_activities() -> List[DiscoveredActivities]:
     activities.extend(discover_probes("chaosazure.netapp.probes"))
     activities.extend(discover_actions("chaosazure.storage.actions"))
     activities.extend(discover_probes("chaosazure.storage.probes"))
+    activities.extend(discover_probes("chaosazure.inventory.probes"))
+    activities.extend(discover_actions("chaosazure.rollback.actions"))
+    activities.extend(discover_probes("chaosazure.watch.probes"))
     return activities
 
 
@@ -1,18 +1,24 @@
 import logging
 import random
+from typing import Any, Dict
 
 from chaoslib.exceptions import FailedActivity
 from chaoslib.types import Configuration, Secrets
 
-from chaosazure import init_containerservice_management_client
-from chaosazure.aks.constants import RES_TYPE_AKS
-from chaosazure.common import cleanse
-from chaosazure.machine.actions import (
-    delete_machines,
-    stop_machines,
-    restart_machines,
+from chaosazure import (
+    init_compute_management_client,
+    init_containerservice_management_client,
 )
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.aks.constants import NODES_QUERY, POOL_TAG, RES_TYPE_AKS
+from chaosazure.common import cleanse
+from chaosazure.common.plan import scoped
+from chaosazure.common.resources.graph import fetch_resources, query_resources
+from chaosazure.common.resources.query import Query, quote
+from chaosazure.common.schedule import Schedule
+from chaosazure.common.selection import select
+from chaosazure.common.submission import retry_budget, submit
+from chaosazure.vmss import batch
+from chaosazure.vmss.constants import RES_TYPE_VMSS, RES_TYPE_VMSS_VM
 from chaosazure.vmss.records import Records
 
 __all__ = [
@@ -22,18 +28,28 @@ __all__ = [
     "start_managed_clusters",
     "delete_managed_clusters",
     "stop_managed_clusters",
+    "delete_agent_pool_nodes",
+    "stop_agent_pool_nodes",
+    "restart_agent_pool_nodes",
+    "start_agent_pool_nodes",
 ]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def delete_node(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Delete a node at random from a managed Azure Kubernetes Service.
 
+    The nodes are the VMSS instances backing the node pools of a cluster
+    picked at random. They are resolved with a single Resource Graph query
+    and the nodes of a same scale set are targeted with a single request.
+
     **Be aware**: Deleting a node is an invasive action. You will not be able
     to recover the node once you deleted it.
 
@@ -44,6 +60,11 @@ def delete_node(
         the subscription will be selected as potential chaos candidates.
         Filtering example:
         'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    schedule : dict, optional
+        Spread the requests, one per scale set of the nodes, over time rather
+        than sending them all at once, for instance one every ten seconds:
+        {"strategy": "rate", "per_second": 0.1}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Start delete_node: configuration='{}', filter='{}'".format(
@@ -51,18 +72,24 @@ def delete_node(
         )
     )
 
-    query = node_resource_group_query(filter, configuration, secrets)
-    return delete_machines(query, configuration, secrets)
+    nodes = __fetch_cluster_nodes(filter, configuration, secrets)
+    return __apply_to_nodes(nodes, "delete", configuration, secrets, schedule)
 
 
+@scoped
 def stop_node(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Stop a node at random from a managed Azure Kubernetes Service.
 
+    The nodes are the VMSS instances backing the node pools of a cluster
+    picked at random. They are resolved with a single Resource Graph query
+    and the nodes of a same scale set are targeted with a single request.
+
     Parameters
     ----------
     filter : str
@@ -70,6 +97,11 @@ def stop_node(
         the subscription will be selected as potential chaos candidates.
         Filtering example:
         'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    schedule : dict, optional
+        Spread the requests, one per scale set of the nodes, over time rather
+        than sending them all at once, for instance one every ten seconds:
+        {"strategy": "rate", "per_second": 0.1}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Start stop_node: configuration='{}', filter='{}'".format(
@@ -77,18 +109,24 @@ def stop_node(
         )
     )
 
-    query = node_resource_group_query(filter, configuration, secrets)
-    return stop_machines(query, configuration, secrets)
+    nodes = __fetch_cluster_nodes(filter, configuration, secrets)
+    return __apply_to_nodes(nodes, "stop", configuration, secrets, schedule)
 
 
+@scoped
 def restart_node(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Restart a node at random from a managed Azure Kubernetes Service.
 
+    The nodes are the VMSS instances backing the node pools of a cluster
+    picked at random. They are resolved with a single Resource Graph query
+    and the nodes of a same scale set are targeted with a single request.
+
     Parameters
     ----------
     filter : str
@@ -96,6 +134,11 @@ def restart_node(
         the subscription will be selected as potential chaos candidates.
         Filtering example:
         'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    schedule : dict, optional
+        Spread the requests, one per scale set of the nodes, over time rather
+        than sending them all at once, for instance one every ten seconds:
+        {"strategy": "rate", "per_second": 0.1}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Start restart_node: configuration='{}', filter='{}'".format(
@@ -103,14 +146,19 @@ def restart_node(
         )
     )
 
-    query = node_resource_group_query(filter, configuration, secrets)
-    return restart_machines(query, configuration, secrets)
+    nodes = __fetch_cluster_nodes(filter, configuration, secrets)
+    return __apply_to_nodes(nodes, "restart", configuration, secrets, schedule)
 
 
+@scoped
 def stop_managed_clusters(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Stop managed cluster at random.
@@ -120,6 +168,20 @@ def stop_managed_clusters(
     filter : str, optional
         Filter the managed cluster. If the filter is omitted all managed cluster in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of managed clusters to pick at random among the matching ones,
+        sampled by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching managed clusters to pick at random, rounded
+        up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` managed clusters
+        reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -136,29 +198,39 @@ def stop_managed_clusters(
     Stop two managed clusters at random from the group 'rg'
     """
     logger.debug(
-        "Start stop_managed_cluster: " "configuration='{}', filter='{}'".format(
+        "Start stop_managed_cluster: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    managed_clusters = __fetch_managed_clusters(filter, configuration, secrets)
+    managed_clusters = __fetch_managed_clusters(
+        filter, configuration, secrets, count, percentage, seed
+    )
     client = __containerservice_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     managed_clusters_records = Records()
-    for c in managed_clusters:
+    for c in Schedule(schedule, configuration).paced(managed_clusters):
         group = c["resourceGroup"]
         name = c["name"]
         logger.debug("Stopping managed cluster: {}".format(name))
         logger.debug(c)
-        client.managed_clusters.begin_stop(group, name)
+        c["retries"] = submit(
+            client.managed_clusters.begin_stop, group, name, deadline=deadline
+        ).retries
         managed_clusters_records.add(cleanse.managed_cluster(c))
 
     return managed_clusters_records.output_as_dict("resources")
 
 
+@scoped
 def start_managed_clusters(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Start managed cluster at random.
@@ -168,6 +240,20 @@ def start_managed_clusters(
     filter : str, optional
         Filter the managed cluster. If the filter is omitted all managed cluster in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of managed clusters to pick at random among the matching ones,
+        sampled by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching managed clusters to pick at random, rounded
+        up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` managed clusters
+        reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -189,23 +275,33 @@ def start_managed_clusters(
         )
     )
 
-    managed_clusters = __fetch_managed_clusters(filter, configuration, secrets)
+    managed_clusters = __fetch_managed_clusters(
+        filter, configuration, secrets, count, percentage, seed
+    )
     client = __containerservice_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     managed_clusters_records = Records()
-    for c in managed_clusters:
+    for c in Schedule(schedule, configuration).paced(managed_clusters):
         group = c["resourceGroup"]
         name = c["name"]
         logger.debug("Starting managed cluster: {}".format(name))
-        client.managed_clusters.begin_start(group, name)
+        c["retries"] = submit(
+            client.managed_clusters.begin_start, group, name, deadline=deadline
+        ).retries
         managed_clusters_records.add(cleanse.managed_cluster(c))
 
     return managed_clusters_records.output_as_dict("resources")
 
 
+@scoped
 def delete_managed_clusters(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Delete a managed cluster at random from a managed Azure Kubernetes Service.
@@ -218,6 +314,20 @@ def delete_managed_clusters(
     filter : str, optional
         Filter the managed cluster. If the filter is omitted all managed cluster in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of managed clusters to pick at random among the matching ones,
+        sampled by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching managed clusters to pick at random, rounded
+        up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` managed clusters
+        reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -239,38 +349,441 @@ def delete_managed_clusters(
         )
     )
 
-    managed_clusters = __fetch_managed_clusters(filter, configuration, secrets)
+    managed_clusters = __fetch_managed_clusters(
+        filter, configuration, secrets, count, percentage, seed
+    )
     client = __containerservice_mgmt_client(secrets, configuration)
-    managed_clusters_records = Records()
-    for c in managed_clusters:
+    deadline = retry_budget(configuration)
+    managed_clusters_records = Records("delete")
+    for c in Schedule(schedule, configuration).paced(managed_clusters):
         group = c["resourceGroup"]
         name = c["name"]
         logger.debug("Deleting managed cluster: {}".format(name))
-        client.managed_clusters.begin_delete(group, name)
+        c["retries"] = submit(
+            client.managed_clusters.begin_delete, group, name, deadline=deadline
+        ).retries
         managed_clusters_records.add(cleanse.managed_cluster(c))
 
     return managed_clusters_records.output_as_dict("resources")
 
 
+@scoped
+def delete_agent_pool_nodes(
+    filter: str = None,
+    pool_name: str = None,
+    count: int = None,
+    percentage: float = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    schedule: Dict[str, Any] = None,
+):
+    """
+    Delete a count or a percentage of the nodes of the agent pools of the
+    filtered managed Azure Kubernetes Services.
+
+    **Be aware**: Deleting a node is an invasive action. You will not be able
+    to recover the node once you deleted it.
+
+    The nodes of each agent pool are targeted with a single batched request
+    on the scale set backing the pool.
+
+    Parameters
+    ----------
+    filter : str, optional
+        Filter the managed AKS. If the filter is omitted all AKS in
+        the subscription will be selected as potential chaos candidates.
+    pool_name : str, optional
+        Name of the agent pool to target. If omitted all the agent pools of
+        the clusters will be targeted.
+    count : int, optional
+        Number of nodes to pick at random in each agent pool.
+    percentage : float, optional
+        Percentage of the nodes to pick at random in each agent pool, rounded
+        up. If neither a count nor a percentage is given, all the nodes of
+        the agent pools are targeted.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
+
+    Examples
+    --------
+    >>> delete_agent_pool_nodes("where name=='aks'", "user", percentage=30)
+    Delete 30% of the nodes of the 'user' agent pool of the 'aks' cluster
+    """
+    logger.debug(
+        "Start delete_agent_pool_nodes: configuration='{}', filter='{}',"
+        " pool_name='{}', count='{}', percentage='{}'".format(
+            configuration, filter, pool_name, count, percentage
+        )
+    )
+
+    return __apply_to_agent_pools(
+        filter,
+        pool_name,
+        count,
+        percentage,
+        "delete",
+        configuration,
+        secrets,
+        schedule,
+    )
+
+
+@scoped
+def stop_agent_pool_nodes(
+    filter: str = None,
+    pool_name: str = None,
+    count: int = None,
+    percentage: float = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    schedule: Dict[str, Any] = None,
+):
+    """
+    Stop a count or a percentage of the nodes of the agent pools of the
+    filtered managed Azure Kubernetes Services.
+
+    The nodes of each agent pool are targeted with a single batched request
+    on the scale set backing the pool.
+
+    Parameters
+    ----------
+    filter : str, optional
+        Filter the managed AKS. If the filter is omitted all AKS in
+        the subscription will be selected as potential chaos candidates.
+    pool_name : str, optional
+        Name of the agent pool to target. If omitted all the agent pools of
+        the clusters will be targeted.
+    count : int, optional
+        Number of nodes to pick at random in each agent pool.
+    percentage : float, optional
+        Percentage of the nodes to pick at random in each agent pool, rounded
+        up. If neither a count nor a percentage is given, all the nodes of
+        the agent pools are targeted.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
+
+    Examples
+    --------
+    >>> stop_agent_pool_nodes("where name=='aks'", "user", percentage=30)
+    Stop 30% of the nodes of the 'user' agent pool of the 'aks' cluster
+    """
+    logger.debug(
+        "Start stop_agent_pool_nodes: configuration='{}', filter='{}',"
+        " pool_name='{}', count='{}', percentage='{}'".format(
+            configuration, filter, pool_name, count, percentage
+        )
+    )
+
+    return __apply_to_agent_pools(
+        filter,
+        pool_name,
+        count,
+        percentage,
+        "stop",
+        configuration,
+        secrets,
+        schedule,
+    )
+
+
+@scoped
+def restart_agent_pool_nodes(
+    filter: str = None,
+    pool_name: str = None,
+    count: int = None,
+    percentage: float = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    schedule: Dict[str, Any] = None,
+):
+    """
+    Restart a count or a percentage of the nodes of the agent pools of the
+    filtered managed Azure Kubernetes Services.
+
+    The nodes of each agent pool are targeted with a single batched request
+    on the scale set backing the pool.
+
+    Parameters
+    ----------
+    filter : str, optional
+        Filter the managed AKS. If the filter is omitted all AKS in
+        the subscription will be selected as potential chaos candidates.
+    pool_name : str, optional
+        Name of the agent pool to target. If omitted all the agent pools of
+        the clusters will be targeted.
+    count : int, optional
+        Number of nodes to pick at random in each agent pool.
+    percentage : float, optional
+        Percentage of the nodes to pick at random in each agent pool, rounded
+        up. If neither a count nor a percentage is given, all the nodes of
+        the agent pools are targeted.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
+
+    Examples
+    --------
+    >>> restart_agent_pool_nodes("where name=='aks'", "user", percentage=30)
+    Restart 30% of the nodes of the 'user' agent pool of the 'aks' cluster
+    """
+    logger.debug(
+        "Start restart_agent_pool_nodes: configuration='{}', filter='{}',"
+        " pool_name='{}', count='{}', percentage='{}'".format(
+            configuration, filter, pool_name, count, percentage
+        )
+    )
+
+    return __apply_to_agent_pools(
+        filter,
+        pool_name,
+        count,
+        percentage,
+        "restart",
+        configuration,
+        secrets,
+        schedule,
+    )
+
+
+@scoped
+def start_agent_pool_nodes(
+    filter: str = None,
+    pool_name: str = None,
+    count: int = None,
+    percentage: float = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    schedule: Dict[str, Any] = None,
+):
+    """
+    Start a count or a percentage of the nodes of the agent pools of the
+    filtered managed Azure Kubernetes Services.
+
+    The nodes of each agent pool are targeted with a single batched request
+    on the scale set backing the pool.
+
+    Parameters
+    ----------
+    filter : str, optional
+        Filter the managed AKS. If the filter is omitted all AKS in
+        the subscription will be selected as potential chaos candidates.
+    pool_name : str, optional
+        Name of the agent pool to target. If omitted all the agent pools of
+        the clusters will be targeted.
+    count : int, optional
+        Number of nodes to pick at random in each agent pool.
+    percentage : float, optional
+        Percentage of the nodes to pick at random in each agent pool, rounded
+        up. If neither a count nor a percentage is given, all the nodes of
+        the agent pools are targeted.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
+
+    Examples
+    --------
+    >>> start_agent_pool_nodes("where name=='aks'", "user", percentage=30)
+    Start 30% of the nodes of the 'user' agent pool of the 'aks' cluster
+    """
+    logger.debug(
+        "Start start_agent_pool_nodes: configuration='{}', filter='{}',"
+        " pool_name='{}', count='{}', percentage='{}'".format(
+            configuration, filter, pool_name, count, percentage
+        )
+    )
+
+    return __apply_to_agent_pools(
+        filter,
+        pool_name,
+        count,
+        percentage,
+        "start",
+        configuration,
+        secrets,
+        schedule,
+    )
+
+
 ###############################################################################
 # Private helper functions
 ###############################################################################
 
 
-def node_resource_group_query(query, configuration, secrets):
-    aks = fetch_resources(query, RES_TYPE_AKS, secrets, configuration)
-    if not aks:
+def __apply_to_agent_pools(
+    filter,
+    pool_name,
+    count,
+    percentage,
+    operation,
+    configuration,
+    secrets,
+    schedule=None,
+):
+    if count is not None and count <= 0:
+        raise FailedActivity("Cannot target {} nodes".format(count))
+    if percentage is not None and not 0 < percentage <= 100:
+        raise FailedActivity(
+            "Percentage must be within ]0, 100], got {}".format(percentage)
+        )
+
+    query = __nodes_query(filter)
+    if pool_name:
+        query = "{}\n| where pool =~ {}".format(query, quote(pool_name))
+    nodes = query_resources(query, secrets, configuration)
+    if not nodes:
+        logger.warning("No AKS agent pool nodes found")
+        raise FailedActivity("No AKS agent pool nodes found")
+
+    pools = {}
+    for node in nodes:
+        if not node["pool"]:
+            logger.warning(
+                "Skipping node {} whose scale set {} has no '{}' tag".format(
+                    node["name"], node["scale_set"], POOL_TAG
+                )
+            )
+            continue
+        key = (node["clusterResourceGroup"], node["cluster"], node["pool"])
+        pools.setdefault(key, []).append(node)
+    if not pools:
+        raise FailedActivity("No AKS agent pool of the nodes found")
+
+    aks_client = __containerservice_mgmt_client(secrets, configuration)
+    compute_client = init_compute_management_client(secrets, configuration)
+    pool_records = Records(operation)
+    pacing = Schedule(schedule, configuration)
+    deadline = retry_budget(configuration)
+    for (group, cluster, pool), pool_nodes in pools.items():
+        agent_pool = aks_client.agent_pools.get(group, cluster, pool)
+        targets = pool_nodes
+        if count is not None or percentage is not None:
+            targets = select(
+                pool_nodes, "random", count=count, percentage=percentage
+            )
+
+        batches = batch.group_instances(targets).items()
+        for (node_group, scale_set), instances in pacing.paced(batches):
+            logger.debug(
+                "Applying '{}' to nodes of agent pool {}/{}: {}".format(
+                    operation, cluster, pool, [n["name"] for n in instances]
+                )
+            )
+            submit(
+                batch.begin_batch,
+                compute_client,
+                operation,
+                node_group,
+                scale_set,
+                [n["instance_id"] for n in instances],
+                deadline=deadline,
+            )
+
+        pool_records.add(
+            {
+                "cluster": cluster,
+                "resourceGroup": group,
+                "pool": pool,
+                "mode": agent_pool.mode,
+                "vmSize": agent_pool.vm_size,
+                "count": agent_pool.count,
+                "zones": agent_pool.availability_zones,
+                "nodes": [
+                    {
+                        "name": n["name"],
+                        "resourceGroup": n["resourceGroup"],
+                        "scale_set": n["scale_set"],
+                        "instance_id": n["instance_id"],
+                        "zones": n.get("zones"),
+                    }
+                    for n in targets
+                ],
+            }
+        )
+
+    return pool_records.output_as_dict("resources")
+
+
+def __nodes_query(filter) -> str:
+    clusters = Query(RES_TYPE_AKS).filter(filter)
+    return NODES_QUERY.format(
+        clusters=clusters,
+        node_type=RES_TYPE_VMSS_VM,
+        scale_set_type=RES_TYPE_VMSS,
+        pool_tag=POOL_TAG,
+    )
+
+
+def __fetch_cluster_nodes(filter, configuration, secrets) -> []:
+    query = __nodes_query(filter)
+    nodes = query_resources(query, secrets, configuration)
+    if not nodes:
         logger.warning("No AKS clusters found")
         raise FailedActivity("No AKS clusters found")
-    else:
-        logger.debug("Found AKS clusters: {}".format([x["name"] for x in aks]))
-    choice = random.choice(aks)
-    node_resource_group = choice["properties"]["nodeResourceGroup"]
-    return "where resourceGroup =~ '{}'".format(node_resource_group)
 
+    clusters = {}
+    for node in nodes:
+        key = (node["clusterResourceGroup"], node["cluster"])
+        clusters.setdefault(key, []).append(node)
+    logger.debug("Found AKS clusters: {}".format([c for _, c in clusters]))
+
+    choice = random.choice(list(clusters))
+    return clusters[choice]
 
-def __fetch_managed_clusters(filter, configuration, secrets) -> []:
-    clusters = fetch_resources(filter, RES_TYPE_AKS, secrets, configuration)
+
+def __apply_to_nodes(nodes, operation, configuration, secrets, schedule=None):
+    client = init_compute_management_client(secrets, configuration)
+    node_records = Records(operation)
+    batches = batch.group_instances(nodes).items()
+    pacing = Schedule(schedule, configuration)
+    deadline = retry_budget(configuration)
+    for (group, scale_set), instances in pacing.paced(batches):
+        logger.debug(
+            "Applying '{}' to nodes: {}".format(
+                operation, [n["name"] for n in instances]
+            )
+        )
+        submit(
+            batch.begin_batch,
+            client,
+            operation,
+            group,
+            scale_set,
+            [n["instance_id"] for n in instances],
+            deadline=deadline,
+        )
+        for node in instances:
+            node_records.add(node)
+
+    return node_records.output_as_dict("resources")
+
+
+def __fetch_managed_clusters(
+    filter,
+    configuration,
+    secrets,
+    count=None,
+    percentage=None,
+    seed=None,
+) -> []:
+    clusters = fetch_resources(
+        filter,
+        RES_TYPE_AKS,
+        secrets,
+        configuration,
+        count,
+        percentage,
+        seed,
+    )
     if not clusters:
         logger.warning("No Managed Clusters found")
         raise FailedActivity("No Managed Clusters found")
@@ -1 +1,29 @@
 RES_TYPE_AKS = "Microsoft.ContainerService/ManagedClusters"
+
+# Resolves the clusters matching the user filter together with the VMSS
+# instances backing their node pools in a single Resource Graph query, the
+# agent pool of each instance being read from the tag AKS puts on its scale
+# set
+NODES_QUERY = """{clusters}
+| project cluster=name, clusterResourceGroup=resourceGroup,
+    nodeResourceGroup=tolower(tostring(properties.nodeResourceGroup))
+| join kind=inner (
+    ComputeResources
+    | where type=~'{node_type}'
+    | extend nodeResourceGroup=tolower(resourceGroup),
+        scale_set=tostring(split(id, '/')[8]),
+        instance_id=tostring(split(id, '/')[10]),
+        scaleSetId=tostring(split(tolower(id), '/virtualmachines/')[0])
+    | join kind=leftouter (
+        Resources
+        | where type=~'{scale_set_type}'
+        | project scaleSetId=tolower(id),
+            pool=tostring(tags['{pool_tag}'])
+    ) on scaleSetId
+    | project id, name, type, resourceGroup, location, zones, scale_set,
+        instance_id, pool, nodeResourceGroup
+) on nodeResourceGroup
+| project-away nodeResourceGroup, nodeResourceGroup1"""
+
+# tag of the scale sets backing an agent pool naming the pool
+POOL_TAG = "aks-managed-poolName"
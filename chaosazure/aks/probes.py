@@ -4,12 +4,17 @@ import logging
 from chaoslib.types import Configuration, Secrets
 
 from chaosazure.aks.constants import RES_TYPE_AKS
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.plan import scoped
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    iter_resources,
+)
 
 __all__ = ["describe_managed_clusters", "count_managed_clusters"]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def describe_managed_clusters(
     filter: str = None,
     configuration: Configuration = None,
@@ -32,12 +37,13 @@ def describe_managed_clusters(
         )
     )
 
-    managed_clusters = fetch_resources(
+    managed_clusters = iter_resources(
         filter, RES_TYPE_AKS, secrets, configuration
     )
-    return managed_clusters
+    return list(managed_clusters)
 
 
+@scoped
 def count_managed_clusters(
     filter: str = None,
     configuration: Configuration = None,
@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 import logging
 import re
+import time
 
+from azure.core.exceptions import HttpResponseError
 from chaoslib.exceptions import FailedActivity
 from chaoslib.types import Configuration, Secrets
 
 from chaosazure import init_network_management_client
 from chaosazure.common import cleanse
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
 from chaosazure.application_gateway.constants import RES_TYPE_SRV_AG
+from chaosazure.common.plan import dry_run, scoped
 from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.submission import retry_budget, submit
 from chaosazure.vmss.records import Records
 
 __all__ = [
@@ -20,10 +25,14 @@ __all__ = [
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def delete_application_gateways(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Delete application gateways at random.
@@ -36,6 +45,15 @@ def delete_application_gateways(
     filter : str, optional
         Filter the application gateways. If the filter is omitted all application gateways in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of application gateways to pick at random among the matching
+        ones, sampled by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching application gateways to pick at random,
+        rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` application gateways
+        reproducible.
 
     Examples
     --------
@@ -57,24 +75,34 @@ def delete_application_gateways(
     )
 
     application_gateways = __fetch_application_gateways(
-        filter, configuration, secrets
+        filter, configuration, secrets, count, percentage, seed
     )
     client = __network_mgmt_client(secrets, configuration)
-    application_gateway_records = Records()
+    deadline = retry_budget(configuration)
+    application_gateway_records = Records("delete")
     for agw in application_gateways:
         group = agw["resourceGroup"]
         name = agw["name"]
         logger.debug("Deleting application gateway: {}".format(name))
-        client.application_gateways.begin_delete(group, name)
+        agw["retries"] = submit(
+            client.application_gateways.begin_delete,
+            group,
+            name,
+            deadline=deadline,
+        ).retries
         application_gateway_records.add(cleanse.application_gateway(agw))
 
     return application_gateway_records.output_as_dict("resources")
 
 
+@scoped
 def start_application_gateways(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Start application gateway at random.
@@ -84,6 +112,15 @@ def start_application_gateways(
     filter : str, optional
         Filter the application gateway. If the filter is omitted all application gateway in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of application gateways to pick at random among the matching
+        ones, sampled by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching application gateways to pick at random,
+        rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` application gateways
+        reproducible.
 
     Examples
     --------
@@ -105,24 +142,34 @@ def start_application_gateways(
     )
 
     application_gateways = __fetch_application_gateways(
-        filter, configuration, secrets
+        filter, configuration, secrets, count, percentage, seed
     )
     client = __network_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     application_gateway_records = Records()
     for agw in application_gateways:
         group = agw["resourceGroup"]
         name = agw["name"]
         logger.debug("Starting application gateway: {}".format(name))
-        client.application_gateways.begin_start(group, name)
+        agw["retries"] = submit(
+            client.application_gateways.begin_start,
+            group,
+            name,
+            deadline=deadline,
+        ).retries
         application_gateway_records.add(cleanse.application_gateway(agw))
 
     return application_gateway_records.output_as_dict("resources")
 
 
+@scoped
 def stop_application_gateways(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Stop application gateways at random.
@@ -132,6 +179,15 @@ def stop_application_gateways(
     filter : str, optional
         Filter the application gateways. If the filter is omitted all application gateways
         in the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of application gateways to pick at random among the matching
+        ones, sampled by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching application gateways to pick at random,
+        rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` application gateways
+        reproducible.
 
     Examples
     --------
@@ -153,25 +209,34 @@ def stop_application_gateways(
     )
 
     application_gateways = __fetch_application_gateways(
-        filter, configuration, secrets
+        filter, configuration, secrets, count, percentage, seed
     )
     client = __network_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     application_gateway_records = Records()
     for agw in application_gateways:
         group = agw["resourceGroup"]
         name = agw["name"]
         logger.debug("Stopping application gateway: {}".format(name))
-        client.application_gateways.begin_stop(group, name)
+        agw["retries"] = submit(
+            client.application_gateways.begin_stop,
+            group,
+            name,
+            deadline=deadline,
+        ).retries
         application_gateway_records.add(cleanse.application_gateway(agw))
 
     return application_gateway_records.output_as_dict("resources")
 
 
+@scoped
 def delete_routes(
     filter: str = None,
     name_pattern: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    wait_timeout: int = None,
+    max_attempts: int = 3,
 ):
     """
     Delete routes at random.
@@ -188,6 +253,19 @@ def delete_routes(
         the server will be selected for the probe.
         Pattern example:
         'app[0-9]{3}'
+    wait_timeout : int, optional
+        Wait for the gateways to be updated for up to that many seconds. The
+        updates are only submitted when omitted.
+    max_attempts : int, optional
+        Each gateway is updated only if it was not changed since it was read,
+        by matching its ETag. When it was, it is read again and the update
+        retried up to that many attempts in total.
+
+    The gateways are updated concurrently. Each route record carries the
+    `application_gateway` it belonged to and the `outcome` of its update:
+    `deleting` when it was only submitted or is still running at the
+    deadline, `deleted` or `failed` along with the `error`. In dry-run mode,
+    the updates are only `planned` and never waited for.
     Examples
     --------
     Some calling examples. Deep dive into the filter syntax:
@@ -206,6 +284,9 @@ def delete_routes(
         )
     )
 
+    if max_attempts < 1:
+        raise FailedActivity("At least one attempt is required")
+
     pattern = None
     if name_pattern:
         pattern = re.compile(name_pattern)
@@ -215,36 +296,55 @@ def delete_routes(
     )
     client = __network_mgmt_client(secrets, configuration)
     route_records = Records()
-    for agw in application_gateways:
-        group = agw["resourceGroup"]
-        application_gateway_name = agw["name"]
-        app_gw = client.application_gateways.get(
-            group, application_gateway_name
-        )
-        route_to_keep = app_gw.request_routing_rules[0]
+    planning = dry_run(configuration)
 
-        for r in app_gw.request_routing_rules[:]:
-            name = r.name
-            if pattern is None or pattern.search(name):
-                app_gw.request_routing_rules.remove(r)
-                route_records.add(r.as_dict())
-                logger.debug(
-                    "Deleting route: {}/{}".format(
-                        application_gateway_name, name
-                    )
-                )
+    def update_gateway(agw):
+        return __delete_gateway_routes(client, agw, pattern, max_attempts)
 
-        if not app_gw.request_routing_rules:
-            app_gw.request_routing_rules.append(route_to_keep)
-            logger.debug(
-                "Routes cannot be empty added back: {}/{}".format(
-                    application_gateway_name, route_to_keep.name
-                )
+    updates = []
+    outcomes = run_concurrently(
+        update_gateway, application_gateways, max_concurrency(configuration)
+    )
+    for outcome in outcomes:
+        agw = outcome.item
+        if outcome.error is not None:
+            logger.warning(
+                "Failed to delete routes of application gateway '{}': "
+                "{}".format(agw["name"], outcome.error)
             )
-
-        client.application_gateways.begin_create_or_update(
-            group, application_gateway_name, app_gw
-        )
+            route_records.add(
+                {
+                    "application_gateway": agw["name"],
+                    "resourceGroup": agw["resourceGroup"],
+                    "outcome": "failed",
+                    "error": str(outcome.error),
+                }
+            )
+            continue
+
+        routes, poller = outcome.result
+        for route in routes:
+            route["application_gateway"] = agw["name"]
+            route["outcome"] = "planned" if planning else "deleting"
+            route_records.add(route)
+        if poller is not None:
+            updates.append((routes, poller))
+
+    if wait_timeout is not None and not planning:
+        deadline = time.monotonic() + wait_timeout
+        for routes, poller in updates:
+            poller.wait(max(0, deadline - time.monotonic()))
+            if not poller.done():
+                continue
+            try:
+                poller.result(0)
+                outcome, error = "deleted", None
+            except Exception as x:
+                outcome, error = "failed", str(x)
+            for route in routes:
+                route["outcome"] = outcome
+                if error:
+                    route["error"] = error
 
     return route_records.output_as_dict("resources")
 
@@ -254,9 +354,22 @@ def delete_routes(
 ###############################################################################
 
 
-def __fetch_application_gateways(filter, configuration, secrets) -> []:
+def __fetch_application_gateways(
+    filter,
+    configuration,
+    secrets,
+    count=None,
+    percentage=None,
+    seed=None,
+) -> []:
     application_gateways = fetch_resources(
-        filter, RES_TYPE_SRV_AG, secrets, configuration
+        filter,
+        RES_TYPE_SRV_AG,
+        secrets,
+        configuration,
+        count,
+        percentage,
+        seed,
     )
     if not application_gateways:
         logger.warning("No application gateways found")
@@ -272,3 +385,53 @@ def __fetch_application_gateways(filter, configuration, secrets) -> []:
 
 def __network_mgmt_client(secrets, configuration):
     return init_network_management_client(secrets, configuration)
+
+
+def __delete_gateway_routes(client, agw, pattern, max_attempts):
+    group = agw["resourceGroup"]
+    application_gateway_name = agw["name"]
+
+    for attempt in range(1, max_attempts + 1):
+        app_gw = client.application_gateways.get(
+            group, application_gateway_name
+        )
+        route_to_keep = app_gw.request_routing_rules[0]
+
+        routes = []
+        for r in app_gw.request_routing_rules[:]:
+            name = r.name
+            if pattern is None or pattern.search(name):
+                app_gw.request_routing_rules.remove(r)
+                routes.append(r.as_dict())
+                logger.debug(
+                    "Deleting route: {}/{}".format(
+                        application_gateway_name, name
+                    )
+                )
+
+        if not app_gw.request_routing_rules:
+            app_gw.request_routing_rules.append(route_to_keep)
+            logger.debug(
+                "Routes cannot be empty added back: {}/{}".format(
+                    application_gateway_name, route_to_keep.name
+                )
+            )
+
+        if not routes:
+            return routes, None
+
+        try:
+            poller = client.application_gateways.begin_create_or_update(
+                group,
+                application_gateway_name,
+                app_gw,
+                headers={"If-Match": app_gw.etag},
+            )
+            return routes, poller
+        except HttpResponseError as x:
+            if x.status_code != 412 or attempt == max_attempts:
+                raise
+            logger.debug(
+                "Application gateway '{}' changed since it was read, "
+                "retrying".format(application_gateway_name)
+            )
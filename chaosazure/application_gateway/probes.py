@@ -6,7 +6,11 @@ from chaoslib.types import Configuration, Secrets
 
 from chaosazure.application_gateway.constants import RES_TYPE_SRV_AG
 from chaosazure.application_gateway.actions import __network_mgmt_client
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.plan import scoped
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    iter_resources,
+)
 
 __all__ = [
     "describe_application_gateways",
@@ -16,6 +20,7 @@ __all__ = [
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def describe_application_gateways(
     filter: str = None,
     configuration: Configuration = None,
@@ -38,12 +43,13 @@ def describe_application_gateways(
         )
     )
 
-    application_gateways = fetch_resources(
+    application_gateways = iter_resources(
         filter, RES_TYPE_SRV_AG, secrets, configuration
     )
-    return application_gateways
+    return list(application_gateways)
 
 
+@scoped
 def count_application_gateways(
     filter: str = None,
     configuration: Configuration = None,
@@ -72,6 +78,7 @@ def count_application_gateways(
     return len(application_gateways)
 
 
+@scoped
 def describe_routes(
     filter: str = None,
     name_pattern: str = None,
@@ -133,6 +133,15 @@ def vmss_instance(resource: dict) -> dict:
     return __cleanse(cleanse, resource)
 
 
+def webapp(resource: dict) -> dict:
+    """
+    Free the web app dictionary from unwanted keys listed below.
+    """
+    cleanse = ["properties", "identity"]
+
+    return __cleanse(cleanse, resource)
+
+
 def __cleanse(cleanse_list: [], resource: dict) -> dict:
     for key in cleanse_list:
         if key in resource:
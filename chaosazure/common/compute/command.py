@@ -1,13 +1,24 @@
 import logging
 import os
+import time
+import uuid
+from typing import Any, Dict, List
 
+from azure.core.exceptions import ResourceNotFoundError
+from azure.mgmt.compute.models import (
+    RunCommandInputParameter,
+    VirtualMachineRunCommand,
+    VirtualMachineRunCommandScriptSource,
+)
 from chaoslib.exceptions import FailedActivity, InterruptExecution
 
 from chaosazure import init_compute_management_client
+from chaosazure.common.plan import dry_run
 from chaosazure.machine.constants import OS_LINUX, OS_WINDOWS, RES_TYPE_VM
 from chaosazure.vmss.constants import RES_TYPE_VMSS_VM
 
 UNSUPPORTED_WINDOWS_SCRIPTS = ["network_latency", "burn_io"]
+TERMINAL_EXECUTION_STATES = ["succeeded", "failed", "timedout", "canceled"]
 logger = logging.getLogger("chaostoolkit")
 
 
@@ -74,9 +85,15 @@ def run(
         )
         raise InterruptExecution(msg)
 
+    # the script was not run so there is no output to wait for
+    if dry_run(configuration):
+        return None
+
     result = poller.result(timeout)  # Blocking till executed
     if result and result.value:
-        logger.debug(result.value[0].message)  # stdout/stderr
+        message = result.value[0].message  # stdout/stderr
+        logger.debug(message)
+        return message
     else:
         raise FailedActivity(
             "Operation did not finish properly."
@@ -84,9 +101,198 @@ def run(
         )
 
 
+def new_run_command_name() -> str:
+    return "chaosazure-{}".format(uuid.uuid4().hex[:12])
+
+
+def submit(
+    resource_group: str,
+    compute: dict,
+    timeout: int,
+    parameters: dict,
+    run_command_name: str,
+    output_blob_uri: str,
+    secrets,
+    configuration,
+    client=None,
+) -> Dict[str, Any]:
+    """
+    Start the script as a managed `runCommands` child resource of the
+    compute with `asyncExecution` turned on.
+
+    The call returns as soon as Azure accepted the run command, it does not
+    wait for the script to finish. When `output_blob_uri` is set, it is
+    expected to be the URI of a blob container (optionally with a SAS token)
+    and stdout/stderr of the script are streamed to blobs named after the
+    run command and the compute.
+
+    Returns a description of the run that can be handed over to `poll`.
+    """
+    if client is None:
+        client = init_compute_management_client(secrets, configuration)
+
+    run = __run_descriptor(resource_group, compute, run_command_name)
+    if output_blob_uri:
+        blob_name = "{}-{}".format(run_command_name, __compute_name(run))
+        run["output_blob_uri"] = blob_uri(
+            output_blob_uri, "{}.stdout".format(blob_name)
+        )
+        run["error_blob_uri"] = blob_uri(
+            output_blob_uri, "{}.stderr".format(blob_name)
+        )
+
+    run_command = VirtualMachineRunCommand(
+        location=compute["location"],
+        source=VirtualMachineRunCommandScriptSource(
+            script="\n".join(parameters["script"])
+        ),
+        parameters=[
+            RunCommandInputParameter(name=p["name"], value=str(p["value"]))
+            for p in parameters.get("parameters", [])
+        ],
+        async_execution=True,
+        timeout_in_seconds=timeout,
+        output_blob_uri=run.get("output_blob_uri"),
+        error_blob_uri=run.get("error_blob_uri"),
+    )
+
+    if run["type"] == RES_TYPE_VMSS_VM.lower():
+        client.virtual_machine_scale_set_vm_run_commands.begin_create_or_update(
+            resource_group,
+            run["scale_set"],
+            run["instance_id"],
+            run_command_name,
+            run_command,
+        )
+    else:
+        client.virtual_machine_run_commands.begin_create_or_update(
+            resource_group, run["vm_name"], run_command_name, run_command
+        )
+
+    logger.debug(
+        "Submitted run command '{}' to '{}'".format(
+            run_command_name, __compute_name(run)
+        )
+    )
+    return run
+
+
+def poll(
+    runs: List[Dict[str, Any]],
+    timeout: int,
+    interval: int,
+    secrets,
+    configuration,
+    client=None,
+) -> List[Dict[str, Any]]:
+    """
+    Poll the instance view of many managed run commands from a single loop
+    until all of them reached a terminal state or `timeout` seconds elapsed.
+
+    Runs that Azure does not know about are reported with the `NotFound`
+    execution state.
+    """
+    if client is None:
+        client = init_compute_management_client(secrets, configuration)
+
+    deadline = time.monotonic() + timeout
+    pending = list(runs)
+    results = {}
+    while True:
+        still_pending = []
+        for run in pending:
+            result = __fetch_run_status(client, run)
+            results[id(run)] = result
+            state = result["execution_state"].lower()
+            if state not in TERMINAL_EXECUTION_STATES + ["notfound"]:
+                still_pending.append(run)
+
+        pending = still_pending
+        if not pending or time.monotonic() + interval > deadline:
+            break
+        time.sleep(interval)
+
+    return [results[id(run)] for run in runs]
+
+
+def blob_uri(container_uri: str, blob_name: str) -> str:
+    base, sep, sas = container_uri.partition("?")
+    return "{}/{}{}{}".format(base.rstrip("/"), blob_name, sep, sas)
+
+
 #####################
 # HELPER FUNCTIONS
 ####################
+def __run_descriptor(resource_group, compute, run_command_name) -> dict:
+    compute_type = compute.get("type").lower()
+    run = {
+        "run_command_name": run_command_name,
+        "resource_group": resource_group,
+        "type": compute_type,
+    }
+    if compute_type == RES_TYPE_VMSS_VM.lower():
+        run["scale_set"] = compute["scale_set"]
+        run["instance_id"] = compute["instance_id"]
+    elif compute_type == RES_TYPE_VM.lower():
+        run["vm_name"] = compute["name"]
+    else:
+        msg = (
+            "Trying to run a command for the unknown resource type '{}'".format(
+                compute.get("type")
+            )
+        )
+        raise InterruptExecution(msg)
+
+    return run
+
+
+def __compute_name(run: dict) -> str:
+    if "vm_name" in run:
+        return run["vm_name"]
+    return "{}-{}".format(run["scale_set"], run["instance_id"])
+
+
+def __fetch_run_status(client, run: dict) -> dict:
+    result = dict(run)
+    try:
+        if run["type"] == RES_TYPE_VMSS_VM.lower():
+            run_command = client.virtual_machine_scale_set_vm_run_commands.get(
+                run["resource_group"],
+                run["scale_set"],
+                run["instance_id"],
+                run["run_command_name"],
+                expand="instanceView",
+            )
+        else:
+            run_command = (
+                client.virtual_machine_run_commands.get_by_virtual_machine(
+                    run["resource_group"],
+                    run["vm_name"],
+                    run["run_command_name"],
+                    expand="instanceView",
+                )
+            )
+    except ResourceNotFoundError:
+        result["execution_state"] = "NotFound"
+        return result
+
+    view = run_command.instance_view
+    if view is None:
+        result["execution_state"] = "Unknown"
+        return result
+
+    state = view.execution_state or "Unknown"
+    result["execution_state"] = getattr(state, "value", state)
+    result["exit_code"] = view.exit_code
+    result["output"] = view.output
+    result["error"] = view.error
+    result["start_time"] = (
+        view.start_time.isoformat() if view.start_time else None
+    )
+    result["end_time"] = view.end_time.isoformat() if view.end_time else None
+    return result
+
+
 def __get_os_type(compute):
     compute_type = compute["type"].lower()
 
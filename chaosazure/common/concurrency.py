@@ -0,0 +1,91 @@
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from chaoslib.types import Configuration
+
+logger = logging.getLogger("chaostoolkit")
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class Outcome(NamedTuple):
+    """
+    Outcome of a call made by `run_concurrently` for one of the items.
+    """
+
+    item: Any
+    result: Any
+    error: Optional[Exception]
+    latency: float
+
+
+def max_concurrency(configuration: Configuration = None) -> int:
+    """
+    Number of concurrent calls made against Azure, read from the
+    `azure_max_concurrency` configuration or the `AZURE_MAX_CONCURRENCY`
+    environment variable. Defaults to 16.
+    """
+    value = (configuration or {}).get(
+        "azure_max_concurrency",
+        os.getenv("AZURE_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY),
+    )
+    return max(1, int(value))
+
+
+def run_concurrently(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = DEFAULT_MAX_CONCURRENCY,
+) -> Iterator[Outcome]:
+    """
+    Call `func` for each of the items from a pool of `max_workers` threads
+    and yield their outcome as soon as they complete.
+
+    At most `max_workers` calls are in flight at any time so the items may
+    be a lazy iterable which is only consumed as workers free up. A call
+    raising an exception does not stop the others, its error is carried by
+    its outcome instead. Each call runs in a copy of the context of the
+    caller.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def submit_next() -> bool:
+            for item in items:
+                context = contextvars.copy_context()
+                future = executor.submit(context.run, __timed, func, item)
+                pending[future] = item
+                return True
+            return False
+
+        while len(pending) < max_workers and submit_next():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                result, error, latency = future.result()
+                if error is not None:
+                    logger.debug(
+                        "Concurrent call failed for {}: {}".format(item, error)
+                    )
+                yield Outcome(item, result, error, latency)
+                submit_next()
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __timed(func, item):
+    start = time.monotonic()
+    try:
+        result = func(item)
+    except Exception as x:
+        return None, x, time.monotonic() - start
+    return result, None, time.monotonic() - start
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List
+
+from chaoslib.types import Configuration
+
+from chaosazure.common import plan
+
+logger = logging.getLogger("chaostoolkit")
+
+FETCHED = "fetched"
+ACTED = "acted"
+
+__lock = threading.Lock()
+# a `chaos run` process runs a single experiment
+__run = uuid.uuid4().hex
+
+
+def inventory_path(configuration: Configuration = None) -> str:
+    """
+    Path of the inventory file, read from the `azure_inventory_path`
+    configuration or the `AZURE_INVENTORY_PATH` environment variable. A
+    relative path is relative to the working directory of the experiment.
+
+    The inventory is disabled, and nothing is recorded, when neither is set.
+    """
+    return (configuration or {}).get(
+        "azure_inventory_path", os.getenv("AZURE_INVENTORY_PATH")
+    )
+
+
+def run_id(configuration: Configuration = None) -> str:
+    """
+    Identifier of the experiment run the entries are recorded by, read from
+    the `azure_inventory_run` configuration or the `AZURE_INVENTORY_RUN`
+    environment variable. Defaults to an identifier generated per process.
+    """
+    return (configuration or {}).get(
+        "azure_inventory_run", os.getenv("AZURE_INVENTORY_RUN", __run)
+    )
+
+
+def record(
+    event: str,
+    resources: Iterable[Dict[str, Any]],
+    configuration: Configuration = None,
+    activity: str = None,
+) -> int:
+    """
+    Append the resources to the inventory, one JSON line per resource, as
+    `fetched` or `acted` upon by the given activity of the current run, see
+    `run_id`. Only their identity is
+    kept along with their `etag` and `changedTime`, when known, so that the
+    changes they went through since may be looked up later on.
+
+    Resources without an `id` are skipped, as is everything in dry-run
+    mode since no resource is acted upon then. Return the number of
+    resources recorded.
+    """
+    path = inventory_path(configuration)
+    if not path or plan.dry_run(configuration):
+        return 0
+
+    recorded_at = datetime.now(timezone.utc).isoformat()
+    run = run_id(configuration)
+    lines = []
+    for resource in resources:
+        if not resource.get("id"):
+            continue
+        entry = {
+            "recorded_at": recorded_at,
+            "event": event,
+            "activity": activity,
+            "run": run,
+            "id": resource["id"],
+            "type": resource.get("type"),
+            "name": resource.get("name"),
+            "resourceGroup": resource.get("resourceGroup"),
+        }
+        etag = resource.get("etag")
+        if etag:
+            entry["etag"] = etag
+        changed_time = resource.get("changedTime") or (
+            resource.get("systemData") or {}
+        ).get("lastModifiedAt")
+        if changed_time:
+            entry["changedTime"] = changed_time
+        lines.append(json.dumps(entry) + "\n")
+
+    if lines:
+        with __lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+
+    return len(lines)
+
+
+def load(
+    configuration: Configuration = None,
+    event: str = None,
+    activity: str = None,
+    resource_type: str = None,
+    run: str = None,
+) -> List[Dict[str, Any]]:
+    """
+    Latest inventory entry of each resource matching the given event,
+    activity, resource type and run, in the order they were first recorded.
+    """
+    path = inventory_path(configuration)
+    if not path or not os.path.exists(path):
+        return []
+
+    entries = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if event and entry.get("event") != event:
+                continue
+            if activity and entry.get("activity") != activity:
+                continue
+            if run and entry.get("run") != run:
+                continue
+            if resource_type and (
+                (entry.get("type") or "").lower() != resource_type.lower()
+            ):
+                continue
+            entries[entry["id"].lower()] = entry
+
+    return list(entries.values())
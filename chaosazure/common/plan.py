@@ -0,0 +1,241 @@
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict
+
+from chaoslib.types import Configuration
+
+from chaosazure.common import quota
+from chaosazure.common.concurrency import max_concurrency
+
+logger = logging.getLogger("chaostoolkit")
+
+# operations of the SDK clients that only read, any other is mutating
+READ_PREFIXES = ("get", "list", "check", "instance_view", "retrieve", "exists")
+
+# typical duration, in seconds, of the long running operations by verb, the
+# first verb found in the name of the operation wins
+OPERATION_DURATIONS = [
+    ("run_command", 300),
+    ("delete", 120),
+    ("deallocate", 120),
+    ("restart", 120),
+    ("start", 90),
+    ("power_off", 60),
+    ("stop", 60),
+    ("create_or_update", 60),
+]
+DEFAULT_OPERATION_DURATION = 30
+
+__active = contextvars.ContextVar("chaosazure_plan", default=None)
+
+
+class Plan:
+    """
+    Calls an activity would make against Azure in dry-run mode: the
+    mutating ARM calls it skipped, the reads it made and the Resource Graph
+    queries it ran.
+    """
+
+    def __init__(
+        self, concurrency: int = 1, configuration: Configuration = None
+    ):
+        self.concurrency = concurrency
+        self.configuration = configuration
+        self.operations = {}
+        self.reads = 0
+        self.queries = 0
+        self.paced = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, operation: str):
+        with self._lock:
+            self.operations[operation] = self.operations.get(operation, 0) + 1
+
+    def read(self):
+        with self._lock:
+            self.reads += 1
+
+    def query(self):
+        with self._lock:
+            self.queries += 1
+
+    def pace(self, seconds: float):
+        with self._lock:
+            self.paced += seconds
+
+    def estimated_duration(self) -> float:
+        """
+        Seconds the mutating operations would take, `concurrency` of them
+        running at a time and each taking its typical duration, on top of
+        the time their schedule spreads them over.
+        """
+        durations = []
+        for operation, count in self.operations.items():
+            durations.extend([operation_duration(operation)] * count)
+
+        lanes = [0] * max(1, min(self.concurrency, len(durations)))
+        for duration in sorted(durations, reverse=True):
+            lanes[lanes.index(min(lanes))] += duration
+        return self.paced + max(lanes)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        The plan, checked against the write budget of the subscription when
+        ARM reported it already, see `chaosazure.common.quota.write_budget`.
+        """
+        budget = quota.write_budget(self.configuration)
+        with self._lock:
+            calls = sum(self.operations.values())
+            return {
+                "dry_run": True,
+                "calls": calls,
+                "operations": dict(sorted(self.operations.items())),
+                "reads": self.reads,
+                "queries": self.queries,
+                "paced_duration": self.paced,
+                "concurrency": self.concurrency,
+                "estimated_duration": self.estimated_duration(),
+                "write_budget": budget,
+                "within_budget": None if budget is None else calls <= budget,
+            }
+
+
+def dry_run(configuration: Configuration = None) -> bool:
+    """
+    Whether the activities only plan their calls, read from the
+    `azure_dry_run` configuration or the `AZURE_DRY_RUN` environment
+    variable.
+
+    In dry-run mode, the targets are selected as usual but no mutating call
+    is sent to Azure: the activities output the records they would produce
+    along with the `plan` of the calls they would make.
+    """
+    value = (configuration or {}).get(
+        "azure_dry_run", os.getenv("AZURE_DRY_RUN", False)
+    )
+    return str(value).lower() in ("true", "1", "yes")
+
+
+def current(configuration: Configuration = None) -> Plan:
+    """
+    Plan of the running activity, created on first use.
+    """
+    plan = __active.get()
+    if plan is None:
+        plan = Plan(max_concurrency(configuration), configuration)
+        __active.set(plan)
+    return plan
+
+
+def take() -> Plan:
+    """
+    Plan of the running activity, if any, which is ended.
+    """
+    plan = __active.get()
+    __active.set(None)
+    return plan
+
+
+def scoped(activity: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Give the activity a plan of its own, dropped once it returns, so the
+    calls planned by a probe, or by an action which failed before it output
+    its plan, never show up in the plan of the next activity.
+    """
+
+    @functools.wraps(activity)
+    def wrapper(*args, **kwargs):
+        token = __active.set(None)
+        try:
+            return activity(*args, **kwargs)
+        finally:
+            __active.reset(token)
+
+    return wrapper
+
+
+def planned(client, configuration: Configuration = None):
+    """
+    The client itself or, in dry-run mode, a client making the reads but
+    recording the mutating calls into the plan instead of sending them. The
+    long running operations then return a poller which is already done.
+    """
+    if not dry_run(configuration):
+        return client
+    current(configuration)
+    return __PlannedClient(client)
+
+
+def operation_duration(operation: str) -> int:
+    name = operation.rsplit(".", 1)[-1]
+    for verb, duration in OPERATION_DURATIONS:
+        if verb in name:
+            return duration
+    return DEFAULT_OPERATION_DURATION
+
+
+class PlannedPoller:
+    """
+    Poller of a long running operation which was only planned.
+    """
+
+    def result(self, timeout: float = None):
+        return None
+
+    def wait(self, timeout: float = None):
+        return None
+
+    def done(self) -> bool:
+        return True
+
+    def status(self) -> str:
+        return "Planned"
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+class __PlannedClient:
+    def __init__(self, client):
+        self._planned_client = client
+
+    def __getattr__(self, name: str):
+        value = getattr(self._planned_client, name)
+        # the pipeline and the configuration of the client are left as is
+        if name.startswith("_") or inspect.ismethod(value):
+            return value
+        return _PlannedOperations(value, name)
+
+
+class _PlannedOperations:
+    def __init__(self, operations, group: str):
+        self._operations = operations
+        self._group = group
+
+    def __getattr__(self, name: str):
+        method = getattr(self._operations, name)
+        if name.startswith("_") or not callable(method):
+            return method
+
+        if name.startswith(READ_PREFIXES):
+
+            def read(*args, **kwargs):
+                current().read()
+                return method(*args, **kwargs)
+
+            return read
+
+        operation = "{}.{}".format(self._group, name)
+
+        def plan(*args, **kwargs):
+            logger.info(
+                "Dry run, not calling {}{}".format(operation, tuple(args))
+            )
+            current().record(operation)
+            return PlannedPoller()
+
+        return plan
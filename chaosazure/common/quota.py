@@ -0,0 +1,198 @@
+import logging
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from azure.core.pipeline.policies import SansIOHTTPPolicy
+from chaoslib.exceptions import InterruptExecution
+from chaoslib.types import Configuration
+
+from chaosazure.common.config import load_configuration
+
+logger = logging.getLogger("chaostoolkit")
+
+READS_HEADER = "x-ms-ratelimit-remaining-subscription-reads"
+WRITES_HEADER = "x-ms-ratelimit-remaining-subscription-writes"
+SUBSCRIPTION_PATTERN = re.compile(r"/subscriptions/([^/?#]+)", re.IGNORECASE)
+# methods of the requests ARM does not count as writes
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# writes left aside for the rollbacks and the other tools of the subscription
+DEFAULT_WRITE_RESERVE = 10
+# ARM throttles the writes of a subscription at about 1200 an hour
+DEFAULT_ARM_WRITE_LIMIT = 1200
+
+__lock = threading.Lock()
+__quotas = {}
+
+
+class Quota:
+    """
+    Remaining ARM requests of a subscription, as last reported by ARM in the
+    `x-ms-ratelimit-remaining-subscription-reads` and
+    `x-ms-ratelimit-remaining-subscription-writes` headers of its responses.
+    Each count is `None` until a response reported it.
+    """
+
+    def __init__(self):
+        self.reads = None
+        self.writes = None
+        self.reads_at = None
+        self.writes_at = None
+        self.next_write = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, headers):
+        now = time.monotonic()
+        reads = _count(headers.get(READS_HEADER))
+        writes = _count(headers.get(WRITES_HEADER))
+        with self._lock:
+            if reads is not None:
+                self.reads, self.reads_at = reads, now
+            if writes is not None:
+                self.writes, self.writes_at = writes, now
+        if writes is not None and writes <= DEFAULT_WRITE_RESERVE:
+            logger.warning("Only {} ARM writes left".format(writes))
+
+    def pace_write(self, gap: float) -> float:
+        """
+        Seconds to wait before sending a write so that the writes paced
+        this way are at least `gap` seconds apart.
+        """
+        with self._lock:
+            now = time.monotonic()
+            due = max(now, self.next_write)
+            self.next_write = due + gap
+        return due - now
+
+
+class QuotaPolicy(SansIOHTTPPolicy):
+    """
+    Pipeline policy feeding the quota of the subscription of each request
+    with the remaining requests reported in the response. It sits after the
+    retry policy so the throttled responses are seen too.
+
+    Once the remaining writes ARM reported fall to the reserve of
+    `write_budget`, the writes to the subscription are spaced out to the
+    ARM write limit, see `write_limit`, whether their activity has a
+    schedule or not, rather than being sent until ARM throttles them.
+    """
+
+    def __init__(self, configuration: Configuration = None):
+        self.configuration = configuration
+
+    def on_request(self, request):
+        http_request = request.http_request
+        if (http_request.method or "").upper() in READ_METHODS:
+            return
+        match = SUBSCRIPTION_PATTERN.search(http_request.url or "")
+        if not match:
+            return
+
+        q = quota(match.group(1))
+        writes = q.writes
+        if writes is None or writes > write_reserve(self.configuration):
+            return
+        seconds = q.pace_write(3600.0 / write_limit(self.configuration))
+        if seconds > 0:
+            logger.info(
+                "Only {} ARM writes left, waiting {:.1f}s before the next "
+                "one".format(writes, seconds)
+            )
+            time.sleep(seconds)
+
+    def on_response(self, request, response):
+        match = SUBSCRIPTION_PATTERN.search(request.http_request.url or "")
+        if match:
+            quota(match.group(1)).observe(response.http_response.headers)
+
+
+def quota(subscription_id: str) -> Quota:
+    """
+    Quota of the subscription, shared by all the clients.
+    """
+    key = (subscription_id or "").lower()
+    with __lock:
+        q = __quotas.get(key)
+        if q is None:
+            q = __quotas[key] = Quota()
+    return q
+
+
+def subscription_id(configuration: Configuration = None) -> str:
+    if not configuration:
+        return os.getenv("AZURE_SUBSCRIPTION_ID")
+    return load_configuration(configuration).get(
+        "subscription_id", os.getenv("AZURE_SUBSCRIPTION_ID")
+    )
+
+
+def write_budget(configuration: Configuration = None) -> Optional[int]:
+    """
+    Writes the activities may still make against the subscription before
+    ARM throttles it, keeping aside a reserve read from the
+    `azure_arm_write_reserve` configuration or the `AZURE_ARM_WRITE_RESERVE`
+    environment variable. Defaults to 10.
+
+    `None` when ARM did not report the remaining writes yet.
+    """
+    writes = quota(subscription_id(configuration)).writes
+    if writes is None:
+        return None
+    return max(0, writes - write_reserve(configuration))
+
+
+def write_reserve(configuration: Configuration = None) -> int:
+    return int(
+        (configuration or {}).get(
+            "azure_arm_write_reserve",
+            os.getenv("AZURE_ARM_WRITE_RESERVE", DEFAULT_WRITE_RESERVE),
+        )
+    )
+
+
+def write_limit(configuration: Configuration = None) -> int:
+    """
+    ARM writes a subscription accepts in an hour, read from the
+    `azure_arm_write_limit` configuration or the `AZURE_ARM_WRITE_LIMIT`
+    environment variable. Defaults to 1200.
+    """
+    limit = (configuration or {}).get(
+        "azure_arm_write_limit",
+        os.getenv("AZURE_ARM_WRITE_LIMIT", DEFAULT_ARM_WRITE_LIMIT),
+    )
+    return max(1, int(limit))
+
+
+def preflight(writes: int, configuration: Configuration = None):
+    """
+    Refuse to start `writes` writes the budget of the subscription does not
+    cover, when the `azure_arm_write_preflight` configuration or the
+    `AZURE_ARM_WRITE_PREFLIGHT` environment variable is set. Otherwise, the
+    writes are paced once the budget is exhausted.
+    """
+    enabled = (configuration or {}).get(
+        "azure_arm_write_preflight",
+        os.getenv("AZURE_ARM_WRITE_PREFLIGHT", False),
+    )
+    if str(enabled).lower() not in ("true", "1", "yes"):
+        return
+
+    budget = write_budget(configuration)
+    if budget is not None and writes > budget:
+        raise InterruptExecution(
+            "{} ARM writes exceed the remaining budget of {} writes of the "
+            "subscription".format(writes, budget)
+        )
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def _count(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
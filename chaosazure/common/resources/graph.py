@@ -1,14 +1,33 @@
 import os
-from typing import List
+from typing import Any, Dict, Iterator, List
 
 from azure.core.exceptions import HttpResponseError
+from azure.core.rest import HttpRequest
 from azure.mgmt.resourcegraph.models import QueryRequest
-from chaoslib.exceptions import InterruptExecution
+from chaoslib.exceptions import FailedActivity, InterruptExecution
 from chaoslib.types import Secrets, Configuration
 import azure.mgmt.resourcegraph as arg
 
 from chaosazure import init_resource_graph_client
+from chaosazure.common import inventory, plan
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
 from chaosazure.common.config import load_configuration
+from chaosazure.common.resources.query import Query
+from chaosazure.common.resources.rows import Row, to_rows
+from chaosazure.common.selection import select
+from chaosazure.common.resources.stream import decode_object_array
+from chaosazure.common.submission import (
+    TERMINAL,
+    SubmissionError,
+    retry_budget,
+    submit,
+)
+
+RESOURCES_PATH = "/providers/Microsoft.ResourceGraph/resources"
+# number of streamed resources recorded at once into the inventory
+INVENTORY_BATCH_SIZE = 1000
+# keep the queries looking resources up by id under the query length limit
+IDS_BATCH_SIZE = 200
 
 
 def fetch_resources(
@@ -16,34 +35,219 @@ def fetch_resources(
     resource_type: str,
     secrets: Secrets,
     configuration: Configuration,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
+    """
+    Fetch the resources of that type matching the filter, all of them or
+    `count` of them, or `percentage` of them, at random.
+
+    A `count` alone is sampled by Resource Graph itself so only the picked
+    resources are ever downloaded. For a `percentage`, or a `seed` making
+    the pick reproducible, only the identifiers of the matching resources
+    are downloaded to pick from, all their pages, the picked resources being
+    looked up next.
+    """
     # prepare query
-    _query = __query_from(resource_type, input_query)
-    _query_request = __query_request_from(_query, configuration)
+    _query = Query(resource_type).filter(input_query)
+    if count is None and percentage is None:
+        return query_resources(str(_query), secrets, configuration)
 
-    # prepare resource graph client
-    try:
-        client = init_resource_graph_client(secrets)
-        resources = client.resources(_query_request)
-    except HttpResponseError as e:
-        if e.error:
-            msg = e.error.code
-            if e.error.details:
-                for d in e.error.details:
-                    msg += ": " + str(d)
-        else:
-            msg = e.message
+    if count is not None and count < 1:
+        raise InterruptExecution("Cannot pick {} resources".format(count))
 
-        raise InterruptExecution(msg)
+    if seed is None and percentage is None:
+        return query_resources(
+            str(_query.sample(count)), secrets, configuration
+        )
+
+    # the pick covers every page of the identifiers, not only the first one
+    ids = iter_query_resources(
+        str(_query.project("id")), secrets, configuration
+    )
+    candidates = sorted(ids, key=lambda r: r["id"].lower())
+    picked = [
+        r["id"]
+        for r in select(
+            candidates, "random", count=count, percentage=percentage, seed=seed
+        )
+    ]
+
+    resources = []
+    for i in range(0, len(picked), IDS_BATCH_SIZE):
+        _query = Query(resource_type).ids(picked[i : i + IDS_BATCH_SIZE])
+        resources.extend(query_resources(str(_query), secrets, configuration))
+    return resources
+
+
+def fetch_resources_many(
+    queries: Dict[str, str],
+    secrets: Secrets,
+    configuration: Configuration,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch the resources of several types at once, `queries` mapping each
+    resource type to the filter of its resources, as given to
+    `fetch_resources`, and return the resources of each type under the same
+    key.
+
+    When no type is filtered, the types are looked up with a single query
+    whose results are dispatched by type. Otherwise, the queries run
+    concurrently, see `query_resources_many`. Either way, all the pages of
+    the results are read and the resources are plain dictionaries.
+    """
+    if not any(queries.values()):
+        types = {t.lower(): t for t in queries}
+        results = {t: [] for t in queries}
+        _query = str(Query(list(types)))
+        for resource in iter_query_resources(_query, secrets, configuration):
+            results[types[resource["type"].lower()]].append(resource)
+        return results
+
+    return query_resources_many(
+        {t: str(Query(t).filter(f)) for t, f in queries.items()},
+        secrets,
+        configuration,
+    )
+
+
+def query_resources_many(
+    queries: Dict[Any, str],
+    secrets: Secrets,
+    configuration: Configuration,
+) -> Dict[Any, List[Dict[str, Any]]]:
+    """
+    Run several complete KQL queries concurrently, up to
+    `azure_max_concurrency` at a time, and return the resources of each
+    query under the same key. All the pages of the results are read, see
+    `iter_query_resources`.
+    """
+
+    def fetch(item):
+        return list(iter_query_resources(item[1], secrets, configuration))
+
+    # the queries of the concurrent fetches count towards the same plan
+    if plan.dry_run(configuration):
+        plan.current(configuration)
+
+    results = {}
+    outcomes = run_concurrently(
+        fetch, queries.items(), max_concurrency(configuration)
+    )
+    for outcome in outcomes:
+        if outcome.error is not None:
+            raise outcome.error
+        results[outcome.item[0]] = outcome.result
+
+    return {key: results[key] for key in queries}
+
+
+def query_resources(
+    query: str,
+    secrets: Secrets,
+    configuration: Configuration,
+) -> List[Row]:
+    """
+    Run a complete KQL query, such as a query joining several resource types,
+    against Azure Resource Graph.
+
+    The rows behave as dictionaries but share the column names of the
+    result, see `chaosazure.common.resources.rows`.
+    """
+    _query_request = __query_request_from(query, configuration)
+
+    # prepare resource graph client, transient failures are retried and
+    # only a query Resource Graph rejects interrupts the experiment
+    client = init_resource_graph_client(secrets, configuration)
+    __plan_query(configuration)
+    try:
+        resources = submit(
+            client.resources,
+            _query_request,
+            deadline=retry_budget(configuration),
+        ).result
+    except SubmissionError as x:
+        __raise_query_error(x)
 
     # prepare results
-    results = __to_dicts(resources.data)
+    results = to_rows(resources.data)
+    inventory.record(inventory.FETCHED, results, configuration)
     return results
 
 
-def __query_request_from(query, experiment_configuration: Configuration):
+def iter_resources(
+    input_query: str,
+    resource_type: str,
+    secrets: Secrets,
+    configuration: Configuration,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Same as `fetch_resources` but yielding the resources as they are read,
+    see `iter_query_resources`.
+    """
+    _query = Query(resource_type).filter(input_query)
+    return iter_query_resources(str(_query), secrets, configuration)
+
+
+def iter_query_resources(
+    query: str,
+    secrets: Secrets,
+    configuration: Configuration,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run a complete KQL query against Azure Resource Graph, in the
+    `objectArray` format, and yield the resources one by one while each page
+    of the result is being downloaded and decoded, following the next pages
+    until the last one.
+
+    Unlike `query_resources`, no page is ever held in memory as a whole so
+    this suits describing large numbers of resources.
+    """
+    _query_request = __query_request_from(query, configuration, "objectArray")
+    client = init_resource_graph_client(secrets, configuration)
+    deadline = retry_budget(configuration)
+    recording = bool(inventory.inventory_path(configuration))
+    fetched = []
+
+    while True:
+        __plan_query(configuration)
+        try:
+            response = submit(
+                __send_query_request, client, _query_request, deadline=deadline
+            ).result
+        except SubmissionError as x:
+            __raise_query_error(x)
+
+        fields = {}
+        try:
+            for resource in decode_object_array(response.iter_bytes(), fields):
+                if recording:
+                    fetched.append(resource)
+                    if len(fetched) >= INVENTORY_BATCH_SIZE:
+                        inventory.record(
+                            inventory.FETCHED, fetched, configuration
+                        )
+                        fetched = []
+                yield resource
+        finally:
+            response.close()
+
+        skip_token = fields.get("$skipToken")
+        if not skip_token:
+            break
+        _query_request.options.skip_token = skip_token
+
+    inventory.record(inventory.FETCHED, fetched, configuration)
+
+
+def __query_request_from(
+    query, experiment_configuration: Configuration, result_format="table"
+):
     configuration = load_configuration(experiment_configuration)
-    arg_query_options = arg.models.QueryRequestOptions(result_format="table")
+    arg_query_options = arg.models.QueryRequestOptions(
+        result_format=result_format
+    )
     result = QueryRequest(
         query=query,
         subscriptions=[
@@ -56,22 +260,45 @@ def __query_request_from(query, experiment_configuration: Configuration):
     return result
 
 
-def __query_from(resource_type, query) -> str:
-    where = "where type=~'{}'".format(resource_type)
-    if not query:
-        result = "{}".format(where)
-    else:
-        result = "{}| {}".format(where, query)
+def __send_query_request(client, query_request: QueryRequest):
+    # the SDK would decode the whole page at once, the response is streamed
+    # through the pipeline of the client instead so it carries the
+    # credentials and the transport settings
+    pipeline = client._client
+    request = HttpRequest(
+        "POST",
+        pipeline.format_url(RESOURCES_PATH),
+        params={"api-version": client._config.api_version},
+        json=query_request.serialize(),
+    )
+    response = pipeline.send_request(request, stream=True)
+    if response.status_code >= 400:
+        response.read()
+        response.raise_for_status()
+    return response
 
-    return "Resources | {}".format(result)
 
+def __plan_query(configuration: Configuration):
+    if plan.dry_run(configuration):
+        plan.current(configuration).query()
 
-def __to_dicts(table) -> List[dict]:
-    results = []
-    for row in table["rows"]:
-        result = {}
-        for col_index in range(len(table["columns"])):
-            result[table["columns"][col_index]["name"]] = row[col_index]
-        results.append(result)
 
-    return results
+def __raise_query_error(x: SubmissionError):
+    e = x.error
+    if not isinstance(e, HttpResponseError):
+        raise x
+    if e.error:
+        msg = e.error.code
+        if e.error.details:
+            for d in e.error.details:
+                msg += ": " + str(d)
+    else:
+        msg = e.message
+
+    if x.classification == TERMINAL:
+        raise InterruptExecution(msg)
+    raise FailedActivity(
+        "Resource Graph query failed after {} retries: {}".format(
+            x.retries, msg
+        )
+    )
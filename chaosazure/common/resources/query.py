@@ -0,0 +1,260 @@
+import re
+from typing import Iterable, Union
+
+from chaoslib.exceptions import InterruptExecution
+
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+POWER_STATE_COLUMN = "properties.extended.instanceView.powerState.code"
+
+
+def quote(value: str) -> str:
+    """
+    Quote the value as a KQL string literal, escaping it so that it can never
+    end the literal.
+    """
+    escaped = (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("'", "\\'")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+    return "'{}'".format(escaped)
+
+
+class Query:
+    """
+    Resource Graph query built out of typed predicates, the free form filter
+    of an activity and tabular operators.
+
+    A query is immutable, each method returns a new query. Its text, given
+    by `str`, is canonical: the predicates are sorted and the whitespace of
+    the filter outside of its comments and string literals is collapsed,
+    keeping its line breaks, so that queries
+    selecting the same resources are written the same way and may be used as
+    cache keys.
+
+    >>> str(Query("Microsoft.Compute/virtualMachines")
+    ...     .resource_group("rg").zone("1").take(10))
+    "Resources\\n| where type =~ 'microsoft.compute/virtualmachines'
+    and resourceGroup =~ 'rg' and zones has '1'\\n| take 10"
+    """
+
+    __slots__ = ("_table", "_types", "_predicates", "_filter", "_operators")
+
+    def __init__(
+        self,
+        resource_types: Union[str, Iterable[str]] = None,
+        table: str = "Resources",
+    ):
+        if isinstance(resource_types, str):
+            resource_types = [resource_types]
+        self._table = _identifier(table)
+        self._types = tuple(sorted({t.lower() for t in resource_types or []}))
+        self._predicates = ()
+        self._filter = None
+        self._operators = ()
+
+    def resource_group(self, name: str) -> "Query":
+        return self.__where("resourceGroup =~ {}".format(quote(name)))
+
+    def name(self, name: str) -> "Query":
+        return self.__where("name =~ {}".format(quote(name)))
+
+    def ids(self, ids: Iterable[str]) -> "Query":
+        ids = sorted({i.lower() for i in ids})
+        return self.__where(
+            "id in~ ({})".format(", ".join(quote(i) for i in ids))
+        )
+
+    def location(self, location: str) -> "Query":
+        return self.__where("location =~ {}".format(quote(location)))
+
+    def tag(self, key: str, value: str = None) -> "Query":
+        """
+        Resources having the tag, or the tag with that value when given.
+        """
+        column = "tags[{}]".format(quote(key))
+        if value is None:
+            return self.__where("isnotempty({})".format(column))
+        return self.__where("tostring({}) =~ {}".format(column, quote(value)))
+
+    def zone(self, zone: str) -> "Query":
+        return self.__where("zones has {}".format(quote(zone)))
+
+    def power_state(self, state: str) -> "Query":
+        """
+        Virtual machines in that power state, such as `running` or
+        `deallocated`.
+        """
+        if not state.lower().startswith("powerstate/"):
+            state = "PowerState/{}".format(state)
+        return self.__where(
+            "tostring({}) =~ {}".format(POWER_STATE_COLUMN, quote(state))
+        )
+
+    def filter(self, filter: str = None) -> "Query":
+        """
+        Apply the free form filter of an activity, such as
+        `where resourceGroup=='rg' | take 5`, after the predicates.
+        """
+        query = self.__copy()
+        query._filter = _normalize(filter)
+        return query
+
+    def extend(self, name: str, expression: str) -> "Query":
+        """
+        Compute a column named `name` out of the KQL `expression`, such as
+        `tostring(zones[0])`.
+        """
+        return self.__pipe(
+            "extend {} = {}".format(_identifier(name), _normalize(expression))
+        )
+
+    def project(self, *columns: str) -> "Query":
+        return self.__pipe(
+            "project {}".format(", ".join(_identifier(c) for c in columns))
+        )
+
+    def sample(self, count: int) -> "Query":
+        return self.__pipe("sample {}".format(_positive(count)))
+
+    def take(self, count: int) -> "Query":
+        return self.__pipe("take {}".format(_positive(count)))
+
+    def summarize(
+        self,
+        aggregation: str = "count()",
+        by: Iterable[str] = (),
+        name: str = "count",
+    ) -> "Query":
+        """
+        Summarize the resources into a column named `name`, computed by the
+        `aggregation`, such as `count()` or `dcount(location)`, per group of
+        the `by` columns.
+        """
+        operator = "summarize {}={}".format(
+            _identifier(name), _normalize(aggregation)
+        )
+        by = [_identifier(c) for c in by]
+        if by:
+            operator = "{} by {}".format(operator, ", ".join(by))
+        return self.__pipe(operator)
+
+    def __str__(self) -> str:
+        parts = [self._table]
+        predicates = list(self._predicates)
+        if len(self._types) == 1:
+            predicates.insert(0, "type =~ {}".format(quote(self._types[0])))
+        elif self._types:
+            predicates.insert(
+                0,
+                "type in~ ({})".format(
+                    ", ".join(quote(t) for t in self._types)
+                ),
+            )
+        if predicates:
+            parts.append("where {}".format(" and ".join(predicates)))
+        if self._filter:
+            parts.append(self._filter)
+        parts.extend(self._operators)
+        return "\n| ".join(parts)
+
+    def __repr__(self) -> str:
+        return "Query({!r})".format(str(self))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Query) and str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __where(self, predicate: str) -> "Query":
+        query = self.__copy()
+        query._predicates = tuple(sorted(set(self._predicates) | {predicate}))
+        return query
+
+    def __pipe(self, operator: str) -> "Query":
+        query = self.__copy()
+        query._operators = self._operators + (operator,)
+        return query
+
+    def __copy(self) -> "Query":
+        query = Query.__new__(Query)
+        for attribute in Query.__slots__:
+            setattr(query, attribute, getattr(self, attribute))
+        return query
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def _identifier(name: str) -> str:
+    if not IDENTIFIER_PATTERN.match(name or ""):
+        raise InterruptExecution("Invalid KQL column name '{}'".format(name))
+    return name
+
+
+def _positive(count: int) -> int:
+    if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+        raise InterruptExecution(
+            "Expected a positive number of rows, got '{}'".format(count)
+        )
+    return count
+
+
+def _normalize(text: str) -> str:
+    """
+    Strip the text of its leading pipe and collapse its whitespace outside of
+    its comments and string literals, which must all be terminated. Line
+    breaks are kept so a `//` comment never swallows the lines after it.
+    """
+    text = (text or "").strip()
+    if text.startswith("|"):
+        text = text[1:].strip()
+
+    parts, start, i = [], 0, 0
+    while i < len(text):
+        if text.startswith("//", i):
+            end = text.find("\n", i)
+            end = len(text) if end < 0 else end
+        elif text[i] in "'\"" or (
+            text[i] == "@" and text[i + 1 : i + 2] in ("'", '"')
+        ):
+            end = _literal_end(text, i)
+        else:
+            i += 1
+            continue
+        parts.append(_collapse(text[start:i]))
+        parts.append(text[i:end])
+        start = i = end
+    parts.append(_collapse(text[start:]))
+    return "".join(parts)
+
+
+def _literal_end(text: str, start: int) -> int:
+    # verbatim literals, such as @"C:\", have no escapes but doubled quotes
+    verbatim = text[start] == "@"
+    i = start + 1 if verbatim else start
+    delimiter = text[i]
+    i += 1
+    while i < len(text):
+        if text[i] == "\\" and not verbatim:
+            i += 2
+            continue
+        if text[i] == delimiter:
+            if verbatim and text[i + 1 : i + 2] == delimiter:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    raise InterruptExecution(
+        "Unterminated string literal in the filter: {}".format(text)
+    )
+
+
+def _collapse(text: str) -> str:
+    return WHITESPACE_PATTERN.sub(
+        lambda m: "\n" if "\n" in m.group() else " ", text
+    )
@@ -0,0 +1,82 @@
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List, Sequence
+
+
+class Row(MutableMapping):
+    """
+    A Resource Graph result row, read through the column schema it shares
+    with all the rows of its page rather than carrying its own copy of the
+    column names.
+
+    A row behaves as a dictionary. It is only turned into one, for good, the
+    first time it is changed.
+    """
+
+    __slots__ = ("_columns", "_values", "_data")
+
+    def __init__(self, columns: Dict[str, int], values: Sequence[Any]):
+        self._columns = columns
+        self._values = values
+        self._data = None
+
+    def __getitem__(self, key: str) -> Any:
+        if self._data is not None:
+            return self._data[key]
+        return self._values[self._columns[key]]
+
+    def __setitem__(self, key: str, value: Any):
+        self.__materialize()[key] = value
+
+    def __delitem__(self, key: str):
+        del self.__materialize()[key]
+
+    def __contains__(self, key: object) -> bool:
+        if self._data is not None:
+            return key in self._data
+        return key in self._columns
+
+    def __iter__(self) -> Iterator[str]:
+        if self._data is not None:
+            return iter(self._data)
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        if self._data is not None:
+            return len(self._data)
+        return len(self._columns)
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+    def copy(self) -> Dict[str, Any]:
+        if self._data is not None:
+            return dict(self._data)
+        return dict(zip(self._columns, self._values))
+
+    def __materialize(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = dict(zip(self._columns, self._values))
+            self._values = None
+        return self._data
+
+
+def to_rows(table: Dict[str, Any]) -> List[Row]:
+    """
+    Rows of a Resource Graph result in the table format, the column names
+    being looked up once for the whole table.
+    """
+    columns = {c["name"]: i for i, c in enumerate(table["columns"])}
+    return [Row(columns, values) for values in table["rows"]]
+
+
+def materialize(value: Any) -> Any:
+    """
+    Turn the rows found in the value, a row itself or lists and dictionaries
+    of them, into plain dictionaries, such as when the value is the output
+    of an activity that ends up in the journal.
+    """
+    if isinstance(value, Mapping):
+        return {k: materialize(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [materialize(v) for v in value]
+    return value
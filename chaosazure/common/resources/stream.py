@@ -0,0 +1,105 @@
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+WHITESPACE = " \t\n\r"
+
+
+def decode_object_array(
+    chunks: Iterable[bytes], fields: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Decode a Resource Graph response in the `objectArray` format while it
+    is being read, yielding the resources of its `data` array one by one.
+
+    The other top level fields of the response, such as the `$skipToken` of
+    the next page, are set into `fields` as they are met, so they are only
+    all known once the response was entirely decoded.
+    """
+    reader = __Reader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "data":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.next()
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.next() == "]":
+                        break
+        else:
+            fields[key] = reader.value()
+
+        if reader.next() == "}":
+            return
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+class __Reader:
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        # the part of the buffer that was decoded already is dropped
+        for chunk in self.chunks:
+            if chunk:
+                self.buffer = self.buffer[self.position :] + self.text.decode(
+                    chunk
+                )
+                self.position = 0
+                return True
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                raise ValueError("Unexpected end of the Resource Graph result")
+
+    def next(self) -> str:
+        character = self.peek()
+        self.position += 1
+        return character
+
+    def expect(self, character: str):
+        if self.next() != character:
+            raise ValueError(
+                "Unexpected Resource Graph result at offset {}".format(
+                    self.position
+                )
+            )
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # a number ending the buffer may go on in the next chunk
+            if end < len(self.buffer) or self.eof or not self.fill():
+                self.position = end
+                return value
@@ -0,0 +1,224 @@
+import logging
+import threading
+import time
+from collections.abc import Sized
+from typing import Any, Dict, Iterable, Iterator
+
+from chaoslib.exceptions import InterruptExecution
+from chaoslib.types import Configuration
+
+from chaosazure.common import plan, quota
+
+logger = logging.getLogger("chaostoolkit")
+
+STRATEGIES = ["rate", "linear", "waves"]
+SETTINGS = {
+    "rate": {"strategy", "per_second"},
+    "linear": {"strategy", "start", "end", "duration"},
+    "waves": {"strategy", "size", "pause"},
+}
+
+__lock = threading.Lock()
+__buckets = {}
+
+
+class Schedule:
+    """
+    Pace of the operations of an activity on its targets. Without a schedule
+    the operations are sent as fast as they can be, otherwise the schedule
+    looks like one of:
+
+    * `{"strategy": "rate", "per_second": 2}`: a steady rate of operations
+    * `{"strategy": "linear", "start": 0.1, "end": 2, "duration": 300}`: a
+      rate growing linearly from `start` to `end` operations per second over
+      `duration` seconds, and steady afterwards. `start` defaults to a tenth
+      of `end`
+    * `{"strategy": "waves", "size": 10, "pause": 60}`: `size` operations
+      at once every `pause` seconds
+
+    Whatever the schedule, the operations of all the scheduled activities
+    stay under the ARM write limit of the subscription, see
+    `chaosazure.common.quota.write_limit`. Once the remaining writes ARM
+    reports fall to the reserve of `chaosazure.common.quota.write_budget`,
+    the operations are slowed down to that limit. The writes of unscheduled
+    activities are only slowed down from then on, by
+    `chaosazure.common.quota.QuotaPolicy`.
+
+    In dry-run mode, nothing is waited for but the time the schedule would
+    take is added to the plan of the activity.
+    """
+
+    def __init__(
+        self,
+        schedule: Dict[str, Any] = None,
+        configuration: Configuration = None,
+    ):
+        self.configuration = configuration
+        self.strategy = None
+        self.settings = {}
+        if schedule:
+            strategy = schedule.get("strategy")
+            if strategy not in STRATEGIES:
+                raise InterruptExecution(
+                    "Unknown schedule strategy '{}', expected one of {}".format(
+                        strategy, STRATEGIES
+                    )
+                )
+            unknown = set(schedule) - SETTINGS[strategy]
+            if unknown:
+                raise InterruptExecution(
+                    "Unknown schedule settings: {}".format(sorted(unknown))
+                )
+            self.strategy = strategy
+            self.settings = {
+                k: _positive(k, v)
+                for k, v in schedule.items()
+                if k != "strategy"
+            }
+            missing = SETTINGS[strategy] - {"strategy"} - set(self.settings)
+            if strategy == "linear":
+                missing -= {"start"}
+            if missing:
+                raise InterruptExecution(
+                    "Schedule strategy '{}' requires {}".format(
+                        strategy, sorted(missing)
+                    )
+                )
+
+        self.dry_run = plan.dry_run(configuration)
+        self.subscription_id = quota.subscription_id(configuration)
+        self.bucket = None
+        if self.strategy is not None and not self.dry_run:
+            self.bucket = _bucket(self.subscription_id, configuration)
+        self.sent = 0
+        self.started = None
+        self.due = 0.0
+        self.skipped = 0.0
+
+    def paced(self, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        Yield the items as their operation is due. A sized collection of
+        items first goes through the preflight check of the write budget,
+        see `chaosazure.common.quota.preflight`.
+        """
+        if isinstance(items, Sized) and not self.dry_run:
+            quota.preflight(len(items), self.configuration)
+        for item in items:
+            self.wait()
+            yield item
+
+    def wait(self):
+        """
+        Wait until the next operation is due.
+        """
+        if self.started is None:
+            self.started = self.now()
+
+        self.due = self.__next_due()
+        self.sleep(self.started + self.due - self.now())
+        if self.bucket is not None:
+            observed_at = quota.quota(self.subscription_id).writes_at
+            if observed_at is not None:
+                self.bucket.observe(
+                    quota.write_budget(self.configuration), observed_at
+                )
+            self.sleep(self.bucket.acquire())
+        self.sent += 1
+
+    def now(self) -> float:
+        return time.monotonic() + self.skipped
+
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        if self.dry_run:
+            self.skipped += seconds
+            plan.current(self.configuration).pace(seconds)
+            return
+        time.sleep(seconds)
+
+    def __next_due(self) -> float:
+        # seconds after the first operation the next one is due
+        if self.sent == 0 or self.strategy is None:
+            return self.due
+
+        if self.strategy == "rate":
+            return self.sent / self.settings["per_second"]
+
+        if self.strategy == "waves":
+            if self.sent % int(self.settings["size"]):
+                return self.due
+            return self.due + self.settings["pause"]
+
+        # the rate at the previous operation sets the gap to the next one
+        end = self.settings["end"]
+        start = self.settings.get("start", end / 10)
+        progress = min(1.0, self.due / self.settings["duration"])
+        return self.due + 1 / (start + (end - start) * progress)
+
+
+class WriteBucket:
+    """
+    Token bucket of the ARM writes of a subscription, `limit` writes an hour
+    with bursts of up to `limit` writes.
+    """
+
+    def __init__(self, limit: int):
+        self.capacity = float(limit)
+        self.tokens = float(limit)
+        self.refill = limit / 3600.0
+        self.updated = time.monotonic()
+        self.observed_at = None
+        self._lock = threading.Lock()
+
+    def observe(self, budget: int, observed_at: float):
+        """
+        Bring the bucket down to the write `budget` ARM reported at
+        `observed_at`, unless it already knew of a later report.
+        """
+        with self._lock:
+            if self.observed_at is None or observed_at > self.observed_at:
+                self.observed_at = observed_at
+                self.tokens = min(self.tokens, float(budget))
+
+    def acquire(self) -> float:
+        """
+        Take a write out of the bucket and return the seconds to wait for
+        before sending it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.refill,
+            )
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def _positive(name: str, value: Any) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        value = 0
+    if value <= 0:
+        raise InterruptExecution(
+            "Schedule setting '{}' must be a positive number".format(name)
+        )
+    return value
+
+
+def _bucket(subscription_id: str, configuration: Configuration) -> WriteBucket:
+    limit = quota.write_limit(configuration)
+    key = (subscription_id, limit)
+    with __lock:
+        bucket = __buckets.get(key)
+        if bucket is None:
+            bucket = __buckets[key] = WriteBucket(limit)
+    return bucket
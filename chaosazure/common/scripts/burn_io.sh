@@ -1,13 +1,36 @@
 #Script for BurnIO Chaos Monkey
 
-cat << EOF > /tmp/loop.sh
+# Runs $queue_depth concurrent writers of ${block_size} blocks for $duration
+# seconds, bypassing the page cache when $direct is 1, and reports the
+# achieved write throughput.
+block_size=${block_size:-32K}
+queue_depth=${queue_depth:-1}
+oflag=""
+if [ "$direct" = "1" ]; then
+    oflag="oflag=direct"
+fi
+
+cat << EOF2 > /tmp/loop.sh
 while [ true ];
 do
-    sudo dd if=/dev/urandom of=/root/burn bs=32K count=1024 iflag=fullblock
+    sudo dd if=/dev/urandom of=/root/burn.\$1 bs=$block_size count=1024 \
+        iflag=fullblock $oflag 2>> /tmp/burn_io.\$1.log
 done
-EOF
+EOF2
 
 chmod +x /tmp/loop.sh
-timeout --preserve-status $duration /tmp/loop.sh
-sudo rm /root/burn
-sudo rm /tmp/loop.sh
\ No newline at end of file
+echo "Burning IO with $queue_depth writers of $block_size blocks for $duration seconds."
+
+pids=""
+worker=0
+while [ $worker -lt $queue_depth ]; do
+    timeout --preserve-status $duration /tmp/loop.sh $worker & pids="$pids $!"
+    worker=$((worker + 1))
+done
+wait $pids
+
+written=$(cat /tmp/burn_io.*.log | awk '/bytes/{s+=$1} END {print s+0}')
+echo "Achieved write throughput: $((written / duration / 1048576)) MiB/s"
+
+sudo rm -f /root/burn.*
+sudo rm -f /tmp/loop.sh /tmp/burn_io.*.log
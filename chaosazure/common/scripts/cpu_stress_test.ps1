@@ -1,18 +1,28 @@
-Param([parameter(mandatory=$true)] [int]$duration)
+Param([parameter(mandatory=$true)] [int]$duration,
+[parameter(mandatory=$false)] [int]$load = 100)
 
 $CPUs = (Get-WMIObject win32_processor | Measure-Object NumberofLogicalProcessors -sum).sum
-Write-Output "Stressing $Cpus CPUs for $duration seconds."
+Write-Output "Stressing $Cpus CPUs at $load% for $duration seconds."
 
 ForEach ($Number in 1..$CPUs){
     Start-Job -ScriptBlock{
-        param ($duration)
+        param ($duration, $load)
         $stopwatch =  [system.diagnostics.stopwatch]::StartNew()
         $result = 1;
         while ($stopwatch.Elapsed.TotalSeconds -lt $duration) {
-            $result = $result * $number
+            $slice = [system.diagnostics.stopwatch]::StartNew()
+            while ($slice.ElapsedMilliseconds -lt $load) {
+                $result = $result * $number
+            }
+            if ($load -lt 100) {
+                Start-Sleep -Milliseconds (100 - $load)
+            }
         }
-    } -Arg $duration
+    } -Arg $duration, $load
 
 }
 
-Get-Job | Wait-Job
\ No newline at end of file
+$Sample = Get-Counter '\Processor(_Total)\% Processor Time' -SampleInterval 1 -MaxSamples 3
+Get-Job | Wait-Job
+$Achieved = ($Sample.CounterSamples | Measure-Object CookedValue -Average).Average
+Write-Output ("Achieved CPU load: {0:N0}%" -f $Achieved)
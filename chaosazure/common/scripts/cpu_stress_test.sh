@@ -1,13 +1,53 @@
-# get CPU counts
-cpus=$(cat /proc/cpuinfo | awk "/^processor/{print $3}" | wc -l)
+# Script for CPU stress Chaos Monkey
+
+# Starts one worker per core, each one keeping its core busy ${load}% of
+# the time for $duration seconds, and reports the achieved load.
+load=${load:-100}
+cpus=$(nproc 2>/dev/null || grep -c ^processor /proc/cpuinfo)
 pids=""
-echo "Stressing $cpus CPUs for $duration seconds."
-trap 'for p in $pids; do kill $p; done' 0
-
-for i in $cpus
-do
-    while :
-        do :
-        done & pids="$pids $!";
+echo "Stressing $cpus CPUs at ${load}% for $duration seconds."
+trap 'for p in $pids; do kill $p 2>/dev/null; done' 0
+
+read_cpu() {
+    awk '/^cpu /{idle=$5+$6; total=0; for (i=2; i<=NF; i++) total+=$i;
+         print total, idle}' /proc/stat
+}
+
+worker() {
+    if [ "$load" -ge 100 ]; then
+        while :; do :; done
+    fi
+    period=100000000
+    busy=$((period * load / 100))
+    idle=$(printf '0.%09d' $((period - busy)))
+    # times the busy loop once to know how many rounds fill a busy slice,
+    # so that the slices spin without forking
+    spins=100000
+    start=$(date +%s%N)
+    i=0
+    while [ $i -lt $spins ]; do i=$((i + 1)); done
+    spins=$((spins * busy / ($(date +%s%N) - start + 1)))
+    while :; do
+        i=0
+        while [ $i -lt $spins ]; do i=$((i + 1)); done
+        sleep "$idle"
+    done
+}
+
+set -- $(read_cpu)
+total_before=$1
+idle_before=$2
+
+cpu=0
+while [ $cpu -lt $cpus ]; do
+    worker & pids="$pids $!"
+    cpu=$((cpu + 1))
 done
 sleep $duration
+
+set -- $(read_cpu)
+total=$(($1 - total_before))
+idle=$(($2 - idle_before))
+if [ $total -gt 0 ]; then
+    echo "Achieved CPU load: $((100 * (total - idle) / total))%"
+fi
@@ -1,6 +1,41 @@
 # Script for NetworkLatency Chaos Monkey
 
-# Adds ${delay}ms +- ${jitter}ms of latency to each packet for $duration seconds
-sudo tc qdisc add dev eth0 root netem delay ${delay}ms ${jitter}ms
+# Adds ${delay}ms +- ${jitter}ms of latency to each packet for $duration
+# seconds on every network interface, or only on the comma separated
+# $interface list. When $cidr is set, only the traffic towards these comma
+# separated networks is delayed.
+if [ -n "$interface" ]; then
+    interfaces=$(echo "$interface" | tr ',' ' ')
+else
+    interfaces=$(ls /sys/class/net | grep -v '^lo$')
+fi
+
+cleanup() {
+    for nic in $interfaces; do
+        sudo tc qdisc del dev $nic root 2>/dev/null
+    done
+}
+trap cleanup 0
+
+for nic in $interfaces; do
+    if [ -n "$cidr" ]; then
+        sudo tc qdisc add dev $nic root handle 1: prio
+        sudo tc qdisc add dev $nic parent 1:3 handle 30: \
+            netem delay ${delay}ms ${jitter}ms
+        for network in $(echo "$cidr" | tr ',' ' '); do
+            sudo tc filter add dev $nic protocol ip parent 1:0 prio 3 \
+                u32 match ip dst $network flowid 1:3
+        done
+        echo "Delaying traffic to $cidr on $nic by ${delay}ms +- ${jitter}ms."
+    else
+        sudo tc qdisc add dev $nic root netem delay ${delay}ms ${jitter}ms
+        echo "Delaying traffic on $nic by ${delay}ms +- ${jitter}ms."
+    fi
+done
+
 sleep $duration
-sudo tc qdisc del dev eth0 root
+
+for nic in $interfaces; do
+    delayed=$(tc -s qdisc show dev $nic | awk '/netem/{getline; print $4}')
+    echo "Delayed packets on $nic: ${delayed:-0}"
+done
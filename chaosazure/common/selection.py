@@ -0,0 +1,216 @@
+import logging
+import math
+import random
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List
+
+from chaoslib.exceptions import InterruptExecution
+
+logger = logging.getLogger("chaostoolkit")
+
+STRATEGIES = [
+    "all",
+    "random",
+    "one-per-group",
+    "count-per-group",
+    "percentage-per-group",
+    "entire-group",
+]
+
+# Where each grouping key may be found, both in Resource Graph rows and in
+# the dictionaries of the SDK models
+GROUP_KEY_PATHS = {
+    "zone": [["zones"]],
+    "fault_domain": [
+        ["platform_fault_domain"],
+        ["instance_view", "platform_fault_domain"],
+        ["properties", "platformFaultDomain"],
+        ["properties", "instanceView", "platformFaultDomain"],
+    ],
+    "update_domain": [
+        ["platform_update_domain"],
+        ["instance_view", "platform_update_domain"],
+        ["properties", "instanceView", "platformUpdateDomain"],
+    ],
+    "resource_group": [["resourceGroup"], ["resource_group"]],
+    "location": [["location"]],
+}
+
+
+def select_targets(
+    candidates: Iterable[dict], selection: Dict[str, Any] = None
+) -> List[dict]:
+    """
+    Apply a selection, as given to an activity, to the candidates. Without
+    a selection every candidate is kept.
+
+    A selection looks like:
+    ```json
+    {
+        "strategy": "percentage-per-group",
+        "group_by": "zone",
+        "percentage": 50,
+        "seed": 42
+    }
+    ```
+    """
+    if not selection:
+        return list(candidates)
+
+    unknown = set(selection) - {
+        "strategy",
+        "group_by",
+        "count",
+        "percentage",
+        "group",
+        "seed",
+    }
+    if unknown:
+        raise InterruptExecution(
+            "Unknown selection settings: {}".format(sorted(unknown))
+        )
+
+    return select(candidates, **selection)
+
+
+def select(
+    candidates: Iterable[dict],
+    strategy: str = "all",
+    group_by: str = None,
+    count: int = None,
+    percentage: float = None,
+    group: str = None,
+    seed: int = None,
+) -> List[dict]:
+    """
+    Select targets among the candidates, in a single pass over them.
+
+    Candidates may be grouped by `zone`, `fault_domain`, `update_domain`,
+    `resource_group`, `location` or a tag with `tag:<name>`. Strategies are:
+
+    * `all`: every candidate
+    * `random`: `count` candidates, or `percentage` of them, at random
+    * `one-per-group`: one candidate at random in each group
+    * `count-per-group`: `count` candidates at random in each group
+    * `percentage-per-group`: `percentage` of each group at random
+    * `entire-group`: every candidate of the `group`, or of a group picked
+      at random when it is omitted, e.g. to simulate a zone outage
+
+    Passing a `seed` makes the selection reproducible.
+    """
+    if strategy not in STRATEGIES:
+        raise InterruptExecution(
+            "Unknown selection strategy '{}', expected one of {}".format(
+                strategy, STRATEGIES
+            )
+        )
+
+    rng = random.Random(seed)
+    if strategy == "all":
+        return list(candidates)
+
+    if strategy == "random":
+        return __sample(list(candidates), count, percentage, rng)
+
+    if not group_by:
+        raise InterruptExecution(
+            "Selection strategy '{}' requires 'group_by'".format(strategy)
+        )
+
+    if strategy in ("one-per-group", "count-per-group"):
+        size = 1 if strategy == "one-per-group" else count
+        if not size or size < 0:
+            raise InterruptExecution("A positive 'count' is required")
+        reservoirs = {}
+        for candidate in candidates:
+            key = group_key(candidate, group_by)
+            reservoir = reservoirs.setdefault(key, [0, []])
+            __reservoir_add(reservoir, candidate, size, rng)
+        return [c for _, picked in reservoirs.values() for c in picked]
+
+    if strategy == "entire-group" and group is not None:
+        return [c for c in candidates if group_key(c, group_by) == str(group)]
+
+    groups = {}
+    for candidate in candidates:
+        groups.setdefault(group_key(candidate, group_by), []).append(candidate)
+
+    if strategy == "entire-group":
+        if not groups:
+            return []
+        choice = rng.choice(sorted(groups))
+        logger.debug("Selected {} '{}'".format(group_by, choice))
+        return groups[choice]
+
+    if percentage is None:
+        raise InterruptExecution("A 'percentage' is required")
+    return [
+        c
+        for members in groups.values()
+        for c in __sample(members, None, percentage, rng)
+    ]
+
+
+def group_key(candidate: dict, group_by: str) -> str:
+    """
+    Value of the grouping key of a candidate, as a string. Candidates
+    lacking the key, such as regional resources when grouping by zone, all
+    belong to the empty group.
+    """
+    if group_by.startswith("tag:"):
+        tags = candidate.get("tags") or {}
+        value = tags.get(group_by[len("tag:") :])
+    elif group_by in GROUP_KEY_PATHS:
+        value = None
+        for path in GROUP_KEY_PATHS[group_by]:
+            value = __lookup(candidate, path)
+            if value is not None:
+                break
+    else:
+        raise InterruptExecution(
+            "Unknown selection grouping key '{}'".format(group_by)
+        )
+
+    if isinstance(value, list):
+        value = value[0] if value else None
+
+    return "" if value is None else str(value)
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __lookup(candidate: dict, path: List[str]):
+    value = candidate
+    for key in path:
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(key)
+
+    return value
+
+
+def __reservoir_add(reservoir, candidate, size, rng):
+    seen, picked = reservoir
+    seen += 1
+    if len(picked) < size:
+        picked.append(candidate)
+    else:
+        index = rng.randrange(seen)
+        if index < size:
+            picked[index] = candidate
+    reservoir[0] = seen
+
+
+def __sample(members, count, percentage, rng) -> List[dict]:
+    if count is None and percentage is None:
+        raise InterruptExecution("A 'count' or a 'percentage' is required")
+
+    if count is None:
+        if not 0 < percentage <= 100:
+            raise InterruptExecution(
+                "Percentage must be within ]0, 100], got {}".format(percentage)
+            )
+        count = math.ceil(len(members) * percentage / 100)
+
+    return rng.sample(members, min(count, len(members)))
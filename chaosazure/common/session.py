@@ -0,0 +1,60 @@
+import contextlib
+import functools
+import json
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator
+
+__active = ContextVar("chaosazure_session", default=None)
+__lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def session() -> Iterator[Dict[Any, Any]]:
+    """
+    Share the clients, and so their credentials along with the tokens they
+    cached, made by the `init_*` functions of `chaosazure` while the
+    session is open, such as across the samples of a watch. Outside of a
+    session, each call makes a new client.
+    """
+    clients = {}
+    token = __active.set(clients)
+    try:
+        yield clients
+    finally:
+        __active.reset(token)
+
+
+def reused(init: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Make the `init` function of a client return the client it already made
+    for the same secrets and configuration within the current session.
+    """
+
+    @functools.wraps(init)
+    def wrapper(experiment_secrets, experiment_configuration=None):
+        clients = __active.get()
+        if clients is None:
+            return init(experiment_secrets, experiment_configuration)
+
+        key = (
+            init.__name__,
+            _key(experiment_secrets),
+            _key(experiment_configuration),
+        )
+        with __lock:
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = init(
+                    experiment_secrets, experiment_configuration
+                )
+        return client
+
+    return wrapper
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def _key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
@@ -0,0 +1,195 @@
+import logging
+import os
+import random
+import time
+from typing import Any, Callable, NamedTuple
+
+from azure.core.exceptions import (
+    HttpResponseError,
+    ServiceRequestError,
+    ServiceResponseError,
+)
+from chaoslib.exceptions import ChaosException, FailedActivity
+from chaoslib.types import Configuration
+
+logger = logging.getLogger("chaostoolkit")
+
+RETRYABLE = "retryable"
+QUOTA = "quota"
+TERMINAL = "terminal"
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BUDGET = 300
+BASE_DELAY = 1.0
+MAX_DELAY = 30.0
+
+RETRYABLE_STATUS_CODES = [408, 429]
+RETRYABLE_ERROR_CODES = [
+    "AnotherOperationInProgress",
+    "OperationPreempted",
+    "RetryableError",
+]
+# responses the retry policy of the SDK clients already retried by itself,
+# those of any request with a Retry-After header being retried too
+SDK_RETRIED_METHODS = ["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE"]
+SDK_RETRIED_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+QUOTA_ERROR_CODES = [
+    "QuotaExceeded",
+    "ResourceQuotaExceeded",
+    "OperationNotAllowedQuotaExceeded",
+]
+
+
+class Submission(NamedTuple):
+    """
+    Result of a call made through `submit` and the number of times it was
+    retried before succeeding.
+    """
+
+    result: Any
+    retries: int
+
+
+class SubmissionError(FailedActivity):
+    """
+    A call made through `submit` failed, either on a terminal or a quota
+    error or because it was still failing once out of attempts or budget.
+    """
+
+    def __init__(self, error: Exception, classification: str, retries: int):
+        super().__init__(
+            "{} error after {} retries: {}".format(
+                classification, retries, error
+            )
+        )
+        self.error = error
+        self.classification = classification
+        self.retries = retries
+
+
+def classify(error: Exception) -> str:
+    """
+    Classify an error raised by the Azure SDK as `retryable`, `quota` or
+    `terminal`.
+
+    Throttling (429), timeouts (408), server errors (5xx), connection
+    failures and conflicts with an operation already in progress are
+    retryable. Exhausted quotas are told apart from the other terminal
+    errors as retrying them will not help either.
+    """
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        return RETRYABLE
+
+    if not isinstance(error, HttpResponseError):
+        return TERMINAL
+
+    code = error.error.code if error.error else None
+    message = str(error)
+    if code in QUOTA_ERROR_CODES or (
+        code == "OperationNotAllowed" and "quota" in message.lower()
+    ):
+        return QUOTA
+
+    status = error.status_code or 0
+    if status in RETRYABLE_STATUS_CODES or status >= 500:
+        return RETRYABLE
+
+    if code in RETRYABLE_ERROR_CODES or any(
+        c in message for c in RETRYABLE_ERROR_CODES
+    ):
+        return RETRYABLE
+
+    return TERMINAL
+
+
+def retry_budget(configuration: Configuration = None) -> float:
+    """
+    Monotonic deadline until which failed calls may be retried, read as a
+    number of seconds from the `azure_retry_budget` configuration or the
+    `AZURE_RETRY_BUDGET` environment variable. Defaults to 300 seconds.
+
+    The deadline is meant to be shared by all the calls of an activity.
+    """
+    seconds = (configuration or {}).get(
+        "azure_retry_budget",
+        os.getenv("AZURE_RETRY_BUDGET", DEFAULT_RETRY_BUDGET),
+    )
+    return time.monotonic() + float(seconds)
+
+
+def submit(
+    call: Callable[..., Any],
+    *args,
+    deadline: float = None,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    **kwargs,
+) -> Submission:
+    """
+    Call `call(*args, **kwargs)`, typically a `begin_*` operation, retrying
+    it on retryable errors with a jittered exponential backoff for up to
+    `max_attempts` attempts, as long as the next attempt starts before the
+    `deadline` given by `retry_budget`.
+
+    The errors the retry policy of the SDK client retried already, the
+    throttled responses with a `Retry-After` header and the failures of
+    idempotent requests, are not retried once more so that the attempts of
+    both never multiply. What is left to `submit` is mostly the failures of
+    the `POST` requests starting operations or querying Resource Graph, and
+    the conflicts with an operation in progress.
+
+    The mutating calls of the actions all go through `submit`, except the
+    ETag-guarded updates of `delete_routes`, which retry their conflicts
+    themselves, the `run_command` invocations, see
+    `chaosazure.common.compute.command.submit`, and the SQL statements of
+    `delete_tables`.
+
+    Raise `SubmissionError` carrying the last error, its classification and
+    the number of retries. The chaostoolkit exceptions, such as an
+    `InterruptExecution`, are raised unchanged.
+    """
+    retries = 0
+    while True:
+        try:
+            return Submission(call(*args, **kwargs), retries)
+        except ChaosException:
+            raise
+        except Exception as x:
+            classification = classify(x)
+            if (
+                classification != RETRYABLE
+                or __retried_by_sdk(x)
+                or retries + 1 >= max_attempts
+            ):
+                raise SubmissionError(x, classification, retries) from x
+
+            delay = __backoff(retries)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise SubmissionError(x, classification, retries) from x
+
+            retries += 1
+            logger.debug(
+                "Retrying in {:.1f}s, attempt {}: {}".format(
+                    delay, retries + 1, x
+                )
+            )
+            time.sleep(delay)
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __retried_by_sdk(error: Exception) -> bool:
+    response = getattr(error, "response", None)
+    if not isinstance(error, HttpResponseError) or response is None:
+        return False
+    if response.headers and response.headers.get("Retry-After"):
+        return True
+    method = str(getattr(response.request, "method", "")).upper()
+    return (
+        method in SDK_RETRIED_METHODS
+        and error.status_code in SDK_RETRIED_STATUS_CODES
+    )
+
+
+def __backoff(retries: int) -> float:
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2**retries))
@@ -0,0 +1,125 @@
+import logging
+import os
+import threading
+from typing import Any, Dict
+
+import requests
+from azure.core.pipeline.transport import RequestsTransport
+from chaoslib.types import Configuration
+from urllib3.util.retry import Retry
+
+from chaosazure.common.concurrency import max_concurrency
+from chaosazure.common.quota import QuotaPolicy
+
+logger = logging.getLogger("chaostoolkit")
+
+DEFAULT_POOL_SIZE = 10
+
+# configuration key, azure-core keyword and type of the retry settings
+RETRY_SETTINGS = [
+    ("azure_retry_total", "retry_total", int),
+    ("azure_retry_backoff_factor", "retry_backoff_factor", float),
+    ("azure_retry_backoff_max", "retry_backoff_max", int),
+]
+
+__lock = threading.Lock()
+__transports = {}
+
+
+def transport_options(configuration: Configuration = None) -> Dict[str, Any]:
+    """
+    Keyword arguments tuning the HTTP transport of the Azure SDK clients, read
+    from the experiment configuration or the matching environment variables:
+
+    * `azure_connection_pool_size`: the number of connections kept open to
+      each host, defaults to the `azure_max_concurrency` with a minimum of 10
+      so that concurrent calls are not serialized by the pool
+    * `azure_connection_timeout` and `azure_read_timeout`: in seconds
+    * `azure_keep_alive`: set it to `false` to close the connections after
+      each request
+    * `azure_retry_total`, `azure_retry_backoff_factor` and
+      `azure_retry_backoff_max`: the retry policy of the SDK itself
+    * `azure_proxy`: the URL of the proxy of all the requests, or a mapping
+      of the scheme to the URL of its proxy
+
+    The clients created with the same settings share a single transport and
+    therefore its connection pool. They all report the remaining ARM
+    requests of the subscription to `chaosazure.common.quota`.
+    """
+    configuration = configuration or {}
+
+    def setting(key: str, default: Any = None) -> Any:
+        return configuration.get(key, os.getenv(key.upper(), default))
+
+    pool_size = int(
+        setting(
+            "azure_connection_pool_size",
+            max(DEFAULT_POOL_SIZE, max_concurrency(configuration)),
+        )
+    )
+    keep_alive = str(setting("azure_keep_alive", True)).lower() not in (
+        "false",
+        "0",
+        "no",
+    )
+    timeouts = {}
+    for key, keyword in [
+        ("azure_connection_timeout", "connection_timeout"),
+        ("azure_read_timeout", "read_timeout"),
+    ]:
+        value = setting(key)
+        if value is not None:
+            timeouts[keyword] = float(value)
+
+    options = {
+        "transport": __transport(
+            max(1, pool_size), keep_alive, tuple(sorted(timeouts.items()))
+        ),
+        "per_retry_policies": [QuotaPolicy(configuration)],
+    }
+
+    for key, keyword, cast in RETRY_SETTINGS:
+        value = setting(key)
+        if value is not None:
+            options[keyword] = cast(value)
+
+    proxy = setting("azure_proxy")
+    if proxy:
+        if isinstance(proxy, str):
+            proxy = {"http": proxy, "https": proxy}
+        options["proxies"] = dict(proxy)
+
+    return options
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __transport(pool_size: int, keep_alive: bool, timeouts: tuple):
+    key = (pool_size, keep_alive, timeouts)
+    with __lock:
+        transport = __transports.get(key)
+        if transport is None:
+            logger.debug(
+                "Creating HTTP transport: pool size={}, keep-alive={}, "
+                "timeouts={}".format(pool_size, keep_alive, dict(timeouts))
+            )
+            session = requests.Session()
+            # retries are left to the policy of the SDK, as it does itself
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+                max_retries=Retry(
+                    total=False, redirect=False, raise_on_status=False
+                ),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            if not keep_alive:
+                session.headers["Connection"] = "close"
+            transport = RequestsTransport(
+                session=session, session_owner=False, **dict(timeouts)
+            )
+            __transports[key] = transport
+
+    return transport
@@ -0,0 +1,12 @@
+CHANGES_QUERY = """resourcechanges
+| extend targetResourceId = tolower(tostring(properties.targetResourceId)),
+    changeType = tostring(properties.changeType),
+    changeTime = todatetime(properties.changeAttributes.timestamp)
+| where changeTime >= datetime({since})
+    and targetResourceId in ({ids})
+| project targetResourceId, changeType, changeTime,
+    changes = properties.changes
+| order by changeTime asc"""
+
+# keep the queries well under the Resource Graph query length limit
+CHANGES_QUERY_BATCH_SIZE = 200
@@ -0,0 +1,106 @@
+import logging
+from typing import Any, Dict, List
+
+from chaoslib import Configuration, Secrets
+
+from chaosazure.common import inventory
+from chaosazure.common.plan import scoped
+from chaosazure.common.resources.graph import query_resources_many
+from chaosazure.common.resources.query import quote
+from chaosazure.inventory.constants import (
+    CHANGES_QUERY,
+    CHANGES_QUERY_BATCH_SIZE,
+)
+
+__all__ = ["describe_inventory", "describe_inventory_changes"]
+logger = logging.getLogger("chaostoolkit")
+
+
+@scoped
+def describe_inventory(
+    event: str = None,
+    activity: str = None,
+    resource_type: str = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+) -> List[Dict[str, Any]]:
+    """
+    Describe the resources recorded in the inventory, the latest entry of
+    each of them. The inventory is enabled with the `azure_inventory_path`
+    configuration.
+
+    Parameters
+    ----------
+    event : str, optional
+        Either `fetched` or `acted`, all the resources are described when
+        omitted.
+    activity : str, optional
+        Only describe the resources acted upon by that activity, such as
+        `stop_machines`.
+    resource_type : str, optional
+        Only describe the resources of that type, such as
+        `Microsoft.Compute/virtualMachines`.
+    """
+    logger.debug(
+        "Start describe_inventory: event='{}', activity='{}'".format(
+            event, activity
+        )
+    )
+
+    return inventory.load(configuration, event, activity, resource_type)
+
+
+@scoped
+def describe_inventory_changes(
+    event: str = inventory.ACTED,
+    activity: str = None,
+    resource_type: str = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+) -> List[Dict[str, Any]]:
+    """
+    Describe the changes the resources recorded in the inventory went
+    through since they were first recorded, as reported by the Resource
+    Graph `resourcechanges` table. Only the recorded resources are looked
+    up rather than the whole subscription, in batches queried
+    concurrently.
+
+    Parameters
+    ----------
+    event : str, optional
+        Either `fetched` or `acted`, defaults to `acted`.
+    activity : str, optional
+        Only look up the resources acted upon by that activity, such as
+        `stop_machines`.
+    resource_type : str, optional
+        Only look up the resources of that type, such as
+        `Microsoft.Compute/virtualMachines`.
+    """
+    logger.debug(
+        "Start describe_inventory_changes: event='{}', activity='{}'".format(
+            event, activity
+        )
+    )
+
+    entries = inventory.load(configuration, event, activity, resource_type)
+    if not entries:
+        return []
+
+    since = min(e["recorded_at"] for e in entries)
+    ids = sorted({e["id"].lower() for e in entries})
+
+    queries = {
+        i: CHANGES_QUERY.format(
+            since=since,
+            ids=", ".join(
+                quote(r) for r in ids[i : i + CHANGES_QUERY_BATCH_SIZE]
+            ),
+        )
+        for i in range(0, len(ids), CHANGES_QUERY_BATCH_SIZE)
+    }
+    results = query_resources_many(queries, secrets, configuration)
+
+    changes = []
+    for batch_changes in results.values():
+        changes.extend(batch_changes)
+    return changes
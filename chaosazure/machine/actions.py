@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 import logging
+from typing import Any, Dict
 
 from chaoslib.exceptions import FailedActivity
 from chaoslib.types import Configuration, Secrets
 
 from chaosazure import init_compute_management_client
-from chaosazure.common import cleanse
+from chaosazure.common import cleanse, inventory
 from chaosazure.common.compute import command
+from chaosazure.common.plan import scoped
+from chaosazure.common.schedule import Schedule
+from chaosazure.common.selection import select_targets
+from chaosazure.common.submission import retry_budget, submit
 from chaosazure.machine.constants import RES_TYPE_VM
 from chaosazure.common.resources.graph import fetch_resources
 from chaosazure.vmss.records import Records
@@ -24,10 +29,16 @@ __all__ = [
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def delete_machines(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    selection: Dict[str, Any] = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Delete virtual machines at random.
@@ -40,6 +51,23 @@ def delete_machines(
     filter : str, optional
         Filter the virtual machines. If the filter is omitted all machines in
         the subscription will be selected as potential chaos candidates.
+    selection : dict, optional
+        Narrow down the fetched machines by zone, fault domain, update domain
+        or tag, for instance to stop an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    count : int, optional
+        Number of machines to pick at random among the matching ones, sampled
+        by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching machines to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` machines reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -56,28 +84,44 @@ def delete_machines(
     Delete two machines at random from the group 'rg'
     """
     logger.debug(
-        "Start delete_machines: " "configuration='{}', filter='{}'".format(
+        "Start delete_machines: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    machines = __fetch_machines(filter, configuration, secrets)
+    machines = __fetch_machines(
+        filter, configuration, secrets, count, percentage, seed
+    )
+    machines = select_targets(machines, selection)
     client = __compute_mgmt_client(secrets, configuration)
-    machine_records = Records()
-    for m in machines:
+    deadline = retry_budget(configuration)
+    machine_records = Records("delete")
+    for m in Schedule(schedule, configuration).paced(machines):
         group = m["resourceGroup"]
         name = m["name"]
         logger.debug("Deleting machine: {}".format(name))
-        client.virtual_machines.begin_delete(group, name)
+        m["retries"] = submit(
+            client.virtual_machines.begin_delete,
+            group,
+            name,
+            deadline=deadline,
+        ).retries
+        inventory.record(inventory.ACTED, [m], configuration, "delete_machines")
         machine_records.add(cleanse.machine(m))
 
     return machine_records.output_as_dict("resources")
 
 
+@scoped
 def stop_machines(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    selection: Dict[str, Any] = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Stop virtual machines at random.
@@ -87,6 +131,23 @@ def stop_machines(
     filter : str, optional
         Filter the virtual machines. If the filter is omitted all machines in
         the subscription will be selected as potential chaos candidates.
+    selection : dict, optional
+        Narrow down the fetched machines by zone, fault domain, update domain
+        or tag, for instance to stop an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    count : int, optional
+        Number of machines to pick at random among the matching ones, sampled
+        by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching machines to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` machines reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -103,29 +164,45 @@ def stop_machines(
     Stop two machines at random from the group 'mygroup'
     """
     logger.debug(
-        "Start stop_machines: " "configuration='{}', filter='{}'".format(
+        "Start stop_machines: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    machines = __fetch_machines(filter, configuration, secrets)
+    machines = __fetch_machines(
+        filter, configuration, secrets, count, percentage, seed
+    )
+    machines = select_targets(machines, selection)
     client = __compute_mgmt_client(secrets, configuration)
 
+    deadline = retry_budget(configuration)
     machine_records = Records()
-    for m in machines:
+    for m in Schedule(schedule, configuration).paced(machines):
         group = m["resourceGroup"]
         name = m["name"]
         logger.debug("Stopping machine: {}".format(name))
-        client.virtual_machines.begin_power_off(group, name)
+        m["retries"] = submit(
+            client.virtual_machines.begin_power_off,
+            group,
+            name,
+            deadline=deadline,
+        ).retries
+        inventory.record(inventory.ACTED, [m], configuration, "stop_machines")
         machine_records.add(cleanse.machine(m))
 
     return machine_records.output_as_dict("resources")
 
 
+@scoped
 def restart_machines(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    selection: Dict[str, Any] = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Restart virtual machines at random.
@@ -135,6 +212,23 @@ def restart_machines(
     filter : str, optional
         Filter the virtual machines. If the filter is omitted all machines in
         the subscription will be selected as potential chaos candidates.
+    selection : dict, optional
+        Narrow down the fetched machines by zone, fault domain, update domain
+        or tag, for instance to stop an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    count : int, optional
+        Number of machines to pick at random among the matching ones, sampled
+        by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching machines to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` machines reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -151,28 +245,44 @@ def restart_machines(
     Restart two machines at random from the group 'rg'
     """
     logger.debug(
-        "Start restart_machines: " "configuration='{}', filter='{}'".format(
+        "Start restart_machines: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    machines = __fetch_machines(filter, configuration, secrets)
+    machines = __fetch_machines(
+        filter, configuration, secrets, count, percentage, seed
+    )
+    machines = select_targets(machines, selection)
     client = __compute_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     machine_records = Records()
-    for m in machines:
+    for m in Schedule(schedule, configuration).paced(machines):
         group = m["resourceGroup"]
         name = m["name"]
         logger.debug("Restarting machine: {}".format(name))
-        client.virtual_machines.begin_restart(group, name)
+        m["retries"] = submit(
+            client.virtual_machines.begin_restart,
+            group,
+            name,
+            deadline=deadline,
+        ).retries
+        inventory.record(
+            inventory.ACTED, [m], configuration, "restart_machines"
+        )
         machine_records.add(cleanse.machine(m))
 
     return machine_records.output_as_dict("resources")
 
 
+@scoped
 def start_machines(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    selection: Dict[str, Any] = None,
+    from_inventory: bool = False,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Start virtual machines at random. Thought as a rollback action.
@@ -182,6 +292,21 @@ def start_machines(
     filter : str, optional
         Filter the virtual machines. If the filter is omitted all machines in
         the subscription will be selected as potential chaos candidates.
+    selection : dict, optional
+        Narrow down the fetched machines by zone, fault domain, update domain
+        or tag, for instance to stop an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    from_inventory : bool, optional
+        Start the machines `stop_machines` recorded in the inventory during
+        the current run, see `chaosazure.common.inventory.run_id`, rather
+        than looking up the stopped machines matching the filter. Neither
+        Resource Graph nor the machines instance view are queried then.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -204,28 +329,52 @@ def start_machines(
         )
     )
 
-    machines = __fetch_machines(filter, configuration, secrets)
-    client = __compute_mgmt_client(secrets, configuration)
-    stopped_machines = __fetch_all_stopped_machines(client, machines)
+    if from_inventory:
+        stopped_machines = __fetch_stopped_machines_from_inventory(
+            configuration
+        )
+        client = __compute_mgmt_client(secrets, configuration)
+    else:
+        machines = __fetch_machines(filter, configuration, secrets)
+        machines = select_targets(machines, selection)
+        client = __compute_mgmt_client(secrets, configuration)
+        stopped_machines = __fetch_all_stopped_machines(client, machines)
 
+    deadline = retry_budget(configuration)
     machine_records = Records()
-    for machine in stopped_machines:
+    for machine in Schedule(schedule, configuration).paced(stopped_machines):
         logger.debug("Starting machine: {}".format(machine["name"]))
-        client.virtual_machines.begin_start(
-            machine["resourceGroup"], machine["name"]
-        )
+        machine["retries"] = submit(
+            client.virtual_machines.begin_start,
+            machine["resourceGroup"],
+            machine["name"],
+            deadline=deadline,
+        ).retries
 
+        inventory.record(
+            inventory.ACTED, [machine], configuration, "start_machines"
+        )
         machine_records.add(cleanse.machine(machine))
 
     return machine_records.output_as_dict("resources")
 
 
+@scoped
 def stress_cpu(
     filter: str = None,
     duration: int = 120,
     timeout: int = 60,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    async_execution: bool = False,
+    run_command_name: str = None,
+    output_blob_uri: str = None,
+    load: int = 100,
+    selection: Dict[str, Any] = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Stress CPU up to 100% at virtual machines.
@@ -242,6 +391,37 @@ def stress_cpu(
         Additional wait time (in seconds) for stress operation to be completed.
         Getting and sending data from/to Azure may take some time so it's not
         recommended to set this value to less than 30s. Defaults to 60 seconds.
+    async_execution : bool, optional
+        Start the script as a managed run command with asynchronous
+        execution instead of waiting for it on each machine in turn. The
+        run can later be collected with the `describe_run_commands` probe.
+        Defaults to False.
+    run_command_name : str, optional
+        Name of the managed run command when `async_execution` is set.
+        Defaults to a generated name reported in the activity output.
+    output_blob_uri : str, optional
+        URI of a blob container, optionally with a SAS token, the output of
+        the managed run commands is streamed to.
+    load : int, optional
+        Target utilization (in percent) of each core, one worker is started
+        per core. Defaults to 100.
+    selection : dict, optional
+        Narrow down the fetched machines by zone, fault domain, update domain
+        or tag, for instance to stop an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    count : int, optional
+        Number of machines to pick at random among the matching ones, sampled
+        by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching machines to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` machines reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -268,33 +448,46 @@ def stress_cpu(
     )
     logger.debug(msg)
 
-    machines = __fetch_machines(filter, configuration, secrets)
+    machines = __fetch_machines(
+        filter, configuration, secrets, count, percentage, seed
+    )
+    machines = select_targets(machines, selection)
+    client = None
+    if async_execution:
+        run_command_name = run_command_name or command.new_run_command_name()
+        client = __compute_mgmt_client(secrets, configuration)
 
     machine_records = Records()
-    for machine in machines:
+    for machine in Schedule(schedule, configuration).paced(machines):
         command_id, script_content = command.prepare(machine, "cpu_stress_test")
 
         parameters = {
             "command_id": command_id,
             "script": [script_content],
-            "parameters": [{"name": "duration", "value": duration}],
+            "parameters": [
+                {"name": "duration", "value": duration},
+                {"name": "load", "value": load},
+            ],
         }
 
         logger.debug("Stressing CPU of machine: '{}'".format(machine["name"]))
         _timeout = duration + timeout
-        command.run(
-            machine["resourceGroup"],
+        __execute_script(
             machine,
             _timeout,
             parameters,
-            secrets,
+            run_command_name,
+            output_blob_uri,
+            client,
             configuration,
+            secrets,
         )
         machine_records.add(cleanse.machine(machine))
 
     return machine_records.output_as_dict("resources")
 
 
+@scoped
 def fill_disk(
     filter: str = None,
     duration: int = 120,
@@ -303,6 +496,14 @@ def fill_disk(
     path: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    async_execution: bool = False,
+    run_command_name: str = None,
+    output_blob_uri: str = None,
+    selection: Dict[str, Any] = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Fill the disk with random data.
@@ -324,7 +525,34 @@ def fill_disk(
     path : str, optional
         The absolute path to write the fill file into.
         Defaults: C:/burn for Windows clients, /root/burn for Linux clients.
-
+    async_execution : bool, optional
+        Start the script as a managed run command with asynchronous
+        execution instead of waiting for it on each machine in turn. The
+        run can later be collected with the `describe_run_commands` probe.
+        Defaults to False.
+    run_command_name : str, optional
+        Name of the managed run command when `async_execution` is set.
+        Defaults to a generated name reported in the activity output.
+    output_blob_uri : str, optional
+        URI of a blob container, optionally with a SAS token, the output of
+        the managed run commands is streamed to.
+    selection : dict, optional
+        Narrow down the fetched machines by zone, fault domain, update domain
+        or tag, for instance to stop an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    count : int, optional
+        Number of machines to pick at random among the matching ones, sampled
+        by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching machines to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` machines reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -351,10 +579,17 @@ def fill_disk(
     )
     logger.debug(msg)
 
-    machines = __fetch_machines(filter, configuration, secrets)
+    machines = __fetch_machines(
+        filter, configuration, secrets, count, percentage, seed
+    )
+    machines = select_targets(machines, selection)
+    client = None
+    if async_execution:
+        run_command_name = run_command_name or command.new_run_command_name()
+        client = __compute_mgmt_client(secrets, configuration)
 
     machine_records = Records()
-    for machine in machines:
+    for machine in Schedule(schedule, configuration).paced(machines):
         command_id, script_content = command.prepare(machine, "fill_disk")
         fill_path = command.prepare_path(machine, path)
 
@@ -370,19 +605,22 @@ def fill_disk(
 
         logger.debug("Filling disk of machine: {}".format(machine["name"]))
         _timeout = duration + timeout
-        command.run(
-            machine["resourceGroup"],
+        __execute_script(
             machine,
             _timeout,
             parameters,
-            secrets,
+            run_command_name,
+            output_blob_uri,
+            client,
             configuration,
+            secrets,
         )
         machine_records.add(cleanse.machine(machine))
 
     return machine_records.output_as_dict("resources")
 
 
+@scoped
 def network_latency(
     filter: str = None,
     duration: int = 60,
@@ -391,6 +629,16 @@ def network_latency(
     timeout: int = 60,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    async_execution: bool = False,
+    run_command_name: str = None,
+    output_blob_uri: str = None,
+    interface: str = None,
+    cidr: str = None,
+    selection: Dict[str, Any] = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Increases the response time of the virtual machine.
@@ -410,7 +658,40 @@ def network_latency(
         Added delay in ms. Defaults to 200.
     jitter : int
         Variance of the delay in ms. Defaults to 50.
-
+    async_execution : bool, optional
+        Start the script as a managed run command with asynchronous
+        execution instead of waiting for it on each machine in turn. The
+        run can later be collected with the `describe_run_commands` probe.
+        Defaults to False.
+    run_command_name : str, optional
+        Name of the managed run command when `async_execution` is set.
+        Defaults to a generated name reported in the activity output.
+    output_blob_uri : str, optional
+        URI of a blob container, optionally with a SAS token, the output of
+        the managed run commands is streamed to.
+    interface : str, optional
+        Comma separated list of the network interfaces to delay. Defaults
+        to all the interfaces of the machine but the loopback.
+    cidr : str, optional
+        Comma separated list of the destination networks to delay, e.g.
+        '10.0.0.0/16'. Defaults to all the traffic.
+    selection : dict, optional
+        Narrow down the fetched machines by zone, fault domain, update domain
+        or tag, for instance to stop an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    count : int, optional
+        Number of machines to pick at random among the matching ones, sampled
+        by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching machines to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` machines reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -437,10 +718,17 @@ def network_latency(
         )
     )
 
-    machines = __fetch_machines(filter, configuration, secrets)
+    machines = __fetch_machines(
+        filter, configuration, secrets, count, percentage, seed
+    )
+    machines = select_targets(machines, selection)
+    client = None
+    if async_execution:
+        run_command_name = run_command_name or command.new_run_command_name()
+        client = __compute_mgmt_client(secrets, configuration)
 
     machine_records = Records()
-    for machine in machines:
+    for machine in Schedule(schedule, configuration).paced(machines):
         command_id, script_content = command.prepare(machine, "network_latency")
 
         logger.debug("Script content: {}".format(script_content))
@@ -453,30 +741,47 @@ def network_latency(
                 {"name": "jitter", "value": jitter},
             ],
         }
+        __add_optional_parameters(
+            parameters, {"interface": interface, "cidr": cidr}
+        )
 
         logger.debug(
             "Increasing the latency of machine: {}".format(machine["name"])
         )
         _timeout = duration + timeout
-        command.run(
-            machine["resourceGroup"],
+        __execute_script(
             machine,
             _timeout,
             parameters,
-            secrets,
+            run_command_name,
+            output_blob_uri,
+            client,
             configuration,
+            secrets,
         )
         machine_records.add(cleanse.machine(machine))
 
     return machine_records.output_as_dict("resources")
 
 
+@scoped
 def burn_io(
     filter: str = None,
     duration: int = 60,
     timeout: int = 60,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    async_execution: bool = False,
+    run_command_name: str = None,
+    output_blob_uri: str = None,
+    block_size: str = "32K",
+    queue_depth: int = 1,
+    direct_io: bool = False,
+    selection: Dict[str, Any] = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Increases the Disk I/O operations per second of the virtual machine.
@@ -492,7 +797,40 @@ def burn_io(
         Additional wait time (in seconds) for filling operation to be completed
         Getting and sending data from/to Azure may take some time so it's not
         recommended to set this value to less than 30s. Defaults to 60 seconds.
-
+    async_execution : bool, optional
+        Start the script as a managed run command with asynchronous
+        execution instead of waiting for it on each machine in turn. The
+        run can later be collected with the `describe_run_commands` probe.
+        Defaults to False.
+    run_command_name : str, optional
+        Name of the managed run command when `async_execution` is set.
+        Defaults to a generated name reported in the activity output.
+    output_blob_uri : str, optional
+        URI of a blob container, optionally with a SAS token, the output of
+        the managed run commands is streamed to.
+    block_size : str, optional
+        Size of the blocks written, as understood by `dd`. Defaults to 32K.
+    queue_depth : int, optional
+        Number of concurrent writers. Defaults to 1.
+    direct_io : bool, optional
+        Bypass the page cache when writing. Defaults to False.
+    selection : dict, optional
+        Narrow down the fetched machines by zone, fault domain, update domain
+        or tag, for instance to stop an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    count : int, optional
+        Number of machines to pick at random among the matching ones, sampled
+        by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching machines to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` machines reproducible.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
 
     Examples
     --------
@@ -519,27 +857,41 @@ def burn_io(
     )
     logger.debug(msg)
 
-    machines = __fetch_machines(filter, configuration, secrets)
+    machines = __fetch_machines(
+        filter, configuration, secrets, count, percentage, seed
+    )
+    machines = select_targets(machines, selection)
+    client = None
+    if async_execution:
+        run_command_name = run_command_name or command.new_run_command_name()
+        client = __compute_mgmt_client(secrets, configuration)
 
     machine_records = Records()
-    for machine in machines:
+    for machine in Schedule(schedule, configuration).paced(machines):
         command_id, script_content = command.prepare(machine, "burn_io")
 
         parameters = {
             "command_id": command_id,
             "script": [script_content],
-            "parameters": [{"name": "duration", "value": duration}],
+            "parameters": [
+                {"name": "duration", "value": duration},
+                {"name": "block_size", "value": block_size},
+                {"name": "queue_depth", "value": queue_depth},
+                {"name": "direct", "value": 1 if direct_io else 0},
+            ],
         }
 
         logger.debug("Burning IO of machine: '{}'".format(machine["name"]))
         _timeout = duration + timeout
-        command.run(
-            machine["resourceGroup"],
+        __execute_script(
             machine,
             _timeout,
             parameters,
-            secrets,
+            run_command_name,
+            output_blob_uri,
+            client,
             configuration,
+            secrets,
         )
         machine_records.add(cleanse.machine(machine))
 
@@ -565,8 +917,89 @@ def __fetch_all_stopped_machines(client, machines) -> []:
     return stopped_machines
 
 
-def __fetch_machines(filter, configuration, secrets) -> []:
-    machines = fetch_resources(filter, RES_TYPE_VM, secrets, configuration)
+def __fetch_stopped_machines_from_inventory(configuration) -> []:
+    machines = inventory.load(
+        configuration,
+        inventory.ACTED,
+        "stop_machines",
+        RES_TYPE_VM,
+        inventory.run_id(configuration),
+    )
+    if not machines:
+        raise FailedActivity(
+            "No stopped virtual machines in the inventory of this run"
+        )
+
+    logger.debug(
+        "Recorded stopped machines: {}".format([m["name"] for m in machines])
+    )
+    return [
+        {
+            "id": m["id"],
+            "name": m["name"],
+            "resourceGroup": m["resourceGroup"],
+            "type": m["type"],
+        }
+        for m in machines
+    ]
+
+
+def __execute_script(
+    machine,
+    timeout,
+    parameters,
+    run_command_name,
+    output_blob_uri,
+    client,
+    configuration,
+    secrets,
+):
+    if run_command_name:
+        machine["run_command"] = command.submit(
+            machine["resourceGroup"],
+            machine,
+            timeout,
+            parameters,
+            run_command_name,
+            output_blob_uri,
+            secrets,
+            configuration,
+            client=client,
+        )
+    else:
+        machine["output"] = command.run(
+            machine["resourceGroup"],
+            machine,
+            timeout,
+            parameters,
+            secrets,
+            configuration,
+        )
+
+
+def __add_optional_parameters(parameters, optional_parameters):
+    for name, value in optional_parameters.items():
+        if value:
+            parameters["parameters"].append({"name": name, "value": value})
+
+
+def __fetch_machines(
+    filter,
+    configuration,
+    secrets,
+    count=None,
+    percentage=None,
+    seed=None,
+) -> []:
+    machines = fetch_resources(
+        filter,
+        RES_TYPE_VM,
+        secrets,
+        configuration,
+        count,
+        percentage,
+        seed,
+    )
     if not machines:
         logger.warning("No virtual machines found")
         raise FailedActivity("No virtual machines found")
@@ -1,15 +1,37 @@
 # -*- coding: utf-8 -*-
 import logging
+from typing import Any, Dict, List
 
+from chaoslib.exceptions import FailedActivity
 from chaoslib.types import Configuration, Secrets
 
+from chaosazure.common.compute import command
+from chaosazure.common.plan import scoped
 from chaosazure.machine.constants import RES_TYPE_VM
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    iter_resources,
+    query_resources,
+)
+from chaosazure.common.resources.query import POWER_STATE_COLUMN, Query
 
-__all__ = ["describe_machines", "count_machines"]
+# column and, when it must be computed, expression of each grouping key
+POWER_STATE_GROUPS = {
+    "zone": ("zone", "tostring(zones[0])"),
+    "resource_group": ("resourceGroup", None),
+    "location": ("location", None),
+}
+
+__all__ = [
+    "describe_machines",
+    "count_machines",
+    "count_machines_by_power_state",
+    "describe_run_commands",
+]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def describe_machines(
     filter: str = None,
     configuration: Configuration = None,
@@ -32,10 +54,11 @@ def describe_machines(
         )
     )
 
-    machines = fetch_resources(filter, RES_TYPE_VM, secrets, configuration)
-    return machines
+    machines = iter_resources(filter, RES_TYPE_VM, secrets, configuration)
+    return list(machines)
 
 
+@scoped
 def count_machines(
     filter: str = None,
     configuration: Configuration = None,
@@ -60,3 +83,138 @@ def count_machines(
 
     machines = fetch_resources(filter, RES_TYPE_VM, secrets, configuration)
     return len(machines)
+
+
+@scoped
+def count_machines_by_power_state(
+    filter: str = None,
+    group_by: List[str] = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+) -> Dict[str, Any]:
+    """
+    Count the Azure virtual machines per power state, such as `running`,
+    `stopped` or `deallocated`, and per zone, resource group or location.
+
+    The machines are counted by Resource Graph itself out of the instance
+    view it keeps, the compute API is never called and only the counts are
+    downloaded.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the virtual machines. If the filter is omitted all machines in
+        the subscription will be counted.
+        Filtering example:
+        'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    group_by : list, optional
+        Count the machines of each power state per `zone`,
+        `resource_group` or `location`, or any combination of them.
+        Defaults to `["zone"]`.
+
+    The result carries the `total` number of machines, their count per
+    power state under `states`, for instance to check that
+    `states.running` did not drop, and the count of each group under
+    `groups`, such as:
+    {"powerState": "running", "zone": "1", "count": 12}. Machines without a
+    known power state, or without a zone, are counted with an empty one.
+    """
+    logger.debug(
+        "Start count_machines_by_power_state: configuration='{}', "
+        "filter='{}', group_by='{}'".format(configuration, filter, group_by)
+    )
+
+    if group_by is None:
+        group_by = ["zone"]
+    unknown = set(group_by) - set(POWER_STATE_GROUPS)
+    if unknown:
+        raise FailedActivity(
+            "Cannot group machines by {}, expected some of {}".format(
+                sorted(unknown), sorted(POWER_STATE_GROUPS)
+            )
+        )
+
+    query = (
+        Query(RES_TYPE_VM)
+        .filter(filter)
+        .extend(
+            "powerState",
+            "tostring(split(tostring({}), '/')[1])".format(POWER_STATE_COLUMN),
+        )
+    )
+    columns = ["powerState"]
+    for group in group_by:
+        column, expression = POWER_STATE_GROUPS[group]
+        if expression:
+            query = query.extend(column, expression)
+        columns.append(column)
+    query = query.summarize(by=columns)
+
+    rows = query_resources(str(query), secrets, configuration)
+    states = {}
+    groups = []
+    for row in rows:
+        group = {c: row[c] or "" for c in columns}
+        group["count"] = row["count"]
+        groups.append(group)
+        state = group["powerState"]
+        states[state] = states.get(state, 0) + group["count"]
+
+    return {
+        "total": sum(states.values()),
+        "states": states,
+        "groups": groups,
+    }
+
+
+@scoped
+def describe_run_commands(
+    filter: str = None,
+    run_command_name: str = None,
+    timeout: int = 300,
+    interval: int = 5,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+):
+    """
+    Collect the state and output of a managed run command started with
+    `async_execution` on the filtered virtual machines.
+
+    All runs are polled from a single loop until every one of them reached
+    a terminal state or the timeout elapsed.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the virtual machines. If the filter is omitted all machines in
+        the subscription will be selected for the probe.
+        Filtering example:
+        'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    run_command_name : str
+        Name of the run command, as reported by the action that started it.
+    timeout : int, optional
+        How long (in seconds) to wait for the runs to finish. Use 0 to only
+        take a snapshot of their current state. Defaults to 300 seconds.
+    interval : int, optional
+        Time (in seconds) between two polls. Defaults to 5 seconds.
+    """
+    logger.debug(
+        "Start describe_run_commands: configuration='{}', filter='{}',"
+        " run_command_name='{}'".format(configuration, filter, run_command_name)
+    )
+
+    if not run_command_name:
+        raise FailedActivity("A run command name is required")
+
+    machines = fetch_resources(filter, RES_TYPE_VM, secrets, configuration)
+    runs = [
+        {
+            "run_command_name": run_command_name,
+            "resource_group": m["resourceGroup"],
+            "type": RES_TYPE_VM.lower(),
+            "vm_name": m["name"],
+        }
+        for m in machines
+    ]
+    results = command.poll(runs, timeout, interval, secrets, configuration)
+    return [r for r in results if r["execution_state"] != "NotFound"]
@@ -1,24 +1,36 @@
 # -*- coding: utf-8 -*-
 import logging
 import re
+import time
 
 from chaoslib.exceptions import FailedActivity
 from chaoslib.types import Configuration, Secrets
 
 from chaosazure import init_netapp_management_client
 from chaosazure.common import cleanse
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
+from chaosazure.common.plan import dry_run, scoped
 from chaosazure.netapp.constants import RES_TYPE_SRV_NV
 from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.submission import retry_budget, submit
 from chaosazure.vmss.records import Records
 
 __all__ = ["delete_netapp_volumes"]
 logger = logging.getLogger("chaostoolkit")
 
+# account, pool and volume names of the identifier of a NetApp volume
+VOLUME_ID_PATTERN = re.compile(
+    r"/netAppAccounts/([^/]+)/capacityPools/([^/]+)/volumes/([^/]+)/?$",
+    re.IGNORECASE,
+)
 
+
+@scoped
 def delete_netapp_volumes(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    wait_timeout: int = None,
 ):
     """
     Delete netapp volumes at random.
@@ -31,6 +43,14 @@ def delete_netapp_volumes(
     filter : str, optional
         Filter the netapp volumes. If the filter is omitted all netapp volumes in
         the subscription will be selected as potential chaos candidates.
+    wait_timeout : int, optional
+        Wait for the deletions to complete for up to that many seconds. They
+        are only submitted when omitted.
+
+    The deletions are submitted concurrently. Each record carries its
+    `outcome`: `deleting` when the deletion was only submitted or is still
+    running at the deadline, `deleted` or `failed` along with the `error`.
+    In dry-run mode, the deletions are only `planned` and never waited for.
 
     Examples
     --------
@@ -47,22 +67,61 @@ def delete_netapp_volumes(
     Delete two netapp volumes at random from the group 'rg'
     """
     logger.debug(
-        "Start delete_netapp_volumes: "
-        "configuration='{}', filter='{}'".format(configuration, filter)
+        "Start delete_netapp_volumes: configuration='{}', filter='{}'".format(
+            configuration, filter
+        )
     )
 
     netapp_volumes = __fetch_netapp_volumes(filter, configuration, secrets)
     client = __netapp_mgmt_client(secrets, configuration)
     netapp_volumes_records = Records()
+    deadline = retry_budget(configuration)
+    planning = dry_run(configuration)
+
+    def delete_volume(nv):
+        account_name, pool_name, volume_name = __volume_names(nv)
+        submission = submit(
+            client.volumes.begin_delete,
+            nv["resourceGroup"],
+            account_name,
+            pool_name,
+            volume_name,
+            deadline=deadline,
+        )
+        nv["retries"] = submission.retries
+        return submission.result
 
-    for nv in netapp_volumes:
-        group = nv["resourceGroup"]
-        full_name = nv["name"]
-        account_name = re.search(r"^([^\/]*)\/", full_name).group(1)
-        pool_name = re.search(r"\/([^\/]*)\/", full_name).group(1)
-        volume_name = re.search(r"\/([^\/]*)$", full_name).group(1)
-        client.volumes.begin_delete(group, account_name, pool_name, volume_name)
-        netapp_volumes_records.add(cleanse.netapp_volume(nv))
+    deletions = []
+    outcomes = run_concurrently(
+        delete_volume, netapp_volumes, max_concurrency(configuration)
+    )
+    for outcome in outcomes:
+        record = cleanse.netapp_volume(outcome.item)
+        if outcome.error is not None:
+            logger.warning(
+                "Failed to delete netapp volume '{}': {}".format(
+                    outcome.item["name"], outcome.error
+                )
+            )
+            record["outcome"] = "failed"
+            record["error"] = str(outcome.error)
+        else:
+            record["outcome"] = "planned" if planning else "deleting"
+            deletions.append((record, outcome.result))
+        netapp_volumes_records.add(record)
+
+    if wait_timeout is not None and not planning:
+        deadline = time.monotonic() + wait_timeout
+        for record, poller in deletions:
+            poller.wait(max(0, deadline - time.monotonic()))
+            if not poller.done():
+                continue
+            try:
+                poller.result(0)
+                record["outcome"] = "deleted"
+            except Exception as x:
+                record["outcome"] = "failed"
+                record["error"] = str(x)
 
     return netapp_volumes_records.output_as_dict("resources")
 
@@ -90,3 +149,15 @@ def __fetch_netapp_volumes(filter, configuration, secrets) -> []:
 
 def __netapp_mgmt_client(secrets, configuration):
     return init_netapp_management_client(secrets, configuration)
+
+
+def __volume_names(netapp_volume):
+    if not netapp_volume.get("id"):
+        return netapp_volume["name"].split("/")
+
+    match = VOLUME_ID_PATTERN.search(netapp_volume["id"])
+    if match is None:
+        raise FailedActivity(
+            "Invalid NetApp volume identifier '{}'".format(netapp_volume["id"])
+        )
+    return list(match.groups())
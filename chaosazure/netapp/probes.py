@@ -2,13 +2,18 @@
 import logging
 from chaoslib.types import Configuration, Secrets
 
+from chaosazure.common.plan import scoped
 from chaosazure.netapp.constants import RES_TYPE_SRV_NV
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    iter_resources,
+)
 
 __all__ = ["describe_netapp_volumes", "count_netapp_volumes"]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def describe_netapp_volumes(
     filter: str = None,
     configuration: Configuration = None,
@@ -31,12 +36,13 @@ def describe_netapp_volumes(
         )
     )
 
-    netapp_volumes = fetch_resources(
+    netapp_volumes = iter_resources(
         filter, RES_TYPE_SRV_NV, secrets, configuration
     )
-    return netapp_volumes
+    return list(netapp_volumes)
 
 
+@scoped
 def count_netapp_volumes(
     filter: str = None,
     configuration: Configuration = None,
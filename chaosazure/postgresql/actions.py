@@ -7,9 +7,11 @@ from chaoslib.types import Configuration, Secrets
 
 from chaosazure import init_postgresql_management_client
 from chaosazure.common import cleanse
+from chaosazure.common.plan import scoped
 from chaosazure.postgresql.constants import RES_TYPE_SRV_PG
 from azure.mgmt.rdbms.postgresql.models import Database
 from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.submission import retry_budget, submit
 from chaosazure.vmss.records import Records
 
 __all__ = [
@@ -21,10 +23,14 @@ __all__ = [
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def delete_servers(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Delete servers at random.
@@ -37,6 +43,13 @@ def delete_servers(
     filter : str, optional
         Filter the servers. If the filter is omitted all servers in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of servers to pick at random among the matching ones, sampled by
+        Resource Graph.
+    percentage : float, optional
+        Percentage of the matching servers to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` servers reproducible.
 
     Examples
     --------
@@ -53,28 +66,37 @@ def delete_servers(
     Delete two servers at random from the group 'rg'
     """
     logger.debug(
-        "Start delete_servers: " "configuration='{}', filter='{}'".format(
+        "Start delete_servers: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    servers = __fetch_servers(filter, configuration, secrets)
+    servers = __fetch_servers(
+        filter, configuration, secrets, count, percentage, seed
+    )
     client = __postgresql_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     server_records = Records()
     for s in servers:
         group = s["resourceGroup"]
         name = s["name"]
         logger.debug("Deleting server: {}".format(name))
-        client.servers.begin_delete(group, name)
+        s["retries"] = submit(
+            client.servers.begin_delete, group, name, deadline=deadline
+        ).retries
         server_records.add(cleanse.database_server(s))
 
     return server_records.output_as_dict("resources")
 
 
+@scoped
 def restart_servers(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Restart servers at random.
@@ -84,6 +106,13 @@ def restart_servers(
     filter : str, optional
         Filter the servers. If the filter is omitted all servers in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of servers to pick at random among the matching ones, sampled by
+        Resource Graph.
+    percentage : float, optional
+        Percentage of the matching servers to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` servers reproducible.
 
     Examples
     --------
@@ -100,24 +129,30 @@ def restart_servers(
     Restart two servers at random from the group 'rg'
     """
     logger.debug(
-        "Start restart_servers: " "configuration='{}', filter='{}'".format(
+        "Start restart_servers: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    servers = __fetch_servers(filter, configuration, secrets)
+    servers = __fetch_servers(
+        filter, configuration, secrets, count, percentage, seed
+    )
     client = __postgresql_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     server_records = Records()
     for s in servers:
         group = s["resourceGroup"]
         name = s["name"]
         logger.debug("Restarting server: {}".format(name))
-        client.servers.begin_restart(group, name)
+        s["retries"] = submit(
+            client.servers.begin_restart, group, name, deadline=deadline
+        ).retries
         server_records.add(cleanse.database_server(s))
 
     return server_records.output_as_dict("resources")
 
 
+@scoped
 def delete_databases(
     filter: str = None,
     name_pattern: str = None,
@@ -167,6 +202,7 @@ def delete_databases(
 
     servers = __fetch_servers(filter, configuration, secrets)
     client = __postgresql_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     database_records = Records()
     for s in servers:
         group = s["resourceGroup"]
@@ -175,7 +211,13 @@ def delete_databases(
         for d in client.databases.list_by_server(group, server_name):
             name = d.name
             if pattern is None or pattern.search(name):
-                client.databases.begin_delete(group, server_name, name)
+                submit(
+                    client.databases.begin_delete,
+                    group,
+                    server_name,
+                    name,
+                    deadline=deadline,
+                )
                 database_records.add(cleanse.database_database(d.as_dict()))
 
         logger.debug("Deleting database: {}/{}".format(server_name, name))
@@ -183,6 +225,7 @@ def delete_databases(
     return database_records.output_as_dict("resources")
 
 
+@scoped
 def create_databases(
     filter: str = None,
     name: str = None,
@@ -227,13 +270,19 @@ def create_databases(
 
     servers = __fetch_servers(filter, configuration, secrets)
     client = __postgresql_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     database_parameters = Database(charset=charset, collation=collation)
     for s in servers:
         group = s["resourceGroup"]
         server_name = s["name"]
 
-        client.databases.begin_create_or_update(
-            group, server_name, name, database_parameters
+        submit(
+            client.databases.begin_create_or_update,
+            group,
+            server_name,
+            name,
+            database_parameters,
+            deadline=deadline,
         )
 
 
@@ -242,8 +291,23 @@ def create_databases(
 ###############################################################################
 
 
-def __fetch_servers(filter, configuration, secrets) -> []:
-    servers = fetch_resources(filter, RES_TYPE_SRV_PG, secrets, configuration)
+def __fetch_servers(
+    filter,
+    configuration,
+    secrets,
+    count=None,
+    percentage=None,
+    seed=None,
+) -> []:
+    servers = fetch_resources(
+        filter,
+        RES_TYPE_SRV_PG,
+        secrets,
+        configuration,
+        count,
+        percentage,
+        seed,
+    )
     if not servers:
         logger.warning("No servers found")
         raise FailedActivity("No servers found")
@@ -4,14 +4,19 @@ import re
 
 from chaoslib.types import Configuration, Secrets
 
+from chaosazure.common.plan import scoped
 from chaosazure.postgresql.constants import RES_TYPE_SRV_PG
 from chaosazure.postgresql.actions import __postgresql_mgmt_client
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    iter_resources,
+)
 
 __all__ = ["describe_servers", "count_servers", "describe_databases"]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def describe_servers(
     filter: str = None,
     configuration: Configuration = None,
@@ -34,10 +39,11 @@ def describe_servers(
         )
     )
 
-    servers = fetch_resources(filter, RES_TYPE_SRV_PG, secrets, configuration)
-    return servers
+    servers = iter_resources(filter, RES_TYPE_SRV_PG, secrets, configuration)
+    return list(servers)
 
 
+@scoped
 def count_servers(
     filter: str = None,
     configuration: Configuration = None,
@@ -64,6 +70,7 @@ def count_servers(
     return len(servers)
 
 
+@scoped
 def describe_databases(
     filter: str = None,
     name_pattern: str = None,
@@ -12,10 +12,12 @@ from chaoslib.exceptions import FailedActivity
 from chaoslib.types import Configuration, Secrets
 
 from chaosazure import init_postgresql_flexible_management_client
-from chaosazure.common import cleanse
+from chaosazure.common import cleanse, plan
+from chaosazure.common.plan import scoped
 from chaosazure.postgresql_flexible.constants import RES_TYPE_SRV_PG_FLEX
 from azure.mgmt.rdbms.postgresql_flexibleservers.models import Database
 from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.submission import retry_budget, submit
 from chaosazure.vmss.records import Records
 
 __all__ = [
@@ -30,10 +32,14 @@ __all__ = [
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def delete_servers(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Delete servers at random.
@@ -46,6 +52,13 @@ def delete_servers(
     filter : str, optional
         Filter the servers. If the filter is omitted all servers in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of servers to pick at random among the matching ones, sampled by
+        Resource Graph.
+    percentage : float, optional
+        Percentage of the matching servers to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` servers reproducible.
 
     Examples
     --------
@@ -62,28 +75,37 @@ def delete_servers(
     Delete two servers at random from the group 'rg'
     """
     logger.debug(
-        "Start delete_servers: " "configuration='{}', filter='{}'".format(
+        "Start delete_servers: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    servers = __fetch_servers(filter, configuration, secrets)
+    servers = __fetch_servers(
+        filter, configuration, secrets, count, percentage, seed
+    )
     client = __postgresql_flexible_mgmt_client(secrets, configuration)
-    server_records = Records()
+    deadline = retry_budget(configuration)
+    server_records = Records("delete")
     for s in servers:
         group = s["resourceGroup"]
         name = s["name"]
         logger.debug("Deleting server: {}".format(name))
-        client.servers.begin_delete(group, name)
+        s["retries"] = submit(
+            client.servers.begin_delete, group, name, deadline=deadline
+        ).retries
         server_records.add(cleanse.database_server(s))
 
     return server_records.output_as_dict("resources")
 
 
+@scoped
 def stop_servers(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Stop servers at random.
@@ -93,6 +115,13 @@ def stop_servers(
     filter : str, optional
         Filter the servers. If the filter is omitted all servers in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of servers to pick at random among the matching ones, sampled by
+        Resource Graph.
+    percentage : float, optional
+        Percentage of the matching servers to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` servers reproducible.
 
     Examples
     --------
@@ -109,29 +138,38 @@ def stop_servers(
     Stop two servers at random from the group 'mygroup'
     """
     logger.debug(
-        "Start stop_servers: " "configuration='{}', filter='{}'".format(
+        "Start stop_servers: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    servers = __fetch_servers(filter, configuration, secrets)
+    servers = __fetch_servers(
+        filter, configuration, secrets, count, percentage, seed
+    )
     client = __postgresql_flexible_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
 
     server_records = Records()
     for s in servers:
         group = s["resourceGroup"]
         name = s["name"]
         logger.debug("Stopping server: {}".format(name))
-        client.servers.begin_stop(group, name)
+        s["retries"] = submit(
+            client.servers.begin_stop, group, name, deadline=deadline
+        ).retries
         server_records.add(cleanse.database_server(s))
 
     return server_records.output_as_dict("resources")
 
 
+@scoped
 def restart_servers(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Restart servers at random.
@@ -141,6 +179,13 @@ def restart_servers(
     filter : str, optional
         Filter the servers. If the filter is omitted all servers in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of servers to pick at random among the matching ones, sampled by
+        Resource Graph.
+    percentage : float, optional
+        Percentage of the matching servers to pick at random, rounded up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` servers reproducible.
 
     Examples
     --------
@@ -157,24 +202,30 @@ def restart_servers(
     Restart two servers at random from the group 'rg'
     """
     logger.debug(
-        "Start restart_servers: " "configuration='{}', filter='{}'".format(
+        "Start restart_servers: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
-    servers = __fetch_servers(filter, configuration, secrets)
+    servers = __fetch_servers(
+        filter, configuration, secrets, count, percentage, seed
+    )
     client = __postgresql_flexible_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     server_records = Records()
     for s in servers:
         group = s["resourceGroup"]
         name = s["name"]
         logger.debug("Restarting server: {}".format(name))
-        client.servers.begin_restart(group, name)
+        s["retries"] = submit(
+            client.servers.begin_restart, group, name, deadline=deadline
+        ).retries
         server_records.add(cleanse.database_server(s))
 
     return server_records.output_as_dict("resources")
 
 
+@scoped
 def start_servers(
     filter: str = None,
     configuration: Configuration = None,
@@ -212,18 +263,25 @@ def start_servers(
 
     servers = __fetch_servers(filter, configuration, secrets)
     client = __postgresql_flexible_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     stopped_servers = __fetch_all_stopped_servers(client, servers)
 
     server_records = Records()
     for server in stopped_servers:
         logger.debug("Starting server: {}".format(server["name"]))
-        client.servers.begin_start(server["resourceGroup"], server["name"])
+        server["retries"] = submit(
+            client.servers.begin_start,
+            server["resourceGroup"],
+            server["name"],
+            deadline=deadline,
+        ).retries
 
         server_records.add(cleanse.database_server(server))
 
     return server_records.output_as_dict("resources")
 
 
+@scoped
 def delete_databases(
     filter: str = None,
     name_pattern: str = None,
@@ -273,6 +331,7 @@ def delete_databases(
 
     servers = __fetch_servers(filter, configuration, secrets)
     client = __postgresql_flexible_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     database_records = Records()
     for s in servers:
         group = s["resourceGroup"]
@@ -281,7 +340,13 @@ def delete_databases(
         for d in client.databases.list_by_server(group, server_name):
             name = d.name
             if pattern is None or pattern.search(name):
-                client.databases.begin_delete(group, server_name, name)
+                submit(
+                    client.databases.begin_delete,
+                    group,
+                    server_name,
+                    name,
+                    deadline=deadline,
+                )
                 database_records.add(cleanse.database_database(d.as_dict()))
 
         logger.debug("Deleting database: {}/{}".format(server_name, name))
@@ -289,6 +354,7 @@ def delete_databases(
     return database_records.output_as_dict("resources")
 
 
+@scoped
 def create_databases(
     filter: str = None,
     name: str = None,
@@ -333,16 +399,27 @@ def create_databases(
 
     servers = __fetch_servers(filter, configuration, secrets)
     client = __postgresql_flexible_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     database_parameters = Database(charset=charset, collation=collation)
+    server_records = Records()
     for s in servers:
         group = s["resourceGroup"]
         server_name = s["name"]
 
-        client.databases.begin_create(
-            group, server_name, name, database_parameters
+        submit(
+            client.databases.begin_create,
+            group,
+            server_name,
+            name,
+            database_parameters,
+            deadline=deadline,
         )
+        server_records.add(cleanse.database_server(s))
+
+    return server_records.output_as_dict("resources")
 
 
+@scoped
 def delete_tables(
     filter: str = None,
     table_name: str = None,
@@ -373,6 +450,10 @@ def delete_tables(
     key_vault_url : str, optional
         The URL to the Azure Key Vault where the secrets are stored.
 
+    The databases whose tables could not be deleted are listed under
+    `failures`, as `server/database: error`, next to the `resources` whose
+    tables were deleted.
+
     Examples
     --------
     Here are some examples of calling `delete_tables`.
@@ -406,19 +487,32 @@ def delete_tables(
         raise FailedActivity("No servers found")
 
     srv_records = Records()
+    failures = []
     for srv in srvs:
-        __handle_server(
-            srv,
-            database_name,
-            table_name,
-            secrets,
-            configuration,
-            cred,
-            key_vault_url,
-            srv_records,
+        failures.extend(
+            __handle_server(
+                srv,
+                database_name,
+                table_name,
+                secrets,
+                configuration,
+                cred,
+                key_vault_url,
+                srv_records,
+            )
+        )
+
+    # the tables already deleted are reported along with the failures, the
+    # activity only fails when no table could be deleted at all
+    if failures and not srv_records.elements:
+        raise FailedActivity(
+            "Failed to delete tables on {}".format("; ".join(failures))
         )
 
-    return srv_records.output_as_dict("resources")
+    output = srv_records.output_as_dict("resources")
+    if failures:
+        output["failures"] = failures
+    return output
 
 
 ###############################################################################
@@ -436,9 +530,22 @@ def __fetch_all_stopped_servers(client, servers) -> []:
     return stopped_servers
 
 
-def __fetch_servers(filter, configuration, secrets) -> List:
+def __fetch_servers(
+    filter,
+    configuration,
+    secrets,
+    count=None,
+    percentage=None,
+    seed=None,
+) -> List:
     servers = fetch_resources(
-        filter, RES_TYPE_SRV_PG_FLEX, secrets, configuration
+        filter,
+        RES_TYPE_SRV_PG_FLEX,
+        secrets,
+        configuration,
+        count,
+        percentage,
+        seed,
     )
     if not servers:
         logger.warning("No servers found")
@@ -490,10 +597,19 @@ def __handle_server(
                 f"Database '{database_name}' does not exist on server '{srv_name}'"
             )
 
-    # Iterate through each database and delete the table(s)
+    # Iterate through each database and delete the table(s), the failures
+    # are reported once all databases were handled
+    failures = []
     for db in db_list:
         dbname = db.name
 
+        # the tables are dropped over a connection to the database itself,
+        # out of reach of the planned clients
+        if plan.dry_run(configuration):
+            plan.current(configuration).record("databases.drop_table")
+            srv_records.add(cleanse.database_server(srv))
+            continue
+
         # Connect to the PostgreSQL server
         try:
             conn_str = (
@@ -508,11 +624,14 @@ def __handle_server(
 
             srv_records.add(cleanse.database_server(srv))
             logger.debug(f"Deleted tables on server '{srv_name}'")
-        except Exception:
+        except Exception as x:
             logger.exception(
-                f"Failed to connect to database '{dbname}' on server '{srv_name}'"
+                f"Failed to delete tables of database '{dbname}' "
+                f"on server '{srv_name}'"
             )
-            continue
+            failures.append(f"{srv_name}/{dbname}: {x}")
+
+    return failures
 
 
 def __handle_db(dbname, srv_name, table_name, conn):
@@ -551,7 +670,13 @@ def __handle_db(dbname, srv_name, table_name, conn):
         conn.run("COMMIT")
         conn.close()
     except Exception:
-        logger.exception(f"Failed to delete tables on server '{srv_name}'")
         if conn:
-            conn.run("ROLLBACK")
-            conn.close()
+            try:
+                conn.run("ROLLBACK")
+                conn.close()
+            except Exception:
+                logger.debug(
+                    f"Failed to rollback the transaction on '{srv_name}'",
+                    exc_info=True,
+                )
+        raise
@@ -4,16 +4,21 @@ import re
 
 from chaoslib.types import Configuration, Secrets
 
+from chaosazure.common.plan import scoped
 from chaosazure.postgresql_flexible.constants import RES_TYPE_SRV_PG_FLEX
 from chaosazure.postgresql_flexible.actions import (
     __postgresql_flexible_mgmt_client,
 )
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    iter_resources,
+)
 
 __all__ = ["describe_servers", "count_servers", "describe_databases"]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def describe_servers(
     filter: str = None,
     configuration: Configuration = None,
@@ -36,12 +41,13 @@ def describe_servers(
         )
     )
 
-    servers = fetch_resources(
+    servers = iter_resources(
         filter, RES_TYPE_SRV_PG_FLEX, secrets, configuration
     )
-    return servers
+    return list(servers)
 
 
+@scoped
 def count_servers(
     filter: str = None,
     configuration: Configuration = None,
@@ -70,6 +76,7 @@ def count_servers(
     return len(servers)
 
 
+@scoped
 def describe_databases(
     filter: str = None,
     name_pattern: str = None,
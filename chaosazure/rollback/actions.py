@@ -0,0 +1,264 @@
+import logging
+import time
+from typing import Any, Dict, List, Union
+
+from chaoslib.exceptions import FailedActivity
+from chaoslib.types import Configuration, Secrets
+
+from chaosazure import (
+    init_compute_management_client,
+    init_containerservice_management_client,
+    init_network_management_client,
+    init_postgresql_flexible_management_client,
+    init_website_management_client,
+)
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
+from chaosazure.common.plan import dry_run, scoped
+from chaosazure.common.submission import SubmissionError, submit
+from chaosazure.rollback.constants import RESTORABLE_TYPES
+from chaosazure.vmss import batch
+from chaosazure.vmss.records import Records
+
+__all__ = ["rollback_resources"]
+logger = logging.getLogger("chaostoolkit")
+
+# the management client each kind of restoration is made through
+CLIENTS = {
+    "machine": "compute",
+    "vmss": "compute",
+    "managed_cluster": "containerservice",
+    "postgresql_flexible": "postgresql_flexible",
+    "application_gateway": "network",
+    "webapp": "website",
+}
+
+
+@scoped
+def rollback_resources(
+    records: Union[Dict[str, Any], List[Dict[str, Any]]] = None,
+    timeout: int = 900,
+    max_attempts: int = 3,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+):
+    """
+    Restore exactly the resources a stop, deallocate or restart action
+    returned, by starting them again.
+
+    The records are the `{"resources": [...]}` output of the machine, VMSS,
+    AKS node, agent pool and cluster, PostgreSQL flexible server,
+    application gateway and web app actions. VMSS instances, including AKS
+    nodes, are started with a single request per scale set. All the
+    restorations run concurrently, each of them being retried on throttling,
+    server and conflicting operation errors up to `max_attempts` times and
+    awaited until the `timeout`, in seconds, shared by the whole rollback.
+
+    Each record carries the `kind`, `resourceGroup` and `name` of what was
+    restored, the `instance_ids` of scale sets or the `slot` of web apps,
+    the number of `attempts`, the `latency` in seconds and its `outcome`:
+    `restored`, `timeout` or `failed` along with the `error`, or `planned`
+    in dry-run mode. Records the rollback cannot restore are reported as
+    `skipped`, along with the `reason`, such as the records of a delete
+    action whose resources are gone for good.
+
+    Examples
+    --------
+    Pass the output of an action, for instance:
+
+    >>> rollback_resources(stop_machines("where resourceGroup=='rg'", c, s))
+    """
+    logger.debug(
+        "Start rollback_resources: configuration='{}'".format(configuration)
+    )
+
+    if max_attempts < 1:
+        raise FailedActivity("At least one attempt is required")
+
+    if isinstance(records, dict):
+        records = records.get("resources")
+    if not records:
+        raise FailedActivity("No records to rollback")
+
+    restorations, skipped = __plan(records)
+    deadline = time.monotonic() + timeout
+
+    clients = {}
+    for name in {CLIENTS[r["kind"]] for r in restorations}:
+        clients[name] = __init_client(name, secrets, configuration)
+
+    def restore(restoration):
+        client = clients[CLIENTS[restoration["kind"]]]
+        return __restore(client, restoration, deadline, max_attempts)
+
+    rollback_records = Records()
+    planning = dry_run(configuration)
+    outcomes = run_concurrently(
+        restore, restorations, max_concurrency(configuration)
+    )
+    for outcome in outcomes:
+        record = outcome.item
+        record["latency"] = round(outcome.latency, 3)
+        record["outcome"] = "planned" if planning else "restored"
+        if isinstance(outcome.error, TimeoutError):
+            record["outcome"] = "timeout"
+            record["error"] = str(outcome.error)
+        elif outcome.error is not None:
+            record["outcome"] = "failed"
+            record["error"] = str(outcome.error)
+        if record["outcome"] not in ("restored", "planned"):
+            logger.warning(
+                "Failed to restore {} '{}': {}".format(
+                    record["kind"], record["name"], record["error"]
+                )
+            )
+        rollback_records.add(record)
+
+    for record in skipped:
+        rollback_records.add(record)
+
+    return rollback_records.output_as_dict("resources")
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __plan(records):
+    restorations = []
+    scale_sets = {}
+    skipped = []
+
+    def add_instance(group, scale_set, instance_id):
+        ids = scale_sets.setdefault((group, scale_set), [])
+        if instance_id not in ids:
+            ids.append(instance_id)
+
+    def skip(record, reason):
+        logger.warning(
+            "Cannot rollback record {}: {}".format(record.get("name"), reason)
+        )
+        skipped.append(
+            {
+                "name": record.get("name"),
+                "type": record.get("type"),
+                "outcome": "skipped",
+                "reason": reason,
+            }
+        )
+
+    for record in records:
+        if record.get("operation") == "delete":
+            skip(record, "deleted")
+            continue
+
+        if "pool" in record and "nodes" in record:
+            for node in record["nodes"]:
+                add_instance(
+                    node["resourceGroup"],
+                    node["scale_set"],
+                    node["instance_id"],
+                )
+            continue
+
+        kind = RESTORABLE_TYPES.get((record.get("type") or "").lower())
+        if kind == "vmss" and "virtualMachines" in record:
+            for instance in record["virtualMachines"]:
+                add_instance(
+                    record["resourceGroup"],
+                    record["name"],
+                    instance["instance_id"],
+                )
+        elif kind == "vmss" and "scale_set" in record:
+            add_instance(
+                record["resourceGroup"],
+                record["scale_set"],
+                record["instance_id"],
+            )
+        elif kind and kind != "vmss":
+            restoration = {
+                "kind": kind,
+                "resourceGroup": record["resourceGroup"],
+                "name": record["name"],
+            }
+            if kind == "webapp" and record.get("slot", "production") != (
+                "production"
+            ):
+                restoration["slot"] = record["slot"]
+            restorations.append(restoration)
+        else:
+            skip(record, "not restorable")
+
+    for (group, scale_set), instance_ids in scale_sets.items():
+        restorations.append(
+            {
+                "kind": "vmss",
+                "resourceGroup": group,
+                "name": scale_set,
+                "instance_ids": instance_ids,
+            }
+        )
+
+    return restorations, skipped
+
+
+def __init_client(name, secrets, configuration):
+    if name == "compute":
+        return init_compute_management_client(secrets, configuration)
+    elif name == "containerservice":
+        return init_containerservice_management_client(secrets, configuration)
+    elif name == "postgresql_flexible":
+        return init_postgresql_flexible_management_client(
+            secrets, configuration
+        )
+    elif name == "network":
+        return init_network_management_client(secrets, configuration)
+    return init_website_management_client(secrets, configuration)
+
+
+def __restore(client, restoration, deadline, max_attempts):
+    if deadline - time.monotonic() <= 0:
+        raise TimeoutError("Rollback deadline reached")
+
+    try:
+        submission = submit(
+            __begin_start,
+            client,
+            restoration,
+            deadline=deadline,
+            max_attempts=max_attempts,
+        )
+    except SubmissionError as x:
+        restoration["attempts"] = x.retries + 1
+        raise x.error
+
+    restoration["attempts"] = submission.retries + 1
+    poller = submission.result
+    if poller is None:
+        return
+
+    poller.result(max(0, deadline - time.monotonic()))
+    if not poller.done():
+        raise TimeoutError("Rollback deadline reached")
+
+
+def __begin_start(client, restoration):
+    kind = restoration["kind"]
+    group = restoration["resourceGroup"]
+    name = restoration["name"]
+    logger.debug("Starting {}: {}".format(kind, name))
+
+    if kind == "machine":
+        return client.virtual_machines.begin_start(group, name)
+    elif kind == "vmss":
+        return batch.begin_batch(
+            client, "start", group, name, restoration["instance_ids"]
+        )
+    elif kind == "managed_cluster":
+        return client.managed_clusters.begin_start(group, name)
+    elif kind == "postgresql_flexible":
+        return client.servers.begin_start(group, name)
+    elif kind == "application_gateway":
+        return client.application_gateways.begin_start(group, name)
+    elif restoration.get("slot"):
+        client.web_apps.start_slot(group, name, restoration["slot"])
+    else:
+        client.web_apps.start(group, name)
@@ -0,0 +1,17 @@
+from chaosazure.aks.constants import RES_TYPE_AKS
+from chaosazure.application_gateway.constants import RES_TYPE_SRV_AG
+from chaosazure.machine.constants import RES_TYPE_VM
+from chaosazure.postgresql_flexible.constants import RES_TYPE_SRV_PG_FLEX
+from chaosazure.vmss.constants import RES_TYPE_VMSS, RES_TYPE_VMSS_VM
+from chaosazure.webapp.constants import RES_TYPE_WEBAPP
+
+# the resources a rollback knows how to restore, by their lower cased type
+RESTORABLE_TYPES = {
+    RES_TYPE_VM.lower(): "machine",
+    RES_TYPE_VMSS.lower(): "vmss",
+    RES_TYPE_VMSS_VM.lower(): "vmss",
+    RES_TYPE_AKS.lower(): "managed_cluster",
+    RES_TYPE_SRV_PG_FLEX.lower(): "postgresql_flexible",
+    RES_TYPE_SRV_AG.lower(): "application_gateway",
+    RES_TYPE_WEBAPP.lower(): "webapp",
+}
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import logging
-import re
 import random
 
 from chaoslib.exceptions import FailedActivity
@@ -8,18 +7,26 @@ from chaoslib.types import Configuration, Secrets
 
 from chaosazure import init_storage_management_client
 from chaosazure.common import cleanse
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
+from chaosazure.common.plan import dry_run, scoped
 from chaosazure.storage.constants import RES_TYPE_SRV_SA
 from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.storage.fetcher import fetch_blob_containers
+from chaosazure.common.submission import retry_budget, submit
 from chaosazure.vmss.records import Records
 
 __all__ = ["delete_storage_accounts", "delete_blob_containers"]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def delete_storage_accounts(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    count: int = None,
+    percentage: float = None,
+    seed: int = None,
 ):
     """
     Delete storage accounts at random.
@@ -32,6 +39,15 @@ def delete_storage_accounts(
     filter : str, optional
         Filter the storage accounts. If the filter is omitted all storage accounts in
         the subscription will be selected as potential chaos candidates.
+    count : int, optional
+        Number of storage accounts to pick at random among the matching ones,
+        sampled by Resource Graph.
+    percentage : float, optional
+        Percentage of the matching storage accounts to pick at random, rounded
+        up.
+    seed : int, optional
+        Seed making the pick of `count` or `percentage` storage accounts
+        reproducible.
 
     Examples
     --------
@@ -48,24 +64,31 @@ def delete_storage_accounts(
     Delete two storage accounts at random from the group 'rg'
     """
     logger.debug(
-        "Start delete_storage_accounts: "
-        "configuration='{}', filter='{}'".format(configuration, filter)
+        "Start delete_storage_accounts: configuration='{}', filter='{}'".format(
+            configuration, filter
+        )
     )
 
-    storage_accounts = __fetch_storage_accounts(filter, configuration, secrets)
+    storage_accounts = __fetch_storage_accounts(
+        filter, configuration, secrets, count, percentage, seed
+    )
 
     client = __storage_mgmt_client(secrets, configuration)
+    deadline = retry_budget(configuration)
     storage_accounts_records = Records()
 
     for sa in storage_accounts:
         group = sa["resourceGroup"]
         name = sa["name"]
-        client.storage_accounts.delete(group, name)
+        sa["retries"] = submit(
+            client.storage_accounts.delete, group, name, deadline=deadline
+        ).retries
         storage_accounts_records.add(cleanse.storage_account(sa))
 
     return storage_accounts_records.output_as_dict("resources")
 
 
+@scoped
 def delete_blob_containers(
     filter: str = None,
     name_pattern: str = None,
@@ -93,6 +116,12 @@ def delete_blob_containers(
         Pick the number of blob containers matching the two filters that will be deleted. If the
         number is omitted all blob containers in the list will be deleted.
 
+    The storage accounts are listed, and the blob containers deleted,
+    concurrently with up to `azure_max_concurrency` calls in flight (16 by
+    default). Each record carries the `latency` of the deletion, in seconds,
+    and its `outcome`: `deleted` or `failed`, along with the `error`, or
+    `planned` in dry-run mode.
+
     Examples
     --------
     Some calling examples. Deep dive into the filter syntax:
@@ -111,37 +140,26 @@ def delete_blob_containers(
     Delete 3 blob containers at random from the group 'rg' matching the "chaos-*" pattern
     """
     logger.debug(
-        "Start delete_blob_containers: "
-        "configuration='{}', filter='{}'".format(configuration, filter)
+        "Start delete_blob_containers: configuration='{}', filter='{}'".format(
+            configuration, filter
+        )
     )
 
     if number == 0:
         raise FailedActivity("Cannot target 0 volumes")
 
-    pattern = None
-    if name_pattern:
-        pattern = re.compile(name_pattern)
-
     storage_accounts = __fetch_storage_accounts(filter, configuration, secrets)
 
     client = __storage_mgmt_client(secrets, configuration)
     blob_storage_records = Records()
+    deadline = retry_budget(configuration)
+    planning = dry_run(configuration)
 
-    containers_to_target = []
-
-    for sa in storage_accounts:
-        group = sa["resourceGroup"]
-        name = sa["name"]
-        containers = client.blob_containers.list(group, name)
-        for container in containers:
-            if pattern is None or pattern.search(container.name):
-                containers_to_target.append(
-                    {
-                        "group": group,
-                        "storage_name": name,
-                        "container_name": container.name,
-                    }
-                )
+    containers_to_target = list(
+        fetch_blob_containers(
+            storage_accounts, client, name_pattern, configuration
+        )
+    )
 
     if not containers_to_target:
         raise FailedActivity("No blob containers to target found")
@@ -151,17 +169,37 @@ def delete_blob_containers(
     else:
         containers_to_delete = random.sample(containers_to_target, number)
 
-    for container in containers_to_delete:
+    def delete_container(container):
         logger.debug(
             "Deleting container: {}/{}".format(
                 container["storage_name"], container["container_name"]
             )
         )
-        client.blob_containers.delete(
+        container["retries"] = submit(
+            client.blob_containers.delete,
             container["group"],
             container["storage_name"],
             container["container_name"],
-        )
+            deadline=deadline,
+        ).retries
+
+    outcomes = run_concurrently(
+        delete_container, containers_to_delete, max_concurrency(configuration)
+    )
+    for outcome in outcomes:
+        container = outcome.item
+        container["latency"] = round(outcome.latency, 3)
+        container["outcome"] = "planned" if planning else "deleted"
+        if outcome.error is not None:
+            logger.warning(
+                "Failed to delete container {}/{}: {}".format(
+                    container["storage_name"],
+                    container["container_name"],
+                    outcome.error,
+                )
+            )
+            container["outcome"] = "failed"
+            container["error"] = str(outcome.error)
         blob_storage_records.add(container)
     return blob_storage_records.output_as_dict("resources")
 
@@ -171,10 +209,23 @@ def delete_blob_containers(
 ###############################################################################
 
 
-def __fetch_storage_accounts(filter, configuration, secrets) -> []:
+def __fetch_storage_accounts(
+    filter,
+    configuration,
+    secrets,
+    count=None,
+    percentage=None,
+    seed=None,
+) -> []:
     logger.debug(RES_TYPE_SRV_SA)
     storage_accounts = fetch_resources(
-        filter, RES_TYPE_SRV_SA, secrets, configuration
+        filter,
+        RES_TYPE_SRV_SA,
+        secrets,
+        configuration,
+        count,
+        percentage,
+        seed,
     )
     logger.debug(storage_accounts)
     if not storage_accounts:
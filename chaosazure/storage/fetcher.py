@@ -0,0 +1,141 @@
+import logging
+import re
+from typing import Any, Dict, Iterable, Iterator
+from urllib.parse import quote
+
+from azure.core.rest import HttpRequest
+from chaoslib.types import Configuration
+
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
+
+logger = logging.getLogger("chaostoolkit")
+
+CONTAINERS_API_VERSION = "2022-09-01"
+CONTAINERS_PAGE_SIZE = 5000
+CONTAINERS_PATH = (
+    "/subscriptions/{subscription}/resourceGroups/{group}/providers/"
+    "Microsoft.Storage/storageAccounts/{name}/blobServices/default/containers"
+)
+
+
+def fetch_blob_containers(
+    storage_accounts: Iterable[Dict[str, Any]],
+    client,
+    name_pattern: str = None,
+    configuration: Configuration = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the blob containers of the storage accounts whose name matches
+    the pattern, if any.
+
+    The storage accounts are listed concurrently, sharing the given client,
+    and each container is filtered as its page is read so that only the
+    matching ones are kept. A storage account which cannot be listed is
+    logged and skipped.
+    """
+    pattern = re.compile(name_pattern) if name_pattern else None
+
+    def list_containers(sa):
+        group = sa["resourceGroup"]
+        name = sa["name"]
+        return [
+            {
+                "group": group,
+                "storage_name": name,
+                "container_name": container.name,
+            }
+            for container in client.blob_containers.list(group, name)
+            if pattern is None or pattern.search(container.name)
+        ]
+
+    outcomes = run_concurrently(
+        list_containers, storage_accounts, max_concurrency(configuration)
+    )
+    for outcome in outcomes:
+        if outcome.error is not None:
+            logger.warning(
+                "Failed to list the blob containers of '{}': {}".format(
+                    outcome.item["name"], outcome.error
+                )
+            )
+            continue
+
+        logger.debug(
+            "Listed {} matching blob containers of '{}' in {:.3f}s".format(
+                len(outcome.result), outcome.item["name"], outcome.latency
+            )
+        )
+        yield from outcome.result
+
+
+def count_blob_containers(
+    storage_accounts: Iterable[Dict[str, Any]],
+    client,
+    configuration: Configuration = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the number of blob containers of each storage account, as
+    `{"name": ..., "resourceGroup": ..., "count": ...}`.
+
+    The storage accounts are counted concurrently, sharing the given client.
+    Containers are listed with the largest pages the service allows and
+    without any expansion, their raw JSON pages being counted without
+    building a model for each of them. A storage account which cannot be
+    listed has a `None` count and the `error`.
+    """
+
+    def count_containers(sa):
+        return __count_containers(client, sa["resourceGroup"], sa["name"])
+
+    outcomes = run_concurrently(
+        count_containers, storage_accounts, max_concurrency(configuration)
+    )
+    for outcome in outcomes:
+        sa = outcome.item
+        result = {
+            "name": sa["name"],
+            "resourceGroup": sa["resourceGroup"],
+            "count": outcome.result,
+        }
+        if outcome.error is not None:
+            logger.warning(
+                "Failed to count the blob containers of '{}': {}".format(
+                    sa["name"], outcome.error
+                )
+            )
+            result["error"] = str(outcome.error)
+        yield result
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __count_containers(client, group: str, name: str) -> int:
+    # the multi API storage client has no raw request entry point, its
+    # pipeline is shared with the operations so it carries the credentials
+    pipeline = client._client
+    url = pipeline.format_url(
+        CONTAINERS_PATH.format(
+            subscription=quote(client._config.subscription_id),
+            group=quote(group),
+            name=quote(name),
+        )
+    )
+    params = {
+        "api-version": CONTAINERS_API_VERSION,
+        "$maxpagesize": str(CONTAINERS_PAGE_SIZE),
+    }
+
+    count = 0
+    while url:
+        response = pipeline.send_request(HttpRequest("GET", url, params=params))
+        response.raise_for_status()
+        page = response.json()
+        count += len(page.get("value") or [])
+
+        url = page.get("nextLink")
+        params = {}
+        if url and "api-version=" not in url:
+            params["api-version"] = CONTAINERS_API_VERSION
+
+    return count
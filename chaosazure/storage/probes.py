@@ -1,20 +1,29 @@
 # -*- coding: utf-8 -*-
 import logging
+from typing import Any, Dict
 
+from chaoslib.exceptions import FailedActivity
 from chaoslib.types import Configuration, Secrets
 
+from chaosazure.common.plan import scoped
 from chaosazure.storage.constants import RES_TYPE_SRV_SA
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    iter_resources,
+)
 from chaosazure.storage.actions import __storage_mgmt_client
+from chaosazure.storage.fetcher import count_blob_containers as count
 
 __all__ = [
     "describe_storage_accounts",
     "count_storage_accounts",
     "count_blob_containers",
+    "count_blob_containers_per_account",
 ]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def describe_storage_accounts(
     filter: str = None,
     configuration: Configuration = None,
@@ -37,12 +46,13 @@ def describe_storage_accounts(
         )
     )
 
-    storage_accounts = fetch_resources(
+    storage_accounts = iter_resources(
         filter, RES_TYPE_SRV_SA, secrets, configuration
     )
-    return storage_accounts
+    return list(storage_accounts)
 
 
+@scoped
 def count_storage_accounts(
     filter: str = None,
     configuration: Configuration = None,
@@ -71,6 +81,7 @@ def count_storage_accounts(
     return len(storage_accounts)
 
 
+@scoped
 def count_blob_containers(
     filter: str = None,
     configuration: Configuration = None,
@@ -79,6 +90,9 @@ def count_blob_containers(
     """
     Return count of Azure Blob Containers in filtered Storage account.
 
+    The storage accounts are counted concurrently and the probe fails when
+    any of them cannot be counted.
+
     Parameters
     ----------
     filter : str
@@ -88,21 +102,74 @@ def count_blob_containers(
         'where resourceGroup=="myresourcegroup" and name="myresourcename"'
     """
     logger.debug(
-        "Start count_storage_accounts: configuration='{}', filter='{}'".format(
+        "Start count_blob_containers: configuration='{}', filter='{}'".format(
             configuration, filter
         )
     )
 
+    counts = __count_per_account(filter, configuration, secrets)
+    failed = [c["name"] for c in counts if "error" in c]
+    if failed:
+        raise FailedActivity(
+            "Failed to count the blob containers of {}".format(failed)
+        )
+
+    return sum(c["count"] for c in counts)
+
+
+@scoped
+def count_blob_containers_per_account(
+    filter: str = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+) -> Dict[str, Any]:
+    """
+    Return count of Azure Blob Containers of each filtered Storage account
+    along with their total.
+
+    ```json
+    {
+        "total": 3,
+        "storage_accounts": [
+            {"name": "alpha", "resourceGroup": "rg", "count": 3},
+            {"name": "beta", "resourceGroup": "rg", "count": null,
+             "error": "..."}
+        ]
+    }
+    ```
+
+    A storage account which cannot be counted is reported with its error
+    and is left out of the total.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the storage account. If the filter is omitted all blob containers in
+        the subscription will be selected for the probe.
+        Filtering example:
+        'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    """
+    logger.debug(
+        "Start count_blob_containers_per_account: "
+        "configuration='{}', filter='{}'".format(configuration, filter)
+    )
+
+    counts = __count_per_account(filter, configuration, secrets)
+    counts.sort(key=lambda c: (c["resourceGroup"], c["name"]))
+
+    return {
+        "total": sum(c["count"] for c in counts if "error" not in c),
+        "storage_accounts": counts,
+    }
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __count_per_account(filter, configuration, secrets):
     storage_accounts = fetch_resources(
         filter, RES_TYPE_SRV_SA, secrets, configuration
     )
     client = __storage_mgmt_client(secrets, configuration)
-    count = 0
-
-    for sa in storage_accounts:
-        group = sa["resourceGroup"]
-        name = sa["name"]
-        containers = client.blob_containers.list(group, name)
-        count += sum(1 for _ in containers)
 
-    return count
+    return list(count(storage_accounts, client, configuration))
@@ -1,12 +1,20 @@
 import logging
-from typing import Iterable, Mapping
+from typing import Any, Dict, Iterable, Mapping
 
 from chaoslib import Configuration, Secrets
 
 from chaosazure import init_compute_management_client
 from chaosazure.common import cleanse
 from chaosazure.common.compute import command
-from chaosazure.vmss.fetcher import fetch_vmss, fetch_instances
+from chaosazure.common.plan import scoped
+from chaosazure.common.schedule import Schedule
+from chaosazure.common.selection import select_targets
+from chaosazure.common.submission import retry_budget, submit
+from chaosazure.vmss.fetcher import (
+    fetch_all_instances,
+    fetch_instances,
+    fetch_vmss,
+)
 from chaosazure.vmss.records import Records
 
 __all__ = [
@@ -22,11 +30,14 @@ __all__ = [
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def delete_vmss(
     filter: str = None,
     instance_criteria: Iterable[Mapping[str, any]] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    selection: Dict[str, Any] = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Delete a virtual machine scale set instance at random.
@@ -42,6 +53,17 @@ def delete_vmss(
         potential chaos candidates.
         Filtering example:
         'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    selection : dict, optional
+        Select the instances of each scale set by zone, fault domain, update
+        domain or tag instead of picking one at random, for instance to stop
+        an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Starting delete_vmss: configuration='{}', filter='{}'".format(
@@ -50,21 +72,25 @@ def delete_vmss(
     )
 
     vmss = fetch_vmss(filter, configuration, secrets)
-    vmss_records = Records()
+    deadline = retry_budget(configuration)
+    vmss_records = Records("delete")
+    pacing = Schedule(schedule, configuration)
     for scale_set in vmss:
-        instances_records = Records()
-        instances = fetch_instances(
-            scale_set, instance_criteria, configuration, secrets
+        instances_records = Records("delete")
+        instances = __fetch_targets(
+            scale_set, instance_criteria, selection, configuration, secrets
         )
 
-        for instance in instances:
+        for instance in pacing.paced(instances):
             logger.debug("Deleting instance: {}".format(instance["name"]))
             client = init_compute_management_client(secrets, configuration)
-            client.virtual_machine_scale_set_vms.begin_delete(
+            instance["retries"] = submit(
+                client.virtual_machine_scale_set_vms.begin_delete,
                 scale_set["resourceGroup"],
                 scale_set["name"],
                 instance["instance_id"],
-            )
+                deadline=deadline,
+            ).retries
             instances_records.add(cleanse.vmss_instance(instance))
 
         scale_set["virtualMachines"] = instances_records.output()
@@ -73,11 +99,14 @@ def delete_vmss(
     return vmss_records.output_as_dict("resources")
 
 
+@scoped
 def restart_vmss(
     filter: str = None,
     instance_criteria: Iterable[Mapping[str, any]] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    selection: Dict[str, Any] = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Restart a virtual machine scale set instance at random.
@@ -89,6 +118,17 @@ def restart_vmss(
         potential chaos candidates.
         Filtering example:
         'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    selection : dict, optional
+        Select the instances of each scale set by zone, fault domain, update
+        domain or tag instead of picking one at random, for instance to stop
+        an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Starting restart_vmss: configuration='{}', filter='{}'".format(
@@ -97,21 +137,25 @@ def restart_vmss(
     )
 
     vmss = fetch_vmss(filter, configuration, secrets)
+    deadline = retry_budget(configuration)
     vmss_records = Records()
+    pacing = Schedule(schedule, configuration)
     for scale_set in vmss:
         instances_records = Records()
-        instances = fetch_instances(
-            scale_set, instance_criteria, configuration, secrets
+        instances = __fetch_targets(
+            scale_set, instance_criteria, selection, configuration, secrets
         )
 
-        for instance in instances:
+        for instance in pacing.paced(instances):
             logger.debug("Restarting instance: {}".format(instance["name"]))
             client = init_compute_management_client(secrets, configuration)
-            client.virtual_machine_scale_set_vms.begin_restart(
+            instance["retries"] = submit(
+                client.virtual_machine_scale_set_vms.begin_restart,
                 scale_set["resourceGroup"],
                 scale_set["name"],
                 instance["instance_id"],
-            )
+                deadline=deadline,
+            ).retries
             instances_records.add(cleanse.vmss_instance(instance))
 
         scale_set["virtualMachines"] = instances_records.output()
@@ -120,11 +164,14 @@ def restart_vmss(
     return vmss_records.output_as_dict("resources")
 
 
+@scoped
 def stop_vmss(
     filter: str = None,
     instance_criteria: Iterable[Mapping[str, any]] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    selection: Dict[str, Any] = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Stops instances from the filtered scale set either at random or by
@@ -158,6 +205,17 @@ def stop_vmss(
         instanceId = 3. The criteria {"instanceId": "3"} will be the first
         match since both the name and the instanceId did not match on the
         first criteria.
+    selection : dict, optional
+        Select the instances of each scale set by zone, fault domain, update
+        domain or tag instead of picking one at random, for instance to stop
+        an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Starting stop_vmss: configuration='{}', filter='{}'".format(
@@ -166,21 +224,25 @@ def stop_vmss(
     )
 
     vmss = fetch_vmss(filter, configuration, secrets)
+    deadline = retry_budget(configuration)
     vmss_records = Records()
+    pacing = Schedule(schedule, configuration)
     for scale_set in vmss:
         instances_records = Records()
-        instances = fetch_instances(
-            scale_set, instance_criteria, configuration, secrets
+        instances = __fetch_targets(
+            scale_set, instance_criteria, selection, configuration, secrets
         )
 
-        for instance in instances:
+        for instance in pacing.paced(instances):
             logger.debug("Stopping instance: {}".format(instance["name"]))
             client = init_compute_management_client(secrets, configuration)
-            client.virtual_machine_scale_set_vms.begin_power_off(
+            instance["retries"] = submit(
+                client.virtual_machine_scale_set_vms.begin_power_off,
                 scale_set["resourceGroup"],
                 scale_set["name"],
                 instance["instance_id"],
-            )
+                deadline=deadline,
+            ).retries
             instances_records.add(cleanse.vmss_instance(instance))
 
         scale_set["virtualMachines"] = instances_records.output()
@@ -189,11 +251,14 @@ def stop_vmss(
     return vmss_records.output_as_dict("resources")
 
 
+@scoped
 def deallocate_vmss(
     filter: str = None,
     instance_criteria: Iterable[Mapping[str, any]] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    selection: Dict[str, Any] = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Deallocate a virtual machine scale set instance at random.
@@ -205,6 +270,17 @@ def deallocate_vmss(
         potential chaos candidates.
         Filtering example:
         'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    selection : dict, optional
+        Select the instances of each scale set by zone, fault domain, update
+        domain or tag instead of picking one at random, for instance to stop
+        an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Starting deallocate_vmss: configuration='{}', filter='{}'".format(
@@ -213,21 +289,25 @@ def deallocate_vmss(
     )
 
     vmss = fetch_vmss(filter, configuration, secrets)
+    deadline = retry_budget(configuration)
     vmss_records = Records()
+    pacing = Schedule(schedule, configuration)
     for scale_set in vmss:
         instances_records = Records()
-        instances = fetch_instances(
-            scale_set, instance_criteria, configuration, secrets
+        instances = __fetch_targets(
+            scale_set, instance_criteria, selection, configuration, secrets
         )
 
-        for instance in instances:
+        for instance in pacing.paced(instances):
             logger.debug("Deallocating instance: {}".format(instance["name"]))
             client = init_compute_management_client(secrets, configuration)
-            client.virtual_machine_scale_set_vms.begin_deallocate(
+            instance["retries"] = submit(
+                client.virtual_machine_scale_set_vms.begin_deallocate,
                 scale_set["resourceGroup"],
                 scale_set["name"],
                 instance["instance_id"],
-            )
+                deadline=deadline,
+            ).retries
             instances_records.add(cleanse.vmss_instance(instance))
 
         scale_set["virtualMachines"] = instances_records.output()
@@ -236,6 +316,7 @@ def deallocate_vmss(
     return vmss_records.output_as_dict("resources")
 
 
+@scoped
 def stress_vmss_instance_cpu(
     filter: str = None,
     duration: int = 120,
@@ -261,6 +342,12 @@ def stress_cpu(
     instance_criteria: Iterable[Mapping[str, any]] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    async_execution: bool = False,
+    run_command_name: str = None,
+    output_blob_uri: str = None,
+    load: int = 100,
+    selection: Dict[str, Any] = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Stresses the CPU of a random VMSS instances in your selected VMSS.
@@ -278,6 +365,31 @@ def stress_cpu(
         Additional wait time (in seconds) for stress operation to be completed.
         Getting and sending data from/to Azure may take some time so it's not
         recommended to set this value to less than 30s. Defaults to 60 seconds.
+    async_execution : bool, optional
+        Start the script as a managed run command with asynchronous
+        execution instead of waiting for it on each instance in turn. The
+        run can later be collected with the `describe_run_commands` probe.
+        Defaults to False.
+    run_command_name : str, optional
+        Name of the managed run command when `async_execution` is set.
+        Defaults to a generated name reported in the activity output.
+    output_blob_uri : str, optional
+        URI of a blob container, optionally with a SAS token, the output of
+        the managed run commands is streamed to.
+    load : int, optional
+        Target utilization (in percent) of each core, one worker is started
+        per core. Defaults to 100.
+    selection : dict, optional
+        Select the instances of each scale set by zone, fault domain, update
+        domain or tag instead of picking one at random, for instance to stop
+        an entire zone:
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"}.
+        See `chaosazure.common.selection.select` for the strategies.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Starting stress_vmss_instance_cpu:"
@@ -289,20 +401,28 @@ def stress_cpu(
 
     vmss_records = Records()
     vmss = fetch_vmss(filter, configuration, secrets)
+    client = None
+    if async_execution:
+        run_command_name = run_command_name or command.new_run_command_name()
+        client = init_compute_management_client(secrets, configuration)
+    pacing = Schedule(schedule, configuration)
     for scale_set in vmss:
         instances_records = Records()
-        instances = fetch_instances(
-            scale_set, instance_criteria, configuration, secrets
+        instances = __fetch_targets(
+            scale_set, instance_criteria, selection, configuration, secrets
         )
 
-        for instance in instances:
+        for instance in pacing.paced(instances):
             command_id, script_content = command.prepare(
                 instance, "cpu_stress_test"
             )
             parameters = {
                 "command_id": command_id,
                 "script": [script_content],
-                "parameters": [{"name": "duration", "value": duration}],
+                "parameters": [
+                    {"name": "duration", "value": duration},
+                    {"name": "load", "value": load},
+                ],
             }
 
             logger.debug(
@@ -311,13 +431,16 @@ def stress_cpu(
                 )
             )
             _timeout = duration + timeout
-            command.run(
+            __execute_script(
                 scale_set["resourceGroup"],
                 instance,
                 _timeout,
                 parameters,
-                secrets,
+                run_command_name,
+                output_blob_uri,
+                client,
                 configuration,
+                secrets,
             )
             instances_records.add(cleanse.vmss_instance(instance))
 
@@ -327,6 +450,7 @@ def stress_cpu(
     return vmss_records.output_as_dict("resources")
 
 
+@scoped
 def burn_io(
     filter: str = None,
     duration: int = 60,
@@ -334,10 +458,26 @@ def burn_io(
     instance_criteria: Iterable[Mapping[str, any]] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    async_execution: bool = False,
+    run_command_name: str = None,
+    output_blob_uri: str = None,
+    block_size: str = "32K",
+    queue_depth: int = 1,
+    direct_io: bool = False,
+    selection: Dict[str, Any] = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Increases the Disk I/O operations per second of the VMSS machine.
     Similar to the burn_io action of the machine.actions module.
+
+    Parameters
+    ----------
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Starting burn_io: configuration='{}', filter='{}', duration='{}',"
@@ -345,32 +485,45 @@ def burn_io(
     )
 
     vmss = fetch_vmss(filter, configuration, secrets)
+    client = None
+    if async_execution:
+        run_command_name = run_command_name or command.new_run_command_name()
+        client = init_compute_management_client(secrets, configuration)
     vmss_records = Records()
+    pacing = Schedule(schedule, configuration)
     for scale_set in vmss:
         instances_records = Records()
-        instances = fetch_instances(
-            scale_set, instance_criteria, configuration, secrets
+        instances = __fetch_targets(
+            scale_set, instance_criteria, selection, configuration, secrets
         )
 
-        for instance in instances:
+        for instance in pacing.paced(instances):
             command_id, script_content = command.prepare(instance, "burn_io")
             parameters = {
                 "command_id": command_id,
                 "script": [script_content],
-                "parameters": [{"name": "duration", "value": duration}],
+                "parameters": [
+                    {"name": "duration", "value": duration},
+                    {"name": "block_size", "value": block_size},
+                    {"name": "queue_depth", "value": queue_depth},
+                    {"name": "direct", "value": 1 if direct_io else 0},
+                ],
             }
 
             logger.debug(
                 "Burning IO of VMSS instance: '{}'".format(instance["name"])
             )
             _timeout = duration + timeout
-            command.run(
+            __execute_script(
                 scale_set["resourceGroup"],
                 instance,
                 _timeout,
                 parameters,
-                secrets,
+                run_command_name,
+                output_blob_uri,
+                client,
                 configuration,
+                secrets,
             )
             instances_records.add(cleanse.vmss_instance(instance))
 
@@ -380,6 +533,7 @@ def burn_io(
     return vmss_records.output_as_dict("resources")
 
 
+@scoped
 def fill_disk(
     filter: str = None,
     duration: int = 120,
@@ -389,10 +543,23 @@ def fill_disk(
     instance_criteria: Iterable[Mapping[str, any]] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    async_execution: bool = False,
+    run_command_name: str = None,
+    output_blob_uri: str = None,
+    selection: Dict[str, Any] = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Fill the VMSS machine disk with random data. Similar to
     the fill_disk action of the machine.actions module.
+
+    Parameters
+    ----------
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Starting fill_disk: configuration='{}', filter='{}',"
@@ -402,14 +569,19 @@ def fill_disk(
     )
 
     vmss = fetch_vmss(filter, configuration, secrets)
+    client = None
+    if async_execution:
+        run_command_name = run_command_name or command.new_run_command_name()
+        client = init_compute_management_client(secrets, configuration)
     vmss_records = Records()
+    pacing = Schedule(schedule, configuration)
     for scale_set in vmss:
         instances_records = Records()
-        instances = fetch_instances(
-            scale_set, instance_criteria, configuration, secrets
+        instances = __fetch_targets(
+            scale_set, instance_criteria, selection, configuration, secrets
         )
 
-        for instance in instances:
+        for instance in pacing.paced(instances):
             command_id, script_content = command.prepare(instance, "fill_disk")
             fill_path = command.prepare_path(instance, path)
 
@@ -427,13 +599,16 @@ def fill_disk(
                 "Filling disk of VMSS instance: '{}'".format(instance["name"])
             )
             _timeout = duration + timeout
-            command.run(
+            __execute_script(
                 scale_set["resourceGroup"],
                 instance,
                 _timeout,
                 parameters,
-                secrets,
+                run_command_name,
+                output_blob_uri,
+                client,
                 configuration,
+                secrets,
             )
             instances_records.add(cleanse.vmss_instance(instance))
 
@@ -443,6 +618,7 @@ def fill_disk(
     return vmss_records.output_as_dict("resources")
 
 
+@scoped
 def network_latency(
     filter: str = None,
     duration: int = 60,
@@ -452,10 +628,25 @@ def network_latency(
     instance_criteria: Iterable[Mapping[str, any]] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    async_execution: bool = False,
+    run_command_name: str = None,
+    output_blob_uri: str = None,
+    interface: str = None,
+    cidr: str = None,
+    selection: Dict[str, Any] = None,
+    schedule: Dict[str, Any] = None,
 ):
     """
     Increases the response time of the virtual machine. Similar to
     the network_latency action of the machine.actions module.
+
+    Parameters
+    ----------
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
     """
     logger.debug(
         "Starting network_latency: configuration='{}', filter='{}',"
@@ -465,14 +656,19 @@ def network_latency(
     )
 
     vmss = fetch_vmss(filter, configuration, secrets)
+    client = None
+    if async_execution:
+        run_command_name = run_command_name or command.new_run_command_name()
+        client = init_compute_management_client(secrets, configuration)
     vmss_records = Records()
+    pacing = Schedule(schedule, configuration)
     for scale_set in vmss:
         instances_records = Records()
-        instances = fetch_instances(
-            scale_set, instance_criteria, configuration, secrets
+        instances = __fetch_targets(
+            scale_set, instance_criteria, selection, configuration, secrets
         )
 
-        for instance in instances:
+        for instance in pacing.paced(instances):
             command_id, script_content = command.prepare(
                 instance, "network_latency"
             )
@@ -485,6 +681,9 @@ def network_latency(
                     {"name": "jitter", "value": jitter},
                 ],
             }
+            __add_optional_parameters(
+                parameters, {"interface": interface, "cidr": cidr}
+            )
 
             logger.debug(
                 "Increasing the latency of VMSS instance: '{}'".format(
@@ -492,13 +691,16 @@ def network_latency(
                 )
             )
             _timeout = duration + timeout
-            command.run(
+            __execute_script(
                 scale_set["resourceGroup"],
                 instance,
                 _timeout,
                 parameters,
-                secrets,
+                run_command_name,
+                output_blob_uri,
+                client,
                 configuration,
+                secrets,
             )
             instances_records.add(cleanse.vmss_instance(instance))
 
@@ -506,3 +708,61 @@ def network_latency(
         vmss_records.add(cleanse.vmss(scale_set))
 
     return vmss_records.output_as_dict("resources")
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __fetch_targets(
+    scale_set, instance_criteria, selection, configuration, secrets
+):
+    if not selection:
+        return fetch_instances(
+            scale_set, instance_criteria, configuration, secrets
+        )
+
+    expand = None
+    if selection.get("group_by") in ("fault_domain", "update_domain"):
+        expand = "instanceView"
+    instances = fetch_all_instances(scale_set, configuration, secrets, expand)
+    return select_targets(instances, selection)
+
+
+def __execute_script(
+    resource_group,
+    instance,
+    timeout,
+    parameters,
+    run_command_name,
+    output_blob_uri,
+    client,
+    configuration,
+    secrets,
+):
+    if run_command_name:
+        instance["run_command"] = command.submit(
+            resource_group,
+            instance,
+            timeout,
+            parameters,
+            run_command_name,
+            output_blob_uri,
+            secrets,
+            configuration,
+            client=client,
+        )
+    else:
+        instance["output"] = command.run(
+            resource_group,
+            instance,
+            timeout,
+            parameters,
+            secrets,
+            configuration,
+        )
+
+
+def __add_optional_parameters(parameters, optional_parameters):
+    for name, value in optional_parameters.items():
+        if value:
+            parameters["parameters"].append({"name": name, "value": value})
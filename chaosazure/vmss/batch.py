@@ -0,0 +1,68 @@
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from azure.mgmt.compute.models import (
+    VirtualMachineScaleSetVMInstanceIDs,
+    VirtualMachineScaleSetVMInstanceRequiredIDs,
+)
+from chaoslib.exceptions import InterruptExecution
+
+logger = logging.getLogger("chaostoolkit")
+
+OPERATIONS = ["delete", "stop", "deallocate", "restart", "start"]
+
+
+def group_instances(
+    instances: Iterable[dict],
+) -> Dict[Tuple[str, str], List[dict]]:
+    """
+    Group VMSS instances by the resource group and the scale set they belong
+    to so that each scale set can be targeted with a single request.
+    """
+    groups = {}
+    for instance in instances:
+        key = (instance["resourceGroup"], instance["scale_set"])
+        groups.setdefault(key, []).append(instance)
+
+    return groups
+
+
+def begin_batch(
+    client,
+    operation: str,
+    resource_group: str,
+    scale_set: str,
+    instance_ids: List[str],
+):
+    """
+    Apply the operation to many instances of a scale set at once through the
+    scale set level API, and return the poller of the long running operation.
+    """
+    logger.debug(
+        "Applying '{}' to instances {} of VMSS '{}'".format(
+            operation, instance_ids, scale_set
+        )
+    )
+    operations = client.virtual_machine_scale_sets
+    if operation == "delete":
+        return operations.begin_delete_instances(
+            resource_group,
+            scale_set,
+            VirtualMachineScaleSetVMInstanceRequiredIDs(
+                instance_ids=instance_ids
+            ),
+        )
+
+    ids = VirtualMachineScaleSetVMInstanceIDs(instance_ids=instance_ids)
+    if operation == "stop":
+        return operations.begin_power_off(resource_group, scale_set, ids)
+    elif operation == "deallocate":
+        return operations.begin_deallocate(resource_group, scale_set, ids)
+    elif operation == "restart":
+        return operations.begin_restart(resource_group, scale_set, ids)
+    elif operation == "start":
+        return operations.begin_start(resource_group, scale_set, ids)
+
+    raise InterruptExecution(
+        "Unsupported VMSS batch operation '{}'".format(operation)
+    )
@@ -1,2 +1,20 @@
 RES_TYPE_VMSS = "Microsoft.Compute/virtualMachineScaleSets"
 RES_TYPE_VMSS_VM = "Microsoft.Compute/virtualMachineScaleSets/virtualMachines"
+
+# Counts the instances of the scale sets matching the user filter per state
+# and zone, the scale set of an instance being the prefix of its id
+INSTANCE_STATES_QUERY = """{scale_sets}
+| project scaleSet=name, scaleSetId=tolower(id)
+| join kind=inner (
+    ComputeResources
+    | where type=~'{instance_type}'
+    | extend scaleSetId=tostring(split(tolower(id), '/virtualmachines/')[0])
+    | project scaleSetId, zone=tostring(zones[0]),
+        powerState=tolower(tostring(split(tostring(
+            properties.extended.instanceView.powerState.code), '/')[1])),
+        provisioningState=tolower(tostring(properties.provisioningState)),
+        health=tolower(tostring(split(tostring(
+            properties.extended.instanceView.vmHealth.status.code), '/')[1]))
+) on scaleSetId
+| summarize count=count()
+    by scaleSet, powerState, provisioningState, health, zone"""
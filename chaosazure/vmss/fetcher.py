@@ -48,6 +48,18 @@ def instances_by_criteria(
     return result
 
 
+def fetch_all_instances(
+    scale_set, configuration, secrets, expand: str = None
+) -> List[Dict[str, Any]]:
+    instances = __fetch_vmss_instances(
+        scale_set, configuration, secrets, expand
+    )
+    if not instances:
+        raise FailedActivity("No VMSS instances found")
+
+    return instances
+
+
 def fetch_vmss(filter, configuration, secrets) -> List[dict]:
     vmss = fetch_resources(filter, RES_TYPE_VMSS, secrets, configuration)
 
@@ -63,11 +75,18 @@ def fetch_vmss(filter, configuration, secrets) -> List[dict]:
 #############################################################################
 # Private helper functions
 #############################################################################
-def __fetch_vmss_instances(choice, configuration, secrets) -> List[Dict]:
+def __fetch_vmss_instances(
+    choice, configuration, secrets, expand: str = None
+) -> List[Dict]:
     client = init_compute_management_client(secrets, configuration)
-    vmss_instances = client.virtual_machine_scale_set_vms.list(
-        choice["resourceGroup"], choice["name"]
-    )
+    if expand:
+        vmss_instances = client.virtual_machine_scale_set_vms.list(
+            choice["resourceGroup"], choice["name"], expand=expand
+        )
+    else:
+        vmss_instances = client.virtual_machine_scale_set_vms.list(
+            choice["resourceGroup"], choice["name"]
+        )
     results = __parse_vmss_instances_result(vmss_instances, choice)
     return results
 
@@ -1,22 +1,49 @@
 # -*- coding: utf-8 -*-
 import logging
+from typing import Any, Dict, List
 
+from chaoslib.exceptions import FailedActivity
 from chaoslib.types import Configuration, Secrets
 
-from chaosazure.common.resources.graph import fetch_resources
-from chaosazure.vmss.constants import RES_TYPE_VMSS
+from chaosazure import init_compute_management_client
+from chaosazure.common.compute import command
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
+from chaosazure.common.plan import scoped
+from chaosazure.common.resources.graph import fetch_resources, query_resources
+from chaosazure.common.resources.query import Query
+from chaosazure.vmss.constants import (
+    INSTANCE_STATES_QUERY,
+    RES_TYPE_VMSS,
+    RES_TYPE_VMSS_VM,
+)
+from chaosazure.vmss.fetcher import fetch_vmss, fetch_all_instances
 
-__all__ = ["count_instances"]
+STATE_COLUMNS = ["powerState", "provisioningState", "health", "zone"]
+# key of the counts per value of each state column in the probe output
+STATE_KEYS = {
+    "powerState": "power_states",
+    "provisioningState": "provisioning_states",
+    "health": "health_states",
+    "zone": "zones",
+}
+
+__all__ = [
+    "count_instances",
+    "count_instances_by_state",
+    "describe_run_commands",
+]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def count_instances(
     filter: str = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
 ) -> int:
     """
-    Return count of VMSS instances.
+    Return count of VMSS. Their instances are counted by
+    `count_instances_by_state`.
 
     Parameters
     ----------
@@ -34,3 +61,193 @@ def count_instances(
 
     instances = fetch_resources(filter, RES_TYPE_VMSS, secrets, configuration)
     return len(instances)
+
+
+@scoped
+def count_instances_by_state(
+    filter: str = None,
+    source: str = "graph",
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+) -> Dict[str, Any]:
+    """
+    Count the instances of the filtered VMSS per power state, such as
+    `running` or `deallocated`, provisioning state, health, as reported by
+    the application health extension, and zone.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the VMSS. If the filter is omitted all VMSS in the
+        subscription will be selected for the probe.
+    source : str, optional
+        `graph` to let Resource Graph count the instances with a single
+        query, or `compute` to list the instances of each scale set, with
+        their instance view, concurrently from the compute API, for
+        instances Resource Graph does not index such as those of flexible
+        scale sets. Defaults to `graph`.
+
+    The result carries the `total` number of instances, their count per
+    value under `power_states`, `provisioning_states`, `health_states` and
+    `zones`, for instance to check that `power_states.running` did not
+    drop below the expected capacity, and the count of each combination
+    under `groups`, such as: {"scaleSet": "ss", "powerState": "running",
+    "provisioningState": "succeeded", "health": "healthy", "zone": "1",
+    "count": 3}. Unknown values are counted as empty ones.
+    """
+    logger.debug(
+        "Starting count_instances_by_state: configuration='{}', "
+        "filter='{}', source='{}'".format(configuration, filter, source)
+    )
+
+    if source == "graph":
+        query = INSTANCE_STATES_QUERY.format(
+            scale_sets=Query(RES_TYPE_VMSS).filter(filter),
+            instance_type=RES_TYPE_VMSS_VM,
+        )
+        groups = [
+            dict(row) for row in query_resources(query, secrets, configuration)
+        ]
+    elif source == "compute":
+        groups = __instance_states(
+            fetch_vmss(filter, configuration, secrets), configuration, secrets
+        )
+    else:
+        raise FailedActivity(
+            "Unknown source '{}', expected 'graph' or 'compute'".format(source)
+        )
+
+    return __aggregate(groups)
+
+
+@scoped
+def describe_run_commands(
+    filter: str = None,
+    run_command_name: str = None,
+    timeout: int = 300,
+    interval: int = 5,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+):
+    """
+    Collect the state and output of a managed run command started with
+    `async_execution` on the instances of the filtered VMSS. Similar to the
+    describe_run_commands probe of the machine.probes module.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the VMSS. If the filter is omitted all VMSS in the
+        subscription will be selected for the probe.
+    run_command_name : str
+        Name of the run command, as reported by the action that started it.
+    timeout : int, optional
+        How long (in seconds) to wait for the runs to finish. Use 0 to only
+        take a snapshot of their current state. Defaults to 300 seconds.
+    interval : int, optional
+        Time (in seconds) between two polls. Defaults to 5 seconds.
+    """
+    logger.debug(
+        "Starting describe_run_commands: configuration='{}', filter='{}',"
+        " run_command_name='{}'".format(configuration, filter, run_command_name)
+    )
+
+    if not run_command_name:
+        raise FailedActivity("A run command name is required")
+
+    runs = []
+    for scale_set in fetch_vmss(filter, configuration, secrets):
+        for instance in fetch_all_instances(scale_set, configuration, secrets):
+            runs.append(
+                {
+                    "run_command_name": run_command_name,
+                    "resource_group": scale_set["resourceGroup"],
+                    "type": RES_TYPE_VMSS_VM.lower(),
+                    "scale_set": scale_set["name"],
+                    "instance_id": instance["instance_id"],
+                }
+            )
+
+    results = command.poll(runs, timeout, interval, secrets, configuration)
+    return [r for r in results if r["execution_state"] != "NotFound"]
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __instance_states(
+    scale_sets: List[dict], configuration: Configuration, secrets: Secrets
+) -> List[Dict[str, Any]]:
+    client = init_compute_management_client(secrets, configuration)
+
+    # only the instance views are listed, their statuses carrying the
+    # provisioning state when the properties are left out
+    def list_instances(scale_set):
+        return [
+            i.as_dict()
+            for i in client.virtual_machine_scale_set_vms.list(
+                scale_set["resourceGroup"],
+                scale_set["name"],
+                expand="instanceView",
+                select="instanceView",
+            )
+        ]
+
+    groups = {}
+    outcomes = run_concurrently(
+        list_instances, scale_sets, max_concurrency(configuration)
+    )
+    for outcome in outcomes:
+        if outcome.error is not None:
+            raise FailedActivity(
+                "Failed to list the instances of VMSS '{}': {}".format(
+                    outcome.item["name"], outcome.error
+                )
+            )
+        for instance in outcome.result:
+            view = instance.get("instance_view") or {}
+            codes = [s.get("code") or "" for s in view.get("statuses") or []]
+            health = ((view.get("vm_health") or {}).get("status") or {}).get(
+                "code"
+            )
+            key = (
+                outcome.item["name"],
+                __status(codes, "PowerState/"),
+                (instance.get("provisioning_state") or "").lower()
+                or __status(codes, "ProvisioningState/"),
+                __status([health or ""], "HealthState/"),
+                (instance.get("zones") or [""])[0],
+            )
+            groups[key] = groups.get(key, 0) + 1
+
+    return [
+        dict(zip(["scaleSet"] + STATE_COLUMNS, key), count=count)
+        for key, count in groups.items()
+    ]
+
+
+def __status(codes: List[str], prefix: str) -> str:
+    for code in codes:
+        if code.lower().startswith(prefix.lower()):
+            return code[len(prefix) :].lower()
+    return ""
+
+
+def __aggregate(groups: List[Dict[str, Any]]) -> Dict[str, Any]:
+    result = {"total": 0, "groups": []}
+    for key in STATE_COLUMNS:
+        result[STATE_KEYS[key]] = {}
+
+    for group in groups:
+        group = dict(group)
+        for column in ["scaleSet"] + STATE_COLUMNS:
+            group[column] = group.get(column) or ""
+        result["total"] += group["count"]
+        result["groups"].append(group)
+        for column in STATE_COLUMNS:
+            counts = result[STATE_KEYS[column]]
+            counts[group[column]] = (
+                counts.get(group[column], 0) + group["count"]
+            )
+
+    return result
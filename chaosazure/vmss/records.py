@@ -1,19 +1,33 @@
 from calendar import timegm
 from datetime import datetime
 
+from chaosazure.common import plan
+from chaosazure.common.resources.rows import materialize
+
 
 class Records:
     elements = []
 
-    def __init__(self):
+    def __init__(self, operation: str = None):
         self.elements = []
+        # the operation performed on the elements, such as `delete`, is
+        # recorded along with them when given
+        self.operation = operation
 
     def add(self, element: dict):
         element["performed_at"] = timegm(datetime.utcnow().utctimetuple())
+        if self.operation is not None:
+            element["operation"] = self.operation
         self.elements.append(element)
 
     def output(self):
-        return self.elements
+        return materialize(self.elements)
 
     def output_as_dict(self, key: str):
-        return {key: self.elements}
+        output = {key: materialize(self.elements)}
+        # in dry-run mode, the records are the ones the activity would
+        # produce and the plan tells the calls it would make
+        _plan = plan.take()
+        if _plan is not None:
+            output["plan"] = _plan.summary()
+        return output
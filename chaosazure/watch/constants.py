@@ -0,0 +1,18 @@
+from chaosazure.application_gateway.constants import RES_TYPE_SRV_AG
+from chaosazure.postgresql_flexible.constants import RES_TYPE_SRV_PG_FLEX
+
+# resource type and state column of the resources whose states are counted
+# by Resource Graph alone
+STATE_COLUMNS = {
+    "postgresql_flexible_server_states": (
+        RES_TYPE_SRV_PG_FLEX,
+        "properties.state",
+    ),
+    "application_gateway_operational_states": (
+        RES_TYPE_SRV_AG,
+        "properties.operationalState",
+    ),
+}
+
+# shortest pause between two samples, in seconds
+MIN_INTERVAL = 1
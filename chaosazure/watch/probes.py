@@ -0,0 +1,170 @@
+import logging
+import time
+from typing import Any, Dict
+
+from chaoslib.exceptions import FailedActivity
+from chaoslib.types import Configuration, Secrets
+
+from chaosazure.common.plan import scoped
+from chaosazure.common.resources.graph import query_resources
+from chaosazure.common.resources.query import Query
+from chaosazure.common.session import session
+from chaosazure.machine.probes import count_machines_by_power_state
+from chaosazure.vmss.probes import count_instances_by_state
+from chaosazure.watch.constants import MIN_INTERVAL, STATE_COLUMNS
+
+METRICS = [
+    "machine_power_states",
+    "vmss_instance_power_states",
+    "vmss_instance_health_states",
+] + list(STATE_COLUMNS)
+
+__all__ = ["watch_states"]
+logger = logging.getLogger("chaostoolkit")
+
+
+@scoped
+def watch_states(
+    metric: str,
+    filter: str = None,
+    state: str = None,
+    interval: float = 1.0,
+    duration: float = 60.0,
+    until_at_least: int = None,
+    until_at_most: int = None,
+    source: str = "graph",
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+) -> Dict[str, Any]:
+    """
+    Sample the count of the filtered resources per state every `interval`
+    seconds for `duration` seconds, to follow how a fleet degrades and
+    recovers during the experiment. All the samples share the same clients
+    and credentials, so only the first one pays for the authentication.
+
+    Parameters
+    ----------
+    metric : str
+        What is counted, one of `machine_power_states`,
+        `vmss_instance_power_states`, `vmss_instance_health_states`,
+        `postgresql_flexible_server_states` or
+        `application_gateway_operational_states`.
+    filter : str, optional
+        Filter the resources, the scale sets for the VMSS metrics. If the
+        filter is omitted all the resources of the subscription are counted.
+    state : str, optional
+        The value of each sample is the count of the resources in that
+        state, such as `running`, `healthy`, `ready` or `stopped`. When
+        omitted, the value is the count of all the resources.
+    interval : float
+        Seconds between the start of two samples, at least one second. A
+        sample outlasting the interval delays the next one to the following
+        interval.
+    duration : float
+        Seconds after which the watch stops.
+    until_at_least : int, optional
+        Stop the watch as soon as the value reaches that count.
+    until_at_most : int, optional
+        Stop the watch as soon as the value falls to that count.
+    source : str, optional
+        Source of the VMSS metrics, see `count_instances_by_state`.
+        Resource Graph reflects the changes of states with a delay, the
+        compute API does not.
+
+    The result carries the `samples` as `[timestamp, value]` pairs, the
+    timestamp being when the sample was requested, in seconds since the
+    epoch, the counts per state of the last sample under `states` and
+    whether a threshold stopped the watch under `reached`. Each sample is
+    logged as soon as it is taken.
+    """
+    logger.debug(
+        "Start watch_states: configuration='{}', metric='{}', filter='{}', "
+        "state='{}', interval='{}', duration='{}'".format(
+            configuration, metric, filter, state, interval, duration
+        )
+    )
+
+    if metric not in METRICS:
+        raise FailedActivity(
+            "Unknown metric '{}', expected one of {}".format(metric, METRICS)
+        )
+    if interval < MIN_INTERVAL:
+        raise FailedActivity(
+            "The interval must be at least {} seconds".format(MIN_INTERVAL)
+        )
+
+    samples = []
+    states = {}
+    reached = False
+    with session():
+        started = time.monotonic()
+        while True:
+            # the sample is stamped with the time its query was sent
+            timestamp = round(time.time(), 3)
+            states = __count_states(
+                metric, filter, source, configuration, secrets
+            )
+            if state is None:
+                value = sum(states.values())
+            else:
+                value = states.get(state.lower(), 0)
+            samples.append([timestamp, value])
+            logger.info("Watching {}: {}".format(metric, value))
+
+            if until_at_least is not None and value >= until_at_least:
+                reached = True
+                break
+            if until_at_most is not None and value <= until_at_most:
+                reached = True
+                break
+
+            # next start on the interval grid, skipping the missed ones
+            elapsed = time.monotonic() - started
+            due = (int(elapsed // interval) + 1) * interval
+            if due > duration:
+                break
+            time.sleep(due - elapsed)
+
+    return {
+        "metric": metric,
+        "state": state,
+        "samples": samples,
+        "states": states,
+        "reached": reached,
+    }
+
+
+###############################################################################
+# Private helper functions
+###############################################################################
+def __count_states(
+    metric: str,
+    filter: str,
+    source: str,
+    configuration: Configuration,
+    secrets: Secrets,
+) -> Dict[str, int]:
+    if metric == "machine_power_states":
+        return count_machines_by_power_state(
+            filter, [], configuration, secrets
+        )["states"]
+
+    if metric in ("vmss_instance_power_states", "vmss_instance_health_states"):
+        counts = count_instances_by_state(
+            filter, source, configuration, secrets
+        )
+        if metric == "vmss_instance_power_states":
+            return counts["power_states"]
+        return counts["health_states"]
+
+    resource_type, column = STATE_COLUMNS[metric]
+    query = (
+        Query(resource_type)
+        .filter(filter)
+        .extend("state", "tolower(tostring({}))".format(column))
+        .summarize(by=["state"])
+    )
+    return {
+        row["state"] or "": row["count"]
+        for row in query_resources(str(query), secrets, configuration)
+    }
@@ -1,18 +1,35 @@
 import logging
 import random
+from typing import Any, Dict
 
 from chaoslib import Secrets, Configuration
 from chaoslib.exceptions import FailedActivity
 
 from chaosazure import init_website_management_client
+from chaosazure.common import cleanse
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
+from chaosazure.common.plan import dry_run, scoped
 from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.schedule import Schedule
+from chaosazure.common.submission import retry_budget, submit
+from chaosazure.vmss.records import Records
 from chaosazure.webapp.constants import RES_TYPE_WEBAPP
 
 
-__all__ = ["stop_webapp", "restart_webapp", "start_webapp", "delete_webapp"]
+__all__ = [
+    "stop_webapp",
+    "restart_webapp",
+    "start_webapp",
+    "delete_webapp",
+    "stop_webapps",
+    "restart_webapps",
+    "start_webapps",
+    "delete_webapps",
+]
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def stop_webapp(
     filter: str = None,
     configuration: Configuration = None,
@@ -39,9 +56,19 @@ def stop_webapp(
 
     logger.debug("Stopping web app: {}".format(choice["name"]))
     client = init_website_management_client(secrets, configuration)
-    client.web_apps.stop(choice["resourceGroup"], choice["name"])
+    choice["retries"] = submit(
+        client.web_apps.stop,
+        choice["resourceGroup"],
+        choice["name"],
+        deadline=retry_budget(configuration),
+    ).retries
 
+    webapp_records = Records()
+    webapp_records.add(cleanse.webapp(choice))
+    return webapp_records.output_as_dict("resources")
 
+
+@scoped
 def restart_webapp(
     filter: str = None,
     configuration: Configuration = None,
@@ -68,9 +95,19 @@ def restart_webapp(
 
     logger.debug("Restarting web app: {}".format(choice["name"]))
     client = init_website_management_client(secrets, configuration)
-    client.web_apps.restart(choice["resourceGroup"], choice["name"])
+    choice["retries"] = submit(
+        client.web_apps.restart,
+        choice["resourceGroup"],
+        choice["name"],
+        deadline=retry_budget(configuration),
+    ).retries
+
+    webapp_records = Records()
+    webapp_records.add(cleanse.webapp(choice))
+    return webapp_records.output_as_dict("resources")
 
 
+@scoped
 def start_webapp(
     filter: str = None,
     configuration: Configuration = None,
@@ -97,9 +134,19 @@ def start_webapp(
 
     logger.debug("Starting web app: {}".format(choice["name"]))
     client = init_website_management_client(secrets, configuration)
-    client.web_apps.start(choice["resourceGroup"], choice["name"])
+    choice["retries"] = submit(
+        client.web_apps.start,
+        choice["resourceGroup"],
+        choice["name"],
+        deadline=retry_budget(configuration),
+    ).retries
 
+    webapp_records = Records()
+    webapp_records.add(cleanse.webapp(choice))
+    return webapp_records.output_as_dict("resources")
 
+
+@scoped
 def delete_webapp(
     filter: str = None,
     configuration: Configuration = None,
@@ -129,11 +176,292 @@ def delete_webapp(
 
     logger.debug("Deleting web app: {}".format(choice["name"]))
     client = init_website_management_client(secrets, configuration)
-    client.web_apps.delete(choice["resourceGroup"], choice["name"])
+    choice["retries"] = submit(
+        client.web_apps.delete,
+        choice["resourceGroup"],
+        choice["name"],
+        deadline=retry_budget(configuration),
+    ).retries
+
+    webapp_records = Records("delete")
+    webapp_records.add(cleanse.webapp(choice))
+    return webapp_records.output_as_dict("resources")
+
+
+@scoped
+def stop_webapps(
+    filter: str = None,
+    count: int = None,
+    slot: str = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
+):
+    """
+    Stop all the web apps matching the filter, or `count` of them at random.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the web apps. If the filter is omitted all web apps in
+        the subscription will be selected as potential chaos candidates.
+        Filtering example:
+        'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    count : int, optional
+        Number of web apps to stop at random among the matching ones. All of
+        them are stopped when omitted.
+    percentage : float, optional
+        Percentage of the matching web apps to pick at random, rounded up,
+        rather than a `count`.
+    seed : int, optional
+        Seed making the pick of the web apps reproducible.
+    slot : str, optional
+        Stop that deployment slot of each web app rather than its production
+        slot.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
+
+    The web apps are stopped concurrently, through a single client. Each
+    record carries the `slot`, the `latency` of the call, in seconds, and
+    its `outcome`: `succeeded` or `failed` along with the `error`, or
+    `planned` in dry-run mode.
+    """
+    logger.debug(
+        "Start stop_webapps: configuration='{}', filter='{}'".format(
+            configuration, filter
+        )
+    )
+
+    return __apply_to_webapps(
+        filter,
+        count,
+        "stop",
+        slot,
+        {},
+        configuration,
+        secrets,
+        percentage,
+        seed,
+        schedule,
+    )
+
+
+@scoped
+def restart_webapps(
+    filter: str = None,
+    count: int = None,
+    slot: str = None,
+    soft_restart: bool = False,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
+):
+    """
+    Restart all the web apps matching the filter, or `count` of them at
+    random.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the web apps. If the filter is omitted all web apps in
+        the subscription will be selected as potential chaos candidates.
+        Filtering example:
+        'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    count : int, optional
+        Number of web apps to restart at random among the matching ones. All
+        of them are restarted when omitted.
+    percentage : float, optional
+        Percentage of the matching web apps to pick at random, rounded up,
+        rather than a `count`.
+    seed : int, optional
+        Seed making the pick of the web apps reproducible.
+    slot : str, optional
+        Restart that deployment slot of each web app rather than its
+        production slot.
+    soft_restart : bool, optional
+        Only restart the application processes, applying the configuration
+        again, rather than the whole site.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
+
+    The web apps are restarted concurrently, through a single client. Each
+    record carries the `slot`, the `latency` of the call, in seconds, and
+    its `outcome`: `succeeded` or `failed` along with the `error`, or
+    `planned` in dry-run mode.
+    """
+    logger.debug(
+        "Start restart_webapps: configuration='{}', filter='{}'".format(
+            configuration, filter
+        )
+    )
+
+    arguments = {"soft_restart": True} if soft_restart else {}
+    return __apply_to_webapps(
+        filter,
+        count,
+        "restart",
+        slot,
+        arguments,
+        configuration,
+        secrets,
+        percentage,
+        seed,
+        schedule,
+    )
+
+
+@scoped
+def start_webapps(
+    filter: str = None,
+    count: int = None,
+    slot: str = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
+):
+    """
+    Start all the web apps matching the filter, or `count` of them at random.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the web apps. If the filter is omitted all web apps in
+        the subscription will be selected as potential chaos candidates.
+        Filtering example:
+        'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    count : int, optional
+        Number of web apps to start at random among the matching ones. All of
+        them are started when omitted.
+    percentage : float, optional
+        Percentage of the matching web apps to pick at random, rounded up,
+        rather than a `count`.
+    seed : int, optional
+        Seed making the pick of the web apps reproducible.
+    slot : str, optional
+        Start that deployment slot of each web app rather than its production
+        slot.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
+
+    The web apps are started concurrently, through a single client. Each
+    record carries the `slot`, the `latency` of the call, in seconds, and
+    its `outcome`: `succeeded` or `failed` along with the `error`, or
+    `planned` in dry-run mode.
+    """
+    logger.debug(
+        "Start start_webapps: configuration='{}', filter='{}'".format(
+            configuration, filter
+        )
+    )
+
+    return __apply_to_webapps(
+        filter,
+        count,
+        "start",
+        slot,
+        {},
+        configuration,
+        secrets,
+        percentage,
+        seed,
+        schedule,
+    )
+
+
+@scoped
+def delete_webapps(
+    filter: str = None,
+    count: int = None,
+    slot: str = None,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    percentage: float = None,
+    seed: int = None,
+    schedule: Dict[str, Any] = None,
+):
+    """
+    Delete all the web apps matching the filter, or `count` of them at
+    random.
+
+    ***Be aware**: Deleting a web app is an invasive action. You will not be
+    able to recover the web app once you deleted it.
+
+    Parameters
+    ----------
+    filter : str
+        Filter the web apps. If the filter is omitted all web apps in
+        the subscription will be selected as potential chaos candidates.
+        Filtering example:
+        'where resourceGroup=="myresourcegroup" and name="myresourcename"'
+    count : int, optional
+        Number of web apps to delete at random among the matching ones. All
+        of them are deleted when omitted.
+    percentage : float, optional
+        Percentage of the matching web apps to pick at random, rounded up,
+        rather than a `count`.
+    seed : int, optional
+        Seed making the pick of the web apps reproducible.
+    slot : str, optional
+        Delete that deployment slot of each web app rather than the web app
+        itself.
+    schedule : dict, optional
+        Spread the operations over time rather than sending them all at
+        once, for instance two per second:
+        {"strategy": "rate", "per_second": 2}.
+        See `chaosazure.common.schedule.Schedule` for the strategies.
+
+    The web apps are deleted concurrently, through a single client. Each
+    record carries the `slot`, the `latency` of the call, in seconds, and
+    its `outcome`: `succeeded` or `failed` along with the `error`, or
+    `planned` in dry-run mode.
+    """
+    logger.debug(
+        "Start delete_webapps: configuration='{}', filter='{}'".format(
+            configuration, filter
+        )
+    )
+
+    return __apply_to_webapps(
+        filter,
+        count,
+        "delete",
+        slot,
+        {},
+        configuration,
+        secrets,
+        percentage,
+        seed,
+        schedule,
+    )
 
 
-def fetch_webapps(filter, configuration, secrets):
-    webapps = fetch_resources(filter, RES_TYPE_WEBAPP, secrets, configuration)
+def fetch_webapps(
+    filter, configuration, secrets, count=None, percentage=None, seed=None
+):
+    webapps = fetch_resources(
+        filter,
+        RES_TYPE_WEBAPP,
+        secrets,
+        configuration,
+        count,
+        percentage,
+        seed,
+    )
     if not webapps:
         logger.warning("No web apps found")
         raise FailedActivity("No web apps found")
@@ -148,6 +476,67 @@ def fetch_webapps(filter, configuration, secrets):
 # Private helper functions
 ###############################################################################
 def __fetch_webapp_at_random(filter, configuration, secrets):
-    webapps = fetch_webapps(filter, configuration, secrets)
+    # Resource Graph samples the web app rather than listing all of them
+    webapps = fetch_webapps(filter, configuration, secrets, count=1)
     choice = random.choice(webapps)
     return choice
+
+
+def __apply_to_webapps(
+    filter,
+    count,
+    operation,
+    slot,
+    arguments,
+    configuration,
+    secrets,
+    percentage=None,
+    seed=None,
+    schedule=None,
+):
+    if count is not None and count < 1:
+        raise FailedActivity("Cannot target less than one web app")
+
+    webapps = fetch_webapps(
+        filter, configuration, secrets, count, percentage, seed
+    )
+
+    client = init_website_management_client(secrets, configuration)
+    method = operation + "_slot" if slot else operation
+    deadline = retry_budget(configuration)
+
+    def act(webapp):
+        logger.debug("Calling {} on web app: {}".format(method, webapp["name"]))
+        args = [webapp["resourceGroup"], webapp["name"]]
+        if slot:
+            args.append(slot)
+        webapp["retries"] = submit(
+            getattr(client.web_apps, method),
+            *args,
+            deadline=deadline,
+            **arguments,
+        ).retries
+
+    webapp_records = Records(operation)
+    planning = dry_run(configuration)
+    outcomes = run_concurrently(
+        act,
+        Schedule(schedule, configuration).paced(webapps),
+        max_concurrency(configuration),
+    )
+    for outcome in outcomes:
+        record = cleanse.webapp(outcome.item)
+        record["slot"] = slot or "production"
+        record["latency"] = round(outcome.latency, 3)
+        record["outcome"] = "planned" if planning else "succeeded"
+        if outcome.error is not None:
+            logger.warning(
+                "Failed to {} web app '{}': {}".format(
+                    operation, record["name"], outcome.error
+                )
+            )
+            record["outcome"] = "failed"
+            record["error"] = str(outcome.error)
+        webapp_records.add(record)
+
+    return webapp_records.output_as_dict("resources")
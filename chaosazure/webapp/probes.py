@@ -2,12 +2,17 @@ import logging
 
 from chaoslib import Configuration, Secrets
 
-from chaosazure.common.resources.graph import fetch_resources
+from chaosazure.common.plan import scoped
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    iter_resources,
+)
 from chaosazure.webapp.constants import RES_TYPE_WEBAPP
 
 logger = logging.getLogger("chaostoolkit")
 
 
+@scoped
 def describe_webapps(
     filter: str = None,
     configuration: Configuration = None,
@@ -30,10 +35,11 @@ def describe_webapps(
         )
     )
 
-    webapps = fetch_resources(filter, RES_TYPE_WEBAPP, secrets, configuration)
-    return webapps
+    webapps = iter_resources(filter, RES_TYPE_WEBAPP, secrets, configuration)
+    return list(webapps)
 
 
+@scoped
 def count_webapps(
     filter: str = None,
     configuration: Configuration = None,
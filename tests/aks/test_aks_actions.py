@@ -1,6 +1,7 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
+from azure.core.exceptions import HttpResponseError
 from chaoslib.exceptions import FailedActivity
 
 from chaosazure.aks.actions import (
@@ -10,14 +11,27 @@ from chaosazure.aks.actions import (
     start_managed_clusters,
     stop_managed_clusters,
     delete_managed_clusters,
+    stop_agent_pool_nodes,
+    start_agent_pool_nodes,
 )
 
-resource = {
-    "name": "chaos-aks",
-    "resourceGroup": "rg",
-    "properties": {"nodeResourceGroup": "nrg"},
+NODE_ALPHA = {
+    "name": "aks-default-123-vmss_0",
+    "resourceGroup": "mc_rg_chaos-aks",
+    "scale_set": "aks-default-123-vmss",
+    "instance_id": "0",
+    "cluster": "chaos-aks",
+    "clusterResourceGroup": "rg",
 }
 
+NODE_BETA = dict(NODE_ALPHA, name="aks-default-123-vmss_1", instance_id="1")
+
+NODE_GAMMA = dict(
+    NODE_ALPHA,
+    name="aks-spot-456-vmss_0",
+    scale_set="aks-spot-456-vmss",
+)
+
 CONFIG = {"azure": {"subscription_id": "***REMOVED***"}}
 
 SECRETS = {
@@ -41,41 +55,97 @@ MANAGED_CLUSTER_ALPHA = {
 MANAGED_CLUSTER_BETA = {"name": "ManagedClusterBeta", "resourceGroup": "group"}
 
 
-@patch("chaosazure.aks.actions.fetch_resources", autospec=True)
-@patch("chaosazure.aks.actions.delete_machines", autospec=True)
-def test_delete_node(delete, fetch):
-    resource_list = [resource]
-    fetch.return_value = resource_list
+@patch("chaosazure.aks.actions.query_resources", autospec=True)
+@patch("chaosazure.aks.actions.init_compute_management_client", autospec=True)
+def test_delete_node(init, query):
+    client = MagicMock()
+    init.return_value = client
+    query.return_value = [NODE_ALPHA, NODE_BETA, NODE_GAMMA]
 
-    delete_node(None, None, None)
+    result = delete_node(None, None, None)
 
+    assert query.call_count == 1
+    vmss = client.virtual_machine_scale_sets
+    assert vmss.begin_delete_instances.call_count == 2
+    group, scale_set, ids = vmss.begin_delete_instances.call_args_list[0][0]
+    assert (group, scale_set) == ("mc_rg_chaos-aks", "aks-default-123-vmss")
+    assert ids.instance_ids == ["0", "1"]
+    assert len(result["resources"]) == 3
 
-@patch("chaosazure.aks.actions.fetch_resources", autospec=True)
-def test_restart_node_with_no_nodes(fetch):
+
+@patch("chaosazure.aks.actions.query_resources", autospec=True)
+def test_restart_node_with_no_nodes(query):
     with pytest.raises(FailedActivity) as x:
-        resource_list = []
-        fetch.return_value = resource_list
+        query.return_value = []
         delete_node(None, None, None)
 
     assert "No AKS clusters found" in str(x.value)
 
 
-@patch("chaosazure.aks.actions.fetch_resources", autospec=True)
-@patch("chaosazure.aks.actions.stop_machines", autospec=True)
-def test_stop_node(stop, fetch):
-    resource_list = [resource]
-    fetch.return_value = resource_list
+@patch("chaosazure.aks.actions.query_resources", autospec=True)
+@patch("chaosazure.aks.actions.init_compute_management_client", autospec=True)
+def test_stop_node(init, query):
+    client = MagicMock()
+    init.return_value = client
+    query.return_value = [NODE_ALPHA, NODE_BETA]
 
-    stop_node(None, None, None)
+    stop_node("where resourceGroup=='rg'", None, None)
 
+    kql = query.call_args[0][0]
+    assert "where resourceGroup=='rg'" in kql
+    assert "ComputeResources" in kql
+    vmss = client.virtual_machine_scale_sets
+    assert vmss.begin_power_off.call_count == 1
+    assert vmss.begin_power_off.call_args[0][2].instance_ids == ["0", "1"]
 
-@patch("chaosazure.aks.actions.fetch_resources", autospec=True)
-@patch("chaosazure.aks.actions.restart_machines", autospec=True)
-def test_restart_node(restart, fetch):
-    resource_list = [resource]
-    fetch.return_value = resource_list
 
-    restart_node(None, None, None)
+@patch("chaosazure.aks.actions.query_resources", autospec=True)
+@patch("chaosazure.aks.actions.init_compute_management_client", autospec=True)
+def test_restart_node(init, query):
+    client = MagicMock()
+    init.return_value = client
+    other_cluster = dict(NODE_GAMMA, cluster="other-aks")
+    query.return_value = [NODE_ALPHA, other_cluster]
+
+    result = restart_node(None, None, None)
+
+    vmss = client.virtual_machine_scale_sets
+    assert vmss.begin_restart.call_count == 1
+    assert len(result["resources"]) == 1
+
+
+@patch("chaosazure.common.schedule.time", autospec=True)
+@patch("chaosazure.aks.actions.query_resources", autospec=True)
+@patch("chaosazure.aks.actions.init_compute_management_client", autospec=True)
+def test_stop_node_on_schedule(init, query, time):
+    client = MagicMock()
+    init.return_value = client
+    query.return_value = [NODE_ALPHA, NODE_GAMMA]
+    time.monotonic.return_value = 100.0
+
+    stop_node(
+        None, CONFIG, SECRETS, schedule={"strategy": "rate", "per_second": 4}
+    )
+
+    assert client.virtual_machine_scale_sets.begin_power_off.call_count == 2
+    time.sleep.assert_called_once_with(0.25)
+
+
+@patch("chaosazure.common.submission.time.sleep")
+@patch("chaosazure.aks.actions.__fetch_managed_clusters", autospec=True)
+@patch("chaosazure.aks.actions.__containerservice_mgmt_client", autospec=True)
+def test_stop_managed_clusters_retries_throttled_calls(init, fetch, sleep):
+    client = MagicMock()
+    init.return_value = client
+    throttled = HttpResponseError("throttled")
+    throttled.status_code = 429
+    client.managed_clusters.begin_stop.side_effect = [throttled, MagicMock()]
+    fetch.return_value = [dict(MANAGED_CLUSTER_ALPHA)]
+
+    result = stop_managed_clusters(configuration=CONFIG, secrets=SECRETS)
+
+    assert client.managed_clusters.begin_stop.call_count == 2
+    assert result["resources"][0]["retries"] == 1
 
 
 @patch("chaosazure.aks.actions.__fetch_managed_clusters", autospec=True)
@@ -90,7 +160,7 @@ def test_delete_one_managed_cluster(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_managed_clusters(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.managed_clusters.begin_delete.call_count == 1
 
 
@@ -106,7 +176,7 @@ def test_delete_one_MANAGED_CLUSTER_china(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_managed_clusters(f, CONFIG, SECRETS_CHINA)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA)
+    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA, None, None, None)
     assert client.managed_clusters.begin_delete.call_count == 1
 
 
@@ -122,7 +192,7 @@ def test_delete_two_managed_clusters(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     delete_managed_clusters(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.managed_clusters.begin_delete.call_count == 2
 
 
@@ -148,7 +218,7 @@ def test_start_one_managed_cluster(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     start_managed_clusters(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.managed_clusters.begin_start.call_count == 1
 
 
@@ -164,7 +234,7 @@ def test_start_two_managed_clusters(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     start_managed_clusters(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.managed_clusters.begin_start.call_count == 2
 
 
@@ -190,7 +260,7 @@ def test_stop_one_managed_cluster(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     stop_managed_clusters(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.managed_clusters.begin_stop.call_count == 1
 
 
@@ -206,7 +276,7 @@ def test_stop_two_managed_clusters(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     stop_managed_clusters(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.managed_clusters.begin_stop.call_count == 2
 
 
@@ -218,3 +288,68 @@ def test_stop_MANAGED_CLUSTER_with_no_managed_clusters(fetch):
         stop_managed_clusters(None, None, None)
 
     assert "No Managed Clusters found" in str(x.value)
+
+
+@patch("chaosazure.aks.actions.query_resources", autospec=True)
+@patch("chaosazure.aks.actions.init_compute_management_client", autospec=True)
+@patch("chaosazure.aks.actions.__containerservice_mgmt_client", autospec=True)
+def test_stop_percentage_of_agent_pool_nodes(aks_init, init, query):
+    client = MagicMock()
+    init.return_value = client
+    aks_client = MagicMock()
+    aks_client.agent_pools.get.return_value.availability_zones = ["1", "2"]
+    aks_init.return_value = aks_client
+    nodes = [
+        dict(NODE_ALPHA, name="node_{}".format(i), instance_id=str(i))
+        for i in range(10)
+    ]
+    for node in nodes:
+        node["pool"] = "user"
+    query.return_value = nodes
+
+    result = stop_agent_pool_nodes(
+        "where name=='chaos-aks'", "user", percentage=30
+    )
+
+    assert "where pool =~ 'user'" in query.call_args[0][0]
+    aks_client.agent_pools.get.assert_called_once_with(
+        "rg", "chaos-aks", "user"
+    )
+    vmss = client.virtual_machine_scale_sets
+    assert vmss.begin_power_off.call_count == 1
+    assert len(vmss.begin_power_off.call_args[0][2].instance_ids) == 3
+    record = result["resources"][0]
+    assert record["pool"] == "user"
+    assert record["zones"] == ["1", "2"]
+    assert len(record["nodes"]) == 3
+
+
+@patch("chaosazure.aks.actions.query_resources", autospec=True)
+@patch("chaosazure.aks.actions.init_compute_management_client", autospec=True)
+@patch("chaosazure.aks.actions.__containerservice_mgmt_client", autospec=True)
+def test_start_all_agent_pools_nodes(aks_init, init, query):
+    client = MagicMock()
+    init.return_value = client
+    aks_client = MagicMock()
+    aks_init.return_value = aks_client
+    query.return_value = [
+        dict(NODE_ALPHA, pool="default"),
+        dict(NODE_BETA, pool="default"),
+        dict(NODE_GAMMA, pool="spot"),
+        dict(NODE_ALPHA, scale_set="custom-vmss", pool=None),
+    ]
+
+    result = start_agent_pool_nodes()
+
+    assert "tags['aks-managed-poolName']" in query.call_args[0][0]
+    # the node of the untagged scale set is skipped
+    assert aks_client.agent_pools.get.call_count == 2
+    assert client.virtual_machine_scale_sets.begin_start.call_count == 2
+    assert len(result["resources"]) == 2
+
+
+def test_stop_agent_pool_nodes_with_invalid_percentage():
+    with pytest.raises(FailedActivity) as x:
+        stop_agent_pool_nodes(percentage=150)
+
+    assert "Percentage" in str(x.value)
@@ -20,7 +20,7 @@ def test_count_managed_clusters(fetch):
     assert count == 1
 
 
-@patch("chaosazure.aks.probes.fetch_resources", autospec=True)
+@patch("chaosazure.aks.probes.iter_resources", autospec=True)
 def test_describe_managed_clusters(fetch):
     resource_list = [resource]
     fetch.return_value = resource_list
@@ -1,10 +1,16 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
+from azure.core.exceptions import HttpResponseError
+from azure.mgmt.network.models import (
+    ApplicationGateway,
+    ApplicationGatewayRequestRoutingRule,
+)
 from chaoslib.exceptions import FailedActivity
 
 from chaosazure.application_gateway.actions import (
     delete_application_gateways,
+    delete_routes,
     start_application_gateways,
     stop_application_gateways,
 )
@@ -59,7 +65,7 @@ def test_delete_one_application_gateway(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_application_gateways(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.application_gateways.begin_delete.call_count == 1
 
 
@@ -81,7 +87,7 @@ def test_delete_one_application_gateway_china(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_application_gateways(f, CONFIG, SECRETS_CHINA)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA)
+    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA, None, None, None)
     assert client.application_gateways.begin_delete.call_count == 1
 
 
@@ -103,7 +109,7 @@ def test_delete_two_application_gateways(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     delete_application_gateways(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.application_gateways.begin_delete.call_count == 2
 
 
@@ -135,7 +141,7 @@ def test_start_one_application_gateway(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     start_application_gateways(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.application_gateways.begin_start.call_count == 1
 
 
@@ -157,7 +163,7 @@ def test_start_two_application_gateways(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     start_application_gateways(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.application_gateways.begin_start.call_count == 2
 
 
@@ -189,7 +195,7 @@ def test_stop_one_application_gateway(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     stop_application_gateways(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.application_gateways.begin_stop.call_count == 1
 
 
@@ -211,7 +217,7 @@ def test_stop_two_application_gateways(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     stop_application_gateways(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.application_gateways.begin_stop.call_count == 2
 
 
@@ -223,3 +229,80 @@ def test_stop_application_gateway_with_no_application_gateways(fetch):
         stop_application_gateways(None, None, None)
 
     assert "No application gateways found" in str(x.value)
+
+
+def provide_gateway(etag):
+    gateway = ApplicationGateway(
+        request_routing_rules=[
+            ApplicationGatewayRequestRoutingRule(name="default"),
+            ApplicationGatewayRequestRoutingRule(name="chaos-route"),
+        ],
+    )
+    gateway.etag = etag
+    return gateway
+
+
+def provide_precondition_failed():
+    response = MagicMock()
+    response.status_code = 412
+    return HttpResponseError(response=response)
+
+
+@patch(
+    "chaosazure.application_gateway.actions.__fetch_application_gateways",
+    autospec=True,
+)
+@patch(
+    "chaosazure.application_gateway.actions.__network_mgmt_client",
+    autospec=True,
+)
+def test_delete_routes_with_etag_and_wait(init, fetch):
+    client = MagicMock()
+    init.return_value = client
+    client.application_gateways.get.side_effect = [
+        provide_gateway("1"),
+        provide_gateway("2"),
+    ]
+    client.application_gateways.begin_create_or_update.side_effect = [
+        provide_precondition_failed(),
+        MagicMock(),
+    ]
+    fetch.return_value = [APPLICATION_GATEWAY_ALPHA]
+
+    result = delete_routes(None, "chaos-", CONFIG, SECRETS, wait_timeout=1)
+
+    update = client.application_gateways.begin_create_or_update
+    assert update.call_count == 2
+    args, kwargs = update.call_args
+    assert kwargs["headers"] == {"If-Match": "2"}
+    assert [r.name for r in args[2].request_routing_rules] == ["default"]
+
+    (route,) = result["resources"]
+    assert route["name"] == "chaos-route"
+    assert route["application_gateway"] == "ApplicationGatewayAlpha"
+    assert route["outcome"] == "deleted"
+
+
+@patch(
+    "chaosazure.application_gateway.actions.__fetch_application_gateways",
+    autospec=True,
+)
+@patch(
+    "chaosazure.application_gateway.actions.__network_mgmt_client",
+    autospec=True,
+)
+def test_delete_routes_gives_up_after_max_attempts(init, fetch):
+    client = MagicMock()
+    init.return_value = client
+    client.application_gateways.get.side_effect = lambda g, n: provide_gateway(
+        "1"
+    )
+    update = client.application_gateways.begin_create_or_update
+    update.side_effect = provide_precondition_failed()
+    fetch.return_value = [APPLICATION_GATEWAY_ALPHA, APPLICATION_GATEWAY_BETA]
+
+    result = delete_routes(None, "chaos-", CONFIG, SECRETS, max_attempts=2)
+
+    assert update.call_count == 4
+    assert all(r["outcome"] == "failed" for r in result["resources"])
+    assert len(result["resources"]) == 2
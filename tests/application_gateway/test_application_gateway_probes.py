@@ -26,7 +26,7 @@ def test_count_application_gateways(fetch):
     assert count == 1
 
 
-@patch("chaosazure.application_gateway.probes.fetch_resources", autospec=True)
+@patch("chaosazure.application_gateway.probes.iter_resources", autospec=True)
 def test_describe_application_gateways(fetch):
     resource_list = [resource]
     fetch.return_value = resource_list
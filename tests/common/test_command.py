@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock, patch
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from chaosazure.common.compute import command
+from chaosazure.machine.constants import RES_TYPE_VM
+from chaosazure.vmss.constants import RES_TYPE_VMSS_VM
+from tests.data import machine_provider, vmss_provider
+
+PARAMETERS = {
+    "command_id": "RunShellScript",
+    "script": ["echo $duration"],
+    "parameters": [{"name": "duration", "value": 60}],
+}
+
+
+def test_blob_uri_keeps_sas_token():
+    uri = command.blob_uri(
+        "https://acc.blob.core.windows.net/logs/?sv=1&sig=x", "run.stdout"
+    )
+
+    assert uri == "https://acc.blob.core.windows.net/logs/run.stdout?sv=1&sig=x"
+
+
+def test_submit_async_run_command_on_machine():
+    client = MagicMock()
+    machine = machine_provider.provide_machine()
+    machine["location"] = "westeurope"
+
+    run = command.submit(
+        "rg",
+        machine,
+        120,
+        PARAMETERS,
+        "chaos-run",
+        "https://acc.blob.core.windows.net/logs",
+        None,
+        None,
+        client=client,
+    )
+
+    create = client.virtual_machine_run_commands.begin_create_or_update
+    assert create.call_count == 1
+    args = create.call_args[0]
+    assert args[:3] == ("rg", "chaos-machine", "chaos-run")
+    run_command = args[3]
+    assert run_command.async_execution is True
+    assert run_command.timeout_in_seconds == 120
+    assert run_command.parameters[0].value == "60"
+    assert run_command.output_blob_uri == (
+        "https://acc.blob.core.windows.net/logs/chaos-run-chaos-machine.stdout"
+    )
+    assert run["vm_name"] == "chaos-machine"
+    assert run["type"] == RES_TYPE_VM.lower()
+
+
+def test_submit_async_run_command_on_vmss_instance():
+    client = MagicMock()
+    instance = vmss_provider.provide_instance()
+    instance["scale_set"] = "chaos-pool"
+    instance["location"] = "westeurope"
+
+    run = command.submit(
+        "rg", instance, 120, PARAMETERS, "chaos-run", None, None, None, client
+    )
+
+    create = (
+        client.virtual_machine_scale_set_vm_run_commands.begin_create_or_update
+    )
+    assert create.call_args[0][:4] == ("rg", "chaos-pool", "0", "chaos-run")
+    assert "output_blob_uri" not in run
+    assert run["type"] == RES_TYPE_VMSS_VM.lower()
+
+
+@patch("chaosazure.common.compute.command.time.sleep", autospec=True)
+def test_poll_many_runs_until_terminal(sleep):
+    client = MagicMock()
+    running = MagicMock()
+    running.instance_view.execution_state = "Running"
+    done = MagicMock()
+    done.instance_view.execution_state = "Succeeded"
+    done.instance_view.exit_code = 0
+    done.instance_view.output = "Stressing 4 CPUs"
+    done.instance_view.start_time = None
+    done.instance_view.end_time = None
+    get = client.virtual_machine_run_commands.get_by_virtual_machine
+    get.side_effect = [running, ResourceNotFoundError("nope"), done]
+
+    runs = [
+        {
+            "run_command_name": "chaos-run",
+            "resource_group": "rg",
+            "type": RES_TYPE_VM.lower(),
+            "vm_name": name,
+        }
+        for name in ("alpha", "beta")
+    ]
+
+    results = command.poll(runs, 60, 1, None, None, client=client)
+
+    assert get.call_count == 3
+    assert sleep.call_count == 1
+    assert results[0]["execution_state"] == "Succeeded"
+    assert results[0]["output"] == "Stressing 4 CPUs"
+    assert results[1]["execution_state"] == "NotFound"
@@ -0,0 +1,55 @@
+import threading
+
+from chaosazure.common.concurrency import max_concurrency, run_concurrently
+
+
+def test_max_concurrency_from_configuration():
+    assert max_concurrency(None) == 16
+    assert max_concurrency({"azure_max_concurrency": "4"}) == 4
+    assert max_concurrency({"azure_max_concurrency": 0}) == 1
+
+
+def test_run_concurrently_yields_every_outcome():
+    outcomes = list(run_concurrently(lambda i: i * 2, range(10), 3))
+
+    assert sorted(o.result for o in outcomes) == list(range(0, 20, 2))
+    assert all(o.error is None and o.latency >= 0 for o in outcomes)
+
+
+def test_run_concurrently_carries_errors():
+    def fail_on_odd(i):
+        if i % 2:
+            raise ValueError(i)
+        return i
+
+    outcomes = list(run_concurrently(fail_on_odd, range(4), 2))
+
+    errors = sorted(o.item for o in outcomes if o.error is not None)
+    assert errors == [1, 3]
+
+
+def test_run_concurrently_bounds_calls_in_flight():
+    lock = threading.Lock()
+    in_flight = [0, 0]
+    consumed = []
+
+    def items():
+        for i in range(20):
+            consumed.append(i)
+            yield i
+
+    def call(i):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        threading.Event().wait(0.005)
+        with lock:
+            in_flight[0] -= 1
+
+    outcomes = run_concurrently(call, items(), 4)
+    next(outcomes)
+    assert len(consumed) <= 5
+
+    list(outcomes)
+    assert in_flight[1] <= 4
+    assert len(consumed) == 20
@@ -0,0 +1,134 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from chaoslib.exceptions import FailedActivity, InterruptExecution
+
+from chaosazure.common.resources.graph import (
+    fetch_resources,
+    fetch_resources_many,
+)
+
+CONFIG = {"azure_subscription_id": "X"}
+
+SECRETS = {"client_id": "X", "client_secret": "X", "tenant_id": "X"}
+
+VM = "Microsoft.Compute/virtualMachines"
+WEBAPP = "Microsoft.Web/sites"
+
+
+@patch("chaosazure.common.resources.graph.iter_query_resources")
+def test_fetch_resources_many_unfiltered_in_one_query(iter_query):
+    iter_query.return_value = [
+        {"name": "vm", "type": "microsoft.compute/virtualmachines"},
+        {"name": "app", "type": "microsoft.web/sites"},
+    ]
+
+    results = fetch_resources_many({VM: None, WEBAPP: ""}, SECRETS, CONFIG)
+
+    assert [r["name"] for r in results[VM]] == ["vm"]
+    assert [r["name"] for r in results[WEBAPP]] == ["app"]
+    iter_query.assert_called_once()
+    query = iter_query.call_args[0][0]
+    assert query == (
+        "Resources\n| where type in~ ('microsoft.compute/virtualmachines', "
+        "'microsoft.web/sites')"
+    )
+
+
+@patch("chaosazure.common.resources.graph.iter_query_resources")
+def test_fetch_resources_many_filtered_concurrently(iter_query):
+    # each query yields its resources out of several pages
+    iter_query.side_effect = lambda query, *args: iter(
+        [{"query": query, "page": 1}, {"query": query, "page": 2}]
+    )
+
+    results = fetch_resources_many(
+        {VM: "where name=='vm'", WEBAPP: None}, SECRETS, CONFIG
+    )
+
+    assert list(results) == [VM, WEBAPP]
+    assert [r["page"] for r in results[VM]] == [1, 2]
+    assert results[VM][0]["query"] == (
+        "Resources\n| where type =~ 'microsoft.compute/virtualmachines'\n"
+        "| where name=='vm'"
+    )
+    assert results[WEBAPP][0]["query"] == (
+        "Resources\n| where type =~ 'microsoft.web/sites'"
+    )
+    assert all(type(r) is dict for r in results[WEBAPP])
+    assert iter_query.call_count == 2
+
+
+@patch("chaosazure.common.resources.graph.iter_query_resources")
+def test_fetch_resources_many_raises_failures(fetch):
+    fetch.side_effect = FailedActivity("throttled")
+
+    with pytest.raises(FailedActivity):
+        fetch_resources_many({VM: "where name=='vm'"}, SECRETS, CONFIG)
+
+
+@patch("chaosazure.common.resources.graph.query_resources")
+def test_fetch_resources_count_sampled_by_resource_graph(query):
+    query.return_value = [{"name": "vm"}]
+
+    resources = fetch_resources("where location=='x'", VM, SECRETS, CONFIG, 2)
+
+    assert resources == [{"name": "vm"}]
+    query.assert_called_once_with(
+        "Resources\n"
+        "| where type =~ 'microsoft.compute/virtualmachines'\n"
+        "| where location=='x'\n"
+        "| sample 2",
+        SECRETS,
+        CONFIG,
+    )
+
+
+@patch("chaosazure.common.resources.graph.query_resources")
+@patch("chaosazure.common.resources.graph.iter_query_resources")
+def test_fetch_resources_percentage_with_seed(iter_query, query):
+    ids = [{"id": "/subscriptions/s/vm-{}".format(i)} for i in range(10)]
+    iter_query.side_effect = lambda *args: iter(ids)
+    query.side_effect = lambda text, *args: [{"query": text}]
+
+    first = fetch_resources(None, VM, SECRETS, CONFIG, None, 30, 7)
+    second = fetch_resources(None, VM, SECRETS, CONFIG, None, 30, 7)
+
+    assert first == second
+    (lookup,) = [r["query"] for r in first]
+    assert lookup.count("/subscriptions/s/vm-") == 3
+    assert "id in~ (" in lookup
+
+
+def test_fetch_resources_rejects_empty_count():
+    with pytest.raises(InterruptExecution):
+        fetch_resources(None, VM, SECRETS, CONFIG, 0)
+
+
+@patch("chaosazure.common.resources.graph.query_resources")
+@patch("chaosazure.common.resources.graph.init_resource_graph_client")
+def test_fetch_resources_picks_among_all_the_pages(init, query):
+    ids = ["/subscriptions/s/vm-{:04d}".format(i) for i in range(1500)]
+    pages = [
+        {"data": [{"id": i} for i in ids[:1000]], "$skipToken": "t1"},
+        {"data": [{"id": i} for i in ids[1000:]]},
+    ]
+    responses = []
+    for page in pages:
+        response = MagicMock(status_code=200)
+        response.iter_bytes.return_value = [json.dumps(page).encode()]
+        responses.append(response)
+    client = init.return_value
+    client._config.api_version = "2021-03-01"
+    client._client.format_url.side_effect = lambda p: "https://arm" + p
+    client._client.send_request.side_effect = responses
+    query.side_effect = lambda text, *args: [
+        {"id": i} for i in ids if "'{}'".format(i) in text
+    ]
+
+    resources = fetch_resources(None, VM, SECRETS, CONFIG, None, 10, 7)
+
+    assert client._client.send_request.call_count == 2
+    assert len(resources) == 150
+    assert any(r["id"] in ids[1000:] for r in resources)
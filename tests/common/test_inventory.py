@@ -0,0 +1,45 @@
+from chaosazure.common import inventory
+
+
+def test_inventory_is_disabled_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv("AZURE_INVENTORY_PATH", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    count = inventory.record(inventory.FETCHED, [{"id": "/a"}], {})
+
+    assert count == 0
+    assert list(tmp_path.iterdir()) == []
+    assert inventory.load({}) == []
+
+
+def test_record_and_load(tmp_path):
+    configuration = {"azure_inventory_path": str(tmp_path / "inv.jsonl")}
+    machine = {
+        "id": "/subscriptions/s/resourceGroups/rg/providers/"
+        "Microsoft.Compute/virtualMachines/vm",
+        "name": "vm",
+        "resourceGroup": "rg",
+        "type": "microsoft.compute/virtualmachines",
+        "etag": "W/1",
+        "properties": {"large": True},
+    }
+
+    inventory.record(
+        inventory.FETCHED, [machine, {"name": "no-id"}], configuration
+    )
+    inventory.record(inventory.ACTED, [machine], configuration, "stop_machines")
+
+    (fetched,) = inventory.load(configuration, inventory.FETCHED)
+    assert fetched["etag"] == "W/1"
+    assert "properties" not in fetched
+
+    (acted,) = inventory.load(
+        configuration,
+        inventory.ACTED,
+        "stop_machines",
+        "Microsoft.Compute/virtualMachines",
+    )
+    assert acted["activity"] == "stop_machines"
+    assert acted["name"] == "vm"
+    assert inventory.load(configuration, activity="restart_machines") == []
+    assert len(inventory.load(configuration)) == 1
@@ -0,0 +1,156 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from chaosazure.common import plan
+from chaosazure.common.concurrency import run_concurrently
+from chaosazure.machine.actions import delete_machines, stop_machines
+from chaosazure.machine.probes import count_machines
+from chaosazure.netapp.actions import delete_netapp_volumes
+from chaosazure.postgresql_flexible.actions import create_databases
+from chaosazure.vmss.records import Records
+from chaosazure.webapp.actions import stop_webapp
+
+CONFIG = {"azure_subscription_id": "X", "azure_dry_run": True}
+
+SECRETS = {"client_id": "X", "client_secret": "X", "tenant_id": "X"}
+
+
+def test_dry_run_is_opt_in():
+    assert plan.dry_run(CONFIG)
+    assert plan.dry_run({"azure_dry_run": "yes"})
+    assert not plan.dry_run({"azure_dry_run": "false"})
+    assert not plan.dry_run({})
+
+    client = MagicMock()
+    assert plan.planned(client, {}) is client
+
+
+def test_planned_client_records_mutating_calls():
+    client = MagicMock()
+    planned = plan.planned(client, CONFIG)
+
+    planned.virtual_machines.get("rg", "vm")
+    poller = planned.virtual_machines.begin_delete("rg", "vm")
+    list(run_concurrently(lambda n: planned.web_apps.stop("rg", n), "ab"))
+
+    assert poller.done() and poller.result(1) is None
+    client.virtual_machines.get.assert_called_once_with("rg", "vm")
+    client.virtual_machines.begin_delete.assert_not_called()
+    client.web_apps.stop.assert_not_called()
+
+    records = Records()
+    records.add({"name": "vm"})
+    output = records.output_as_dict("resources")
+
+    assert output["resources"][0]["name"] == "vm"
+    assert output["plan"]["calls"] == 3
+    assert output["plan"]["reads"] == 1
+    assert output["plan"]["operations"] == {
+        "virtual_machines.begin_delete": 1,
+        "web_apps.stop": 2,
+    }
+    assert "plan" not in Records().output_as_dict("resources")
+
+
+def test_plan_estimated_duration():
+    _plan = plan.Plan(concurrency=2)
+    for _ in range(3):
+        _plan.record("virtual_machines.begin_delete")
+    _plan.record("web_apps.restart")
+
+    # two lanes: delete + delete, delete + restart
+    assert _plan.estimated_duration() == 240.0
+    assert plan.Plan().estimated_duration() == 0.0
+
+
+@patch("chaosazure.machine.actions.__fetch_machines", autospec=True)
+@patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
+def test_delete_machines_dry_run(init, fetch):
+    client = MagicMock()
+    init.side_effect = lambda s, c: plan.planned(client, c)
+    fetch.return_value = [
+        {"name": "vm-1", "resourceGroup": "rg"},
+        {"name": "vm-2", "resourceGroup": "rg"},
+    ]
+
+    output = delete_machines(None, CONFIG, SECRETS)
+
+    client.virtual_machines.begin_delete.assert_not_called()
+    assert [r["name"] for r in output["resources"]] == ["vm-1", "vm-2"]
+    assert output["plan"]["operations"] == {"virtual_machines.begin_delete": 2}
+    assert output["plan"]["estimated_duration"] == 120.0
+
+
+@patch("chaosazure.common.resources.graph.init_resource_graph_client")
+@patch("chaosazure.machine.actions.__fetch_machines", autospec=True)
+@patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
+def test_plans_do_not_leak_between_activities(init, fetch, graph, tmp_path):
+    client = MagicMock()
+    init.side_effect = lambda s, c: plan.planned(client, c)
+    graph.return_value.resources.return_value.data = {"columns": [], "rows": []}
+    configuration = dict(
+        CONFIG, azure_inventory_path=str(tmp_path / "inv.jsonl")
+    )
+
+    # a probe planning a query and an action failing once its plan started
+    count_machines(None, configuration, SECRETS)
+    fetch.return_value = [{"id": "/vm-0", "resourceGroup": "rg"}]
+    with pytest.raises(KeyError):
+        stop_machines(None, configuration, SECRETS)
+    fetch.return_value = [
+        {"id": "/vm-1", "name": "vm-1", "resourceGroup": "rg"}
+    ]
+    output = delete_machines(None, configuration, SECRETS)
+
+    assert plan.take() is None
+    assert output["plan"]["queries"] == 0
+    assert output["plan"]["operations"] == {"virtual_machines.begin_delete": 1}
+    assert not (tmp_path / "inv.jsonl").exists()
+
+
+@patch("chaosazure.webapp.actions.fetch_webapps", autospec=True)
+@patch(
+    "chaosazure.webapp.actions.init_website_management_client", autospec=True
+)
+def test_stop_webapp_dry_run(init, fetch):
+    client = MagicMock()
+    init.side_effect = lambda s, c: plan.planned(client, c)
+    fetch.return_value = [{"name": "app", "resourceGroup": "rg"}]
+
+    output = stop_webapp(None, CONFIG, SECRETS)
+
+    client.web_apps.stop.assert_not_called()
+    assert [r["name"] for r in output["resources"]] == ["app"]
+    assert output["plan"]["operations"] == {"web_apps.stop": 1}
+
+
+@patch("chaosazure.postgresql_flexible.actions.__fetch_servers", autospec=True)
+@patch(
+    "chaosazure.postgresql_flexible.actions.__postgresql_flexible_mgmt_client",
+    autospec=True,
+)
+def test_create_databases_dry_run(init, fetch):
+    client = MagicMock()
+    init.side_effect = lambda s, c: plan.planned(client, c)
+    fetch.return_value = [{"name": "srv", "resourceGroup": "rg"}]
+
+    output = create_databases(None, "db", None, None, CONFIG, SECRETS)
+
+    client.databases.begin_create.assert_not_called()
+    assert [r["name"] for r in output["resources"]] == ["srv"]
+    assert output["plan"]["operations"] == {"databases.begin_create": 1}
+
+
+@patch("chaosazure.netapp.actions.__fetch_netapp_volumes", autospec=True)
+@patch("chaosazure.netapp.actions.__netapp_mgmt_client", autospec=True)
+def test_delete_netapp_volumes_dry_run_is_only_planned(init, fetch):
+    client = MagicMock()
+    init.side_effect = lambda s, c: plan.planned(client, c)
+    fetch.return_value = [{"name": "acc/pool/vol", "resourceGroup": "rg"}]
+
+    output = delete_netapp_volumes(None, CONFIG, SECRETS, wait_timeout=60)
+
+    client.volumes.begin_delete.assert_not_called()
+    assert [r["outcome"] for r in output["resources"]] == ["planned"]
+    assert output["plan"]["operations"] == {"volumes.begin_delete": 1}
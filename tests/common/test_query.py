@@ -0,0 +1,109 @@
+import pytest
+from chaoslib.exceptions import InterruptExecution
+
+from chaosazure.common.resources.query import Query, quote
+
+VM = "Microsoft.Compute/virtualMachines"
+
+
+def test_quote_escapes_literals():
+    assert quote("rg") == "'rg'"
+    assert quote("a'b") == "'a\\'b'"
+    assert quote("a\\'; b") == "'a\\\\\\'; b'"
+    assert quote("a\nb") == "'a\\nb'"
+
+
+def test_query_with_typed_predicates():
+    query = (
+        Query(VM)
+        .zone("1")
+        .resource_group("rg")
+        .tag("env", "prod")
+        .power_state("running")
+        .project("id", "name")
+        .take(10)
+    )
+
+    assert str(query) == (
+        "Resources\n"
+        "| where type =~ 'microsoft.compute/virtualmachines'"
+        " and resourceGroup =~ 'rg'"
+        " and tostring(properties.extended.instanceView.powerState.code)"
+        " =~ 'PowerState/running'"
+        " and tostring(tags['env']) =~ 'prod'"
+        " and zones has '1'\n"
+        "| project id, name\n"
+        "| take 10"
+    )
+
+
+def test_query_is_canonical():
+    first = Query(VM).name("vm").location("westeurope")
+    second = Query(VM.lower()).location("westeurope").name("vm")
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert Query(VM).filter("| where  name == 'a  b'\n  | take 5") == Query(
+        VM
+    ).filter("where name == 'a  b'\n| take 5")
+    assert str(Query(VM).filter("where name == 'a  b'")).endswith(
+        "| where name == 'a  b'"
+    )
+
+
+def test_query_filter_keeps_comments_and_verbatim_literals():
+    query = Query(VM).filter(
+        'where resourceGroup == "rg" // prod  pool\n| take 3'
+    )
+
+    assert str(query).endswith(
+        '| where resourceGroup == "rg" // prod  pool\n| take 3'
+    )
+    assert str(Query(VM).filter('where  path == @"C:\\"')).endswith(
+        '| where path == @"C:\\"'
+    )
+    assert str(Query(VM).filter("where n == @'it''s  // a'")).endswith(
+        "| where n == @'it''s  // a'"
+    )
+    with pytest.raises(InterruptExecution):
+        Query(VM).filter('where path == @"C:\\')
+
+
+def test_query_is_immutable():
+    query = Query(VM)
+
+    query.name("vm").take(1)
+
+    assert str(query) == (
+        "Resources\n| where type =~ 'microsoft.compute/virtualmachines'"
+    )
+
+
+def test_query_summarize():
+    query = Query([VM, "Microsoft.Web/sites"]).summarize(by=["type"])
+
+    assert str(query) == (
+        "Resources\n"
+        "| where type in~ ('microsoft.compute/virtualmachines', "
+        "'microsoft.web/sites')\n"
+        "| summarize count=count() by type"
+    )
+
+
+def test_query_rejects_invalid_input():
+    with pytest.raises(InterruptExecution):
+        Query(VM).filter("where name == 'vm")
+    with pytest.raises(InterruptExecution):
+        Query(VM).project("name | take 1")
+    with pytest.raises(InterruptExecution):
+        Query(VM).take(0)
+
+
+def test_query_extend():
+    query = Query(VM).extend("zone", "tostring( zones[0] )").project("zone")
+
+    assert str(query).endswith(
+        "| extend zone = tostring( zones[0] )\n| project zone"
+    )
+    with pytest.raises(InterruptExecution):
+        Query(VM).extend("zone = 1 | take", "1")
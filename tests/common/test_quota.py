@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from chaoslib.exceptions import InterruptExecution
+
+from chaosazure.common import plan, quota
+from chaosazure.common.schedule import Schedule
+from chaosazure.common.transport import transport_options
+
+
+def respond(subscription_id, headers):
+    request = MagicMock()
+    request.http_request.url = (
+        "https://management.azure.com/subscriptions/{}/resourceGroups/rg/"
+        "providers/Microsoft.Compute/virtualMachines/vm?api-version=1".format(
+            subscription_id
+        )
+    )
+    response = MagicMock()
+    response.http_response.headers = headers
+    quota.QuotaPolicy().on_response(request, response)
+
+
+def test_policy_tracks_the_remaining_requests_per_subscription():
+    respond("Sub-A", {quota.READS_HEADER: "11999"})
+    respond("sub-a", {quota.WRITES_HEADER: "1199"})
+    respond("sub-b", {})
+
+    assert quota.quota("sub-a").reads == 11999
+    assert quota.quota("SUB-A").writes == 1199
+    assert quota.quota("sub-b").writes is None
+    assert isinstance(
+        transport_options({})["per_retry_policies"][0], quota.QuotaPolicy
+    )
+
+
+def test_write_budget_keeps_a_reserve():
+    respond("sub-budget", {quota.WRITES_HEADER: "25"})
+
+    assert quota.write_budget({"azure_subscription_id": "sub-budget"}) == 15
+    assert (
+        quota.write_budget(
+            {
+                "azure_subscription_id": "sub-budget",
+                "azure_arm_write_reserve": 30,
+            }
+        )
+        == 0
+    )
+    assert quota.write_budget({"azure_subscription_id": "sub-none"}) is None
+
+
+def test_preflight_refuses_writes_over_budget():
+    respond("sub-preflight", {quota.WRITES_HEADER: "15"})
+    configuration = {"azure_subscription_id": "sub-preflight"}
+
+    quota.preflight(100, configuration)
+
+    configuration["azure_arm_write_preflight"] = True
+    quota.preflight(5, configuration)
+    with pytest.raises(InterruptExecution):
+        list(Schedule(None, configuration).paced(range(6)))
+
+
+@patch("chaosazure.common.schedule.time", autospec=True)
+def test_schedule_slows_down_once_the_budget_is_spent(time):
+    time.monotonic.return_value = 0.0
+    configuration = {"azure_subscription_id": "sub-spent"}
+    schedule = Schedule(
+        {"strategy": "waves", "size": 10, "pause": 60}, configuration
+    )
+    respond("sub-spent", {quota.WRITES_HEADER: "11"})
+
+    for _ in schedule.paced(range(2)):
+        pass
+
+    # one write left in the budget, the next one waits for the bucket
+    time.sleep.assert_called_once_with(pytest.approx(3.0))
+
+
+@patch("chaosazure.common.schedule.time", autospec=True)
+def test_unscheduled_operations_skip_the_write_bucket(time):
+    time.monotonic.return_value = 0.0
+    configuration = {"azure_subscription_id": "sub-unscheduled"}
+    schedule = Schedule(None, configuration)
+    respond("sub-unscheduled", {quota.WRITES_HEADER: "11"})
+
+    for _ in schedule.paced(range(2)):
+        pass
+
+    assert schedule.bucket is None
+    time.sleep.assert_not_called()
+
+
+def test_plan_is_checked_against_the_write_budget():
+    respond("sub-plan", {quota.WRITES_HEADER: "12"})
+    _plan = plan.Plan(configuration={"azure_subscription_id": "sub-plan"})
+    for _ in range(3):
+        _plan.record("virtual_machines.begin_delete")
+
+    summary = _plan.summary()
+
+    assert summary["write_budget"] == 2
+    assert summary["within_budget"] is False
+
+
+@patch("chaosazure.common.quota.time", autospec=True)
+def test_policy_spaces_out_the_writes_once_the_budget_is_spent(time):
+    time.monotonic.return_value = 0.0
+    policy = quota.QuotaPolicy({"azure_subscription_id": "sub-writes"})
+
+    def send(method):
+        request = MagicMock()
+        request.http_request.method = method
+        request.http_request.url = (
+            "https://management.azure.com/subscriptions/sub-writes/"
+            "resourceGroups/rg/providers/Microsoft.Web/sites/app/stop"
+        )
+        policy.on_request(request)
+
+    respond("sub-writes", {quota.WRITES_HEADER: "11"})
+    send("POST")
+    send("POST")
+    time.sleep.assert_not_called()
+
+    # the reserve is reached, the writes go out at the hourly limit
+    respond("sub-writes", {quota.WRITES_HEADER: "10"})
+    send("GET")
+    send("POST")
+    send("DELETE")
+    time.sleep.assert_called_once_with(pytest.approx(3.0))
@@ -0,0 +1,50 @@
+import json
+
+from chaosazure.common.resources.rows import Row, materialize, to_rows
+from chaosazure.vmss.records import Records
+
+TABLE = {
+    "columns": [{"name": "name"}, {"name": "resourceGroup"}, {"name": "tags"}],
+    "rows": [["vm-0", "rg", {"env": "test"}], ["vm-1", "rg", None]],
+}
+
+
+def test_rows_share_the_column_schema():
+    first, second = to_rows(TABLE)
+
+    assert first["name"] == "vm-0"
+    assert second.get("tags") is None
+    assert second.get("missing", "default") == "default"
+    assert "resourceGroup" in first and "missing" not in first
+    assert list(first) == ["name", "resourceGroup", "tags"]
+    assert len(first) == 3
+    assert first == {
+        "name": "vm-0",
+        "resourceGroup": "rg",
+        "tags": {"env": "test"},
+    }
+    assert first._columns is second._columns
+
+
+def test_row_turns_into_a_dict_once_changed():
+    row, other = to_rows(TABLE)
+
+    row["outcome"] = "deleted"
+    del row["tags"]
+
+    assert row == {"name": "vm-0", "resourceGroup": "rg", "outcome": "deleted"}
+    assert "outcome" not in other and "tags" in other
+
+
+def test_materialize_turns_rows_into_dicts():
+    rows = to_rows(TABLE)
+    records = Records()
+    records.add(rows[0])
+
+    output = records.output_as_dict("resources")
+
+    assert type(output["resources"][0]) is dict
+    assert json.loads(json.dumps(materialize({"rows": rows}))) == {
+        "rows": [dict(r) for r in rows]
+    }
+    assert isinstance(rows[1], Row)
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+import pytest
+from chaoslib.exceptions import InterruptExecution
+
+from chaosazure.common import plan
+from chaosazure.common.schedule import Schedule, WriteBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.sent = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def paced_at(schedule, count, subscription_id):
+    clock = Clock()
+    configuration = {"azure_subscription_id": subscription_id}
+    with patch("chaosazure.common.schedule.time", clock):
+        for _ in Schedule(schedule, configuration).paced(range(count)):
+            clock.sent.append(round(clock.now, 3))
+    return clock.sent
+
+
+def test_unscheduled_operations_are_sent_at_once():
+    assert paced_at(None, 3, "unscheduled") == [0, 0, 0]
+
+
+def test_rate_schedule():
+    schedule = {"strategy": "rate", "per_second": 2}
+
+    assert paced_at(schedule, 4, "rate") == [0, 0.5, 1.0, 1.5]
+
+
+def test_waves_schedule():
+    schedule = {"strategy": "waves", "size": 2, "pause": 10}
+
+    assert paced_at(schedule, 5, "waves") == [0, 0, 10, 10, 20]
+
+
+def test_linear_schedule():
+    schedule = {"strategy": "linear", "start": 1, "end": 2, "duration": 2}
+
+    assert paced_at(schedule, 4, "linear") == [0, 1.0, 1.667, 2.212]
+
+
+def test_schedule_rejects_invalid_settings():
+    with pytest.raises(InterruptExecution):
+        Schedule({"strategy": "burst"})
+    with pytest.raises(InterruptExecution):
+        Schedule({"strategy": "rate", "per_second": 0})
+    with pytest.raises(InterruptExecution):
+        Schedule({"strategy": "waves", "size": 2})
+    with pytest.raises(InterruptExecution):
+        Schedule({"strategy": "rate", "per_second": 1, "pause": 1})
+
+
+def test_write_bucket_stays_under_the_hourly_limit():
+    clock = Clock()
+    with patch("chaosazure.common.schedule.time", clock):
+        bucket = WriteBucket(2)
+
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == pytest.approx(1800)
+        clock.now = 3600
+        assert bucket.acquire() == 0
+
+
+def test_dry_run_schedule_is_planned():
+    configuration = {"azure_dry_run": True}
+    clock = Clock()
+    schedule = {"strategy": "rate", "per_second": 0.5}
+
+    with patch("chaosazure.common.schedule.time", clock):
+        items = list(Schedule(schedule, configuration).paced(range(3)))
+
+    assert items == [0, 1, 2]
+    assert clock.now == 0
+    assert plan.take().summary()["paced_duration"] == 4.0
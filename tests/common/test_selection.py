@@ -0,0 +1,119 @@
+import pytest
+from chaoslib.exceptions import InterruptExecution
+
+from chaosazure.common.resources.rows import to_rows
+from chaosazure.common.selection import group_key, select, select_targets
+
+
+def provide_candidates():
+    return [
+        {
+            "name": "vm-{}".format(i),
+            "zones": [str(i % 3 + 1)],
+            "tags": {"tier": "web" if i % 2 else "api"},
+            "instance_view": {"platform_fault_domain": i % 2},
+        }
+        for i in range(12)
+    ]
+
+
+def test_group_key_lookups():
+    candidate = provide_candidates()[1]
+
+    assert group_key(candidate, "zone") == "2"
+    assert group_key(candidate, "fault_domain") == "1"
+    assert group_key(candidate, "tag:tier") == "web"
+    assert group_key({"name": "regional"}, "zone") == ""
+
+
+def test_no_selection_keeps_every_candidate():
+    assert len(select_targets(provide_candidates(), None)) == 12
+
+
+def test_one_per_group():
+    result = select(provide_candidates(), "one-per-group", group_by="zone")
+
+    assert sorted(group_key(c, "zone") for c in result) == ["1", "2", "3"]
+
+
+def test_count_per_group_is_reproducible_with_seed():
+    first = select(
+        provide_candidates(), "count-per-group", "tag:tier", count=2, seed=7
+    )
+    second = select(
+        provide_candidates(), "count-per-group", "tag:tier", count=2, seed=7
+    )
+
+    assert len(first) == 4
+    assert [c["name"] for c in first] == [c["name"] for c in second]
+
+
+def test_percentage_per_group():
+    result = select(
+        provide_candidates(),
+        "percentage-per-group",
+        group_by="fault_domain",
+        percentage=50,
+    )
+
+    assert len(result) == 6
+    assert sum(group_key(c, "fault_domain") == "0" for c in result) == 3
+
+
+def test_entire_zone():
+    result = select_targets(
+        provide_candidates(),
+        {"strategy": "entire-group", "group_by": "zone", "group": "2"},
+    )
+
+    assert len(result) == 4
+    assert all(c["zones"] == ["2"] for c in result)
+
+
+def test_entire_zone_of_resource_graph_rows():
+    columns = ["name", "zones", "properties"]
+    candidates = to_rows(
+        {
+            "columns": [{"name": c} for c in columns],
+            "rows": [
+                [
+                    c["name"],
+                    c["zones"],
+                    {"instanceView": {"platformFaultDomain": i % 2}},
+                ]
+                for i, c in enumerate(provide_candidates())
+            ],
+        }
+    )
+
+    result = select_targets(
+        candidates,
+        {"strategy": "entire-group", "group_by": "zone", "group": "1"},
+    )
+
+    assert [c["name"] for c in result] == ["vm-0", "vm-3", "vm-6", "vm-9"]
+    assert group_key(candidates[1], "fault_domain") == "1"
+
+
+def test_entire_random_zone():
+    result = select(provide_candidates(), "entire-group", "zone", seed=1)
+
+    assert len({group_key(c, "zone") for c in result}) == 1
+    assert len(result) == 4
+
+
+def test_random_count_on_a_stream():
+    candidates = (c for c in provide_candidates())
+
+    assert len(select(candidates, "random", count=5)) == 5
+
+
+def test_invalid_selection():
+    with pytest.raises(InterruptExecution):
+        select_targets(provide_candidates(), {"strategy": "nope"})
+
+    with pytest.raises(InterruptExecution):
+        select_targets(provide_candidates(), {"size": 3})
+
+    with pytest.raises(InterruptExecution):
+        select(provide_candidates(), "one-per-group")
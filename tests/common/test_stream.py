@@ -0,0 +1,97 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from chaosazure.common.resources.graph import iter_query_resources
+from chaosazure.common.resources.stream import decode_object_array
+
+CONFIG = {"azure_subscription_id": "X"}
+
+SECRETS = {"client_id": "X", "client_secret": "X", "tenant_id": "X"}
+
+PAGE = {
+    "totalRecords": 12345,
+    "count": 3,
+    "data": [
+        {"name": "vm-é", "tags": {"env": "test"}, "cores": 16},
+        {"name": "vm-1", "zones": ["1", "2"], "ratio": 0.25},
+        {"name": "vm-2", "enabled": True, "plan": None},
+    ],
+    "$skipToken": "next",
+    "resultTruncated": "false",
+}
+
+
+def chunked(payload: bytes, size: int):
+    return [payload[i : i + size] for i in range(0, len(payload), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096])
+def test_decode_object_array_from_any_chunks(size):
+    payload = json.dumps(PAGE, ensure_ascii=False, indent=1).encode("utf-8")
+    fields = {}
+
+    resources = list(decode_object_array(chunked(payload, size), fields))
+
+    assert resources == PAGE["data"]
+    assert fields["totalRecords"] == 12345
+    assert fields["$skipToken"] == "next"
+    assert "data" not in fields
+
+
+def test_decode_object_array_yields_before_the_end():
+    payload = json.dumps({"data": [{"name": "a"}, {"name": "b"}]}).encode()
+    read = []
+
+    def chunks():
+        for chunk in chunked(payload, 4):
+            read.append(chunk)
+            yield chunk
+
+    resources = decode_object_array(chunks(), {})
+
+    assert next(resources) == {"name": "a"}
+    assert len(read) < len(chunked(payload, 4))
+    assert list(resources) == [{"name": "b"}]
+
+
+def test_decode_object_array_empty_data():
+    fields = {}
+
+    assert (
+        list(decode_object_array([b'{"count": 0, "data": []}'], fields)) == []
+    )
+    assert fields == {"count": 0}
+
+
+def test_decode_object_array_truncated():
+    with pytest.raises(ValueError):
+        list(decode_object_array([b'{"data": [{"name": "a"}, {"na'], {}))
+
+
+@patch("chaosazure.common.resources.graph.init_resource_graph_client")
+def test_iter_query_resources_follows_pages(init):
+    pages = [
+        {"data": [{"name": "a"}, {"name": "b"}], "$skipToken": "t1"},
+        {"data": [{"name": "c"}]},
+    ]
+    responses = []
+    for page in pages:
+        response = MagicMock(status_code=200)
+        response.iter_bytes.return_value = chunked(json.dumps(page).encode(), 5)
+        responses.append(response)
+    client = init.return_value
+    client._config.api_version = "2021-03-01"
+    client._client.format_url.side_effect = lambda p: "https://arm" + p
+    client._client.send_request.side_effect = responses
+
+    resources = list(iter_query_resources("Resources", SECRETS, CONFIG))
+
+    assert [r["name"] for r in resources] == ["a", "b", "c"]
+    first, second = client._client.send_request.call_args_list
+    assert first[1]["stream"] is True
+    options = second[0][0].content
+    assert json.loads(options)["options"]["$skipToken"] == "t1"
+    assert json.loads(options)["options"]["resultFormat"] == "objectArray"
+    assert all(r.close.called for r in responses)
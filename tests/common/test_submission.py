@@ -0,0 +1,117 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
+from chaoslib.exceptions import InterruptExecution
+
+from chaosazure.common.submission import (
+    QUOTA,
+    RETRYABLE,
+    TERMINAL,
+    SubmissionError,
+    classify,
+    retry_budget,
+    submit,
+)
+
+
+def provide_error(
+    status_code, code=None, message="failed", headers=None, method="POST"
+):
+    error = HttpResponseError(message)
+    error.status_code = status_code
+    error.error = MagicMock(code=code) if code else None
+    error.response = MagicMock(headers=headers or {})
+    error.response.request.method = method
+    return error
+
+
+def test_classify_errors():
+    assert classify(provide_error(429)) == RETRYABLE
+    assert classify(provide_error(503)) == RETRYABLE
+    assert classify(provide_error(409, "AnotherOperationInProgress")) == (
+        RETRYABLE
+    )
+    assert classify(provide_error(409, "QuotaExceeded")) == QUOTA
+    assert classify(provide_error(400, "InvalidParameter")) == TERMINAL
+    assert classify(ServiceRequestError("connection reset")) == RETRYABLE
+    assert classify(ValueError("bug")) == TERMINAL
+
+
+def test_retry_budget_from_configuration():
+    deadline = retry_budget({"azure_retry_budget": 10})
+
+    assert 9 < deadline - time.monotonic() <= 10
+
+
+@patch("chaosazure.common.submission.time.sleep")
+def test_submit_retries_retryable_errors(sleep):
+    call = MagicMock(side_effect=[provide_error(429), provide_error(503), 42])
+
+    submission = submit(call, "rg", "vm", deadline=time.monotonic() + 60)
+
+    assert submission.result == 42
+    assert submission.retries == 2
+    assert sleep.call_count == 2
+    call.assert_called_with("rg", "vm")
+
+
+@patch("chaosazure.common.submission.time.sleep")
+def test_submit_does_not_retry_terminal_errors(sleep):
+    call = MagicMock(side_effect=provide_error(400, "InvalidParameter"))
+
+    with pytest.raises(SubmissionError) as x:
+        submit(call)
+
+    assert x.value.classification == TERMINAL
+    assert x.value.retries == 0
+    sleep.assert_not_called()
+
+
+@patch("chaosazure.common.submission.time.sleep")
+def test_submit_lets_chaostoolkit_exceptions_through(sleep):
+    interruption = InterruptExecution("stop now")
+    call = MagicMock(side_effect=interruption)
+
+    with pytest.raises(InterruptExecution) as x:
+        submit(call)
+
+    assert x.value is interruption
+    assert call.call_count == 1
+    sleep.assert_not_called()
+
+
+@patch("chaosazure.common.submission.time.sleep")
+def test_submit_does_not_retry_what_the_sdk_retried(sleep):
+    for error in [
+        provide_error(429, headers={"Retry-After": "5"}),
+        provide_error(503, method="DELETE"),
+    ]:
+        call = MagicMock(side_effect=[error, 42])
+
+        with pytest.raises(SubmissionError) as x:
+            submit(call)
+
+        assert x.value.classification == RETRYABLE
+        assert x.value.retries == 0
+    sleep.assert_not_called()
+
+
+@patch("chaosazure.common.submission.random.uniform")
+@patch("chaosazure.common.submission.time")
+def test_submit_honours_budget(clock, uniform):
+    now = [100.0]
+    clock.monotonic.side_effect = lambda: now[0]
+    clock.sleep.side_effect = lambda delay: now.__setitem__(0, now[0] + delay)
+    uniform.side_effect = lambda low, high: high
+    error = provide_error(503)
+    call = MagicMock(side_effect=error)
+
+    with pytest.raises(SubmissionError) as x:
+        submit(call, deadline=112.0, max_attempts=10)
+
+    assert x.value.classification == RETRYABLE
+    assert x.value.retries == 3
+    assert x.value.error is error
+    assert [c[0][0] for c in clock.sleep.call_args_list] == [1.0, 2.0, 4.0]
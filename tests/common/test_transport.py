@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+from chaosazure import init_compute_management_client
+from chaosazure.common.transport import transport_options
+
+SECRETS = {"client_id": "X", "client_secret": "X", "tenant_id": "X"}
+
+
+def test_transport_options_default_pool_follows_concurrency():
+    options = transport_options({"azure_max_concurrency": 32})
+
+    adapter = options["transport"].session.get_adapter("https://x")
+    assert adapter._pool_maxsize == 32
+    assert "proxies" not in options
+    assert "retry_total" not in options
+
+
+def test_transport_options_from_configuration():
+    options = transport_options(
+        {
+            "azure_connection_pool_size": "64",
+            "azure_connection_timeout": 5,
+            "azure_read_timeout": "30",
+            "azure_keep_alive": False,
+            "azure_retry_total": "2",
+            "azure_proxy": "http://proxy:3128",
+        }
+    )
+
+    transport = options["transport"]
+    assert transport.session.get_adapter("https://x")._pool_maxsize == 64
+    assert transport.session.headers["Connection"] == "close"
+    assert transport.connection_config.timeout == 5
+    assert transport.connection_config.read_timeout == 30
+    assert options["retry_total"] == 2
+    assert options["proxies"] == {
+        "http": "http://proxy:3128",
+        "https": "http://proxy:3128",
+    }
+
+
+def test_transport_is_shared_by_clients_with_same_settings():
+    configuration = {"azure_subscription_id": "X"}
+
+    first = transport_options(configuration)["transport"]
+    assert transport_options(configuration)["transport"] is first
+    assert (
+        transport_options({"azure_connection_pool_size": 3})["transport"]
+        is not first
+    )
+
+
+@patch.dict("os.environ", {"AZURE_CONNECTION_POOL_SIZE": "48"})
+def test_clients_are_created_with_the_tuned_transport():
+    client = init_compute_management_client(
+        SECRETS, {"azure_subscription_id": "X"}
+    )
+
+    transport = transport_options({})["transport"]
+    assert transport.session.get_adapter("https://x")._pool_maxsize == 48
+    assert client._client._pipeline._transport is transport
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from chaosazure.common import inventory
+from chaosazure.inventory.probes import (
+    describe_inventory,
+    describe_inventory_changes,
+)
+
+MACHINE_ID = (
+    "/subscriptions/s/resourceGroups/rg/providers/"
+    "Microsoft.Compute/virtualMachines/VM"
+)
+
+
+def provide_configuration(tmp_path):
+    configuration = {"azure_inventory_path": str(tmp_path / "inv.jsonl")}
+    inventory.record(
+        inventory.ACTED,
+        [{"id": MACHINE_ID, "name": "VM", "resourceGroup": "rg"}],
+        configuration,
+        "stop_machines",
+    )
+    return configuration
+
+
+def test_describe_inventory(tmp_path):
+    configuration = provide_configuration(tmp_path)
+
+    (entry,) = describe_inventory(configuration=configuration)
+
+    assert entry["id"] == MACHINE_ID
+
+
+@patch("chaosazure.common.resources.graph.iter_query_resources")
+def test_describe_inventory_changes(query, tmp_path):
+    configuration = provide_configuration(tmp_path)
+    query.side_effect = lambda kql, *args: iter(
+        [{"targetResourceId": MACHINE_ID.lower()}]
+    )
+
+    changes = describe_inventory_changes(
+        activity="stop_machines", configuration=configuration
+    )
+
+    assert changes == [{"targetResourceId": MACHINE_ID.lower()}]
+    kql = query.call_args[0][0]
+    assert kql.startswith("resourcechanges")
+    assert "'{}'".format(MACHINE_ID.lower()) in kql
+
+
+@patch("chaosazure.inventory.probes.query_resources_many", autospec=True)
+def test_describe_inventory_changes_without_inventory(query):
+    assert describe_inventory_changes(configuration={}) == []
+    query.assert_not_called()
@@ -54,7 +54,7 @@ def test_delete_one_machine(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_machines(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.virtual_machines.begin_delete.call_count == 1
 
 
@@ -70,7 +70,7 @@ def test_delete_one_machine_china(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_machines(f, CONFIG, SECRETS_CHINA)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA)
+    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA, None, None, None)
     assert client.virtual_machines.begin_delete.call_count == 1
 
 
@@ -86,7 +86,7 @@ def test_delete_two_machines(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     delete_machines(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.virtual_machines.begin_delete.call_count == 2
 
 
@@ -110,6 +110,17 @@ def test_stop_machine_with_no_machines(fetch):
     assert "No virtual machines found" in str(x.value)
 
 
+@patch("chaosazure.machine.actions.fetch_resources", autospec=True)
+@patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
+def test_stop_machines_sampled_by_resource_graph(init, fetch):
+    fetch.return_value = [MACHINE_ALPHA]
+
+    stop_machines(None, CONFIG, SECRETS, count=1, seed=42)
+
+    fetch.assert_called_with(None, RES_TYPE_VM, SECRETS, CONFIG, 1, None, 42)
+    init.return_value.virtual_machines.begin_power_off.assert_called_once()
+
+
 @patch("chaosazure.machine.actions.__fetch_machines", autospec=True)
 @patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
 def test_stop_one_machine(init, fetch):
@@ -122,7 +133,7 @@ def test_stop_one_machine(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     stop_machines(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.virtual_machines.begin_power_off.call_count == 1
 
 
@@ -138,7 +149,7 @@ def test_stop_two_machines(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     stop_machines(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.virtual_machines.begin_power_off.call_count == 2
 
 
@@ -154,7 +165,7 @@ def test_restart_one_machine(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     restart_machines(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.virtual_machines.begin_restart.call_count == 1
 
 
@@ -170,7 +181,7 @@ def test_restart_two_machines(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     restart_machines(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.virtual_machines.begin_restart.call_count == 2
 
 
@@ -227,7 +238,13 @@ def test_stress_cpu(mocked_command_run, mocked_command_prepare, fetch):
 
     # assert
     fetch.assert_called_with(
-        "where name=='some_linux_machine'", RES_TYPE_VM, secrets, config
+        "where name=='some_linux_machine'",
+        RES_TYPE_VM,
+        secrets,
+        config,
+        None,
+        None,
+        None,
     )
     mocked_command_prepare.assert_called_with(machine, "cpu_stress_test")
     mocked_command_run.assert_called_with(
@@ -239,6 +256,7 @@ def test_stress_cpu(mocked_command_run, mocked_command_prepare, fetch):
             "script": ["cpu_stress_test.sh"],
             "parameters": [
                 {"name": "duration", "value": 60},
+                {"name": "load", "value": 100},
             ],
         },
         secrets,
@@ -280,7 +298,13 @@ def test_fill_disk(
 
     # assert
     fetch.assert_called_with(
-        "where name=='some_linux_machine'", RES_TYPE_VM, secrets, config
+        "where name=='some_linux_machine'",
+        RES_TYPE_VM,
+        secrets,
+        config,
+        None,
+        None,
+        None,
     )
     mocked_command_prepare.assert_called_with(machine, "fill_disk")
     mocked_command_run.assert_called_with(
@@ -328,7 +352,13 @@ def test_network_latency(mocked_command_run, mocked_command_prepare, fetch):
 
     # assert
     fetch.assert_called_with(
-        "where name=='some_linux_machine'", RES_TYPE_VM, secrets, config
+        "where name=='some_linux_machine'",
+        RES_TYPE_VM,
+        secrets,
+        config,
+        None,
+        None,
+        None,
     )
     mocked_command_prepare.assert_called_with(machine, "network_latency")
     mocked_command_run.assert_called_with(
@@ -373,7 +403,13 @@ def test_burn_io(mocked_command_run, mocked_command_prepare, fetch):
 
     # assert
     fetch.assert_called_with(
-        "where name=='some_linux_machine'", RES_TYPE_VM, secrets, config
+        "where name=='some_linux_machine'",
+        RES_TYPE_VM,
+        secrets,
+        config,
+        None,
+        None,
+        None,
     )
     mocked_command_prepare.assert_called_with(machine, "burn_io")
     mocked_command_run.assert_called_with(
@@ -383,8 +419,145 @@ def test_burn_io(mocked_command_run, mocked_command_prepare, fetch):
         {
             "command_id": "RunShellScript",
             "script": ["burn_io.sh"],
-            "parameters": [{"name": "duration", "value": 60}],
+            "parameters": [
+                {"name": "duration", "value": 60},
+                {"name": "block_size", "value": "32K"},
+                {"name": "queue_depth", "value": 1},
+                {"name": "direct", "value": 0},
+            ],
         },
         secrets,
         config,
     )
+
+
+@patch("chaosazure.machine.actions.fetch_resources", autospec=True)
+@patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
+@patch.object(chaosazure.common.compute.command, "prepare", autospec=True)
+@patch.object(chaosazure.common.compute.command, "submit", autospec=True)
+@patch.object(chaosazure.common.compute.command, "run", autospec=True)
+def test_stress_cpu_async_execution(
+    mocked_command_run,
+    mocked_command_submit,
+    mocked_command_prepare,
+    init,
+    fetch,
+):
+    mocked_command_prepare.return_value = "RunShellScript", "cpu_stress_test.sh"
+    mocked_command_submit.return_value = {"run_command_name": "chaos-run"}
+    client = MagicMock()
+    init.return_value = client
+
+    fetch.return_value = [
+        machine_provider.provide_machine(),
+        machine_provider.provide_machine(),
+    ]
+
+    result = stress_cpu(
+        filter="where name=='some_linux_machine'",
+        duration=60,
+        timeout=60,
+        async_execution=True,
+        run_command_name="chaos-run",
+    )
+
+    assert mocked_command_run.call_count == 0
+    assert mocked_command_submit.call_count == 2
+    assert init.call_count == 1
+    args, kwargs = mocked_command_submit.call_args
+    assert args[2] == 120
+    assert args[4] == "chaos-run"
+    assert kwargs["client"] is client
+    resources = result["resources"]
+    assert resources[0]["run_command"]["run_command_name"] == "chaos-run"
+
+
+@patch("chaosazure.machine.actions.fetch_resources", autospec=True)
+@patch.object(chaosazure.common.compute.command, "prepare", autospec=True)
+@patch.object(chaosazure.common.compute.command, "run", autospec=True)
+def test_network_latency_on_interface_and_cidr(
+    mocked_command_run, mocked_command_prepare, fetch
+):
+    mocked_command_prepare.return_value = "RunShellScript", "network_latency.sh"
+    mocked_command_run.return_value = "Delayed packets on eth1: 42"
+    fetch.return_value = [machine_provider.provide_machine()]
+
+    result = network_latency(
+        filter="where name=='some_linux_machine'",
+        interface="eth1",
+        cidr="10.0.0.0/16",
+    )
+
+    parameters = mocked_command_run.call_args[0][3]["parameters"]
+    assert {"name": "interface", "value": "eth1"} in parameters
+    assert {"name": "cidr", "value": "10.0.0.0/16"} in parameters
+    output = result["resources"][0]["output"]
+    assert output == "Delayed packets on eth1: 42"
+
+
+@patch("chaosazure.machine.actions.__fetch_machines", autospec=True)
+@patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
+def test_start_machines_stopped_from_inventory(init, fetch, tmp_path):
+    client = MagicMock()
+    init.return_value = client
+    configuration = {"azure_inventory_path": str(tmp_path / "inv.jsonl")}
+    alpha = dict(MACHINE_ALPHA, id="/vm/alpha", type=RES_TYPE_VM)
+    beta = dict(MACHINE_BETA, id="/vm/beta", type=RES_TYPE_VM)
+    fetch.return_value = [alpha, beta]
+
+    stop_machines("where name startswith 'VirtualMachine'", configuration)
+
+    fetch.reset_mock()
+    result = start_machines(configuration=configuration, from_inventory=True)
+
+    fetch.assert_not_called()
+    client.virtual_machines.instance_view.assert_not_called()
+    assert client.virtual_machines.begin_start.call_count == 2
+    assert [r["name"] for r in result["resources"]] == [
+        "VirtualMachineAlpha",
+        "VirtualMachineBeta",
+    ]
+
+
+@patch("chaosazure.machine.actions.__fetch_machines", autospec=True)
+@patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
+def test_stopped_machines_are_recorded_as_they_stop(init, fetch, tmp_path):
+    client = MagicMock()
+    init.return_value = client
+    path = str(tmp_path / "inv.jsonl")
+    alpha = dict(MACHINE_ALPHA, id="/vm/alpha", type=RES_TYPE_VM)
+    beta = dict(MACHINE_BETA, id="/vm/beta", type=RES_TYPE_VM)
+    fetch.return_value = [alpha, beta]
+    previous = {"azure_inventory_path": path, "azure_inventory_run": "old"}
+    stop_machines(None, previous)
+    configuration = {"azure_inventory_path": path, "azure_inventory_run": "new"}
+    fetch.return_value = [beta, alpha]
+    client.virtual_machines.begin_power_off.side_effect = [
+        MagicMock(),
+        ValueError("boom"),
+    ]
+
+    with pytest.raises(FailedActivity):
+        stop_machines(None, configuration)
+    client.virtual_machines.begin_power_off.side_effect = None
+    result = start_machines(configuration=configuration, from_inventory=True)
+
+    # only the machine this run stopped before failing is started again
+    assert [r["name"] for r in result["resources"]] == ["VirtualMachineBeta"]
+
+
+@patch("chaosazure.common.schedule.time", autospec=True)
+@patch("chaosazure.machine.actions.__fetch_machines", autospec=True)
+@patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
+def test_restart_machines_on_schedule(init, fetch, time):
+    client = MagicMock()
+    init.return_value = client
+    fetch.return_value = [MACHINE_ALPHA, MACHINE_BETA]
+    time.monotonic.return_value = 100.0
+
+    restart_machines(
+        None, CONFIG, SECRETS, schedule={"strategy": "rate", "per_second": 4}
+    )
+
+    assert client.virtual_machines.begin_restart.call_count == 2
+    time.sleep.assert_called_once_with(0.25)
@@ -1,6 +1,14 @@
 from unittest.mock import patch
 
-from chaosazure.machine.probes import count_machines, describe_machines
+import pytest
+from chaoslib.exceptions import FailedActivity
+
+from chaosazure.machine.probes import (
+    count_machines,
+    count_machines_by_power_state,
+    describe_machines,
+    describe_run_commands,
+)
 
 resource = {"name": "chaos-machine", "resourceGroup": "rg"}
 
@@ -15,7 +23,7 @@ def test_count_machines(fetch):
     assert count == 1
 
 
-@patch("chaosazure.machine.probes.fetch_resources", autospec=True)
+@patch("chaosazure.machine.probes.iter_resources", autospec=True)
 def test_describe_machines(fetch):
     resource_list = [resource]
     fetch.return_value = resource_list
@@ -24,3 +32,59 @@ def test_describe_machines(fetch):
 
     assert description[0]["name"] == resource["name"]
     assert description[0]["resourceGroup"] == resource["resourceGroup"]
+
+
+@patch("chaosazure.machine.probes.fetch_resources", autospec=True)
+@patch("chaosazure.machine.probes.command.poll", autospec=True)
+def test_describe_run_commands(poll, fetch):
+    fetch.return_value = [resource]
+    poll.return_value = [
+        {"vm_name": "chaos-machine", "execution_state": "Succeeded"}
+    ]
+
+    results = describe_run_commands(None, "chaos-run", 0, 1, None, None)
+
+    runs = poll.call_args[0][0]
+    assert runs[0]["vm_name"] == "chaos-machine"
+    assert runs[0]["run_command_name"] == "chaos-run"
+    assert results[0]["execution_state"] == "Succeeded"
+
+
+@patch("chaosazure.machine.probes.query_resources", autospec=True)
+def test_count_machines_by_power_state(query):
+    query.return_value = [
+        {"powerState": "running", "zone": "1", "count": 3},
+        {"powerState": "running", "zone": "2", "count": 2},
+        {"powerState": "deallocated", "zone": "", "count": 1},
+        {"powerState": None, "zone": "1", "count": 1},
+    ]
+
+    counts = count_machines_by_power_state("where resourceGroup=='rg'")
+
+    assert counts["total"] == 7
+    assert counts["states"] == {"running": 5, "deallocated": 1, "": 1}
+    assert counts["groups"][3] == {"powerState": "", "zone": "1", "count": 1}
+    text = query.call_args[0][0]
+    assert text == (
+        "Resources\n"
+        "| where type =~ 'microsoft.compute/virtualmachines'\n"
+        "| where resourceGroup=='rg'\n"
+        "| extend powerState = tostring(split(tostring("
+        "properties.extended.instanceView.powerState.code), '/')[1])\n"
+        "| extend zone = tostring(zones[0])\n"
+        "| summarize count=count() by powerState, zone"
+    )
+
+
+@patch("chaosazure.machine.probes.query_resources", autospec=True)
+def test_count_machines_by_power_state_and_resource_group(query):
+    query.return_value = []
+
+    counts = count_machines_by_power_state(None, ["resource_group"])
+
+    assert counts == {"total": 0, "states": {}, "groups": []}
+    assert query.call_args[0][0].endswith(
+        "| summarize count=count() by powerState, resourceGroup"
+    )
+    with pytest.raises(FailedActivity):
+        count_machines_by_power_state(None, ["fault_domain"])
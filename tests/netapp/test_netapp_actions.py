@@ -92,3 +92,53 @@ def test_delete_netapp_volume_with_no_netapp_volumes(fetch):
         delete_netapp_volumes(None, None, None)
 
     assert "No Netapp volumes found" in str(x.value)
+
+
+@patch("chaosazure.netapp.actions.__fetch_netapp_volumes", autospec=True)
+@patch("chaosazure.netapp.actions.__netapp_mgmt_client", autospec=True)
+def test_delete_netapp_volumes_and_wait(init, fetch):
+    client = MagicMock()
+    init.return_value = client
+
+    def begin_delete(group, account_name, pool_name, volume_name):
+        poller = MagicMock()
+        poller.done.return_value = volume_name == "NetAppVolumeAlpha"
+        return poller
+
+    client.volumes.begin_delete.side_effect = begin_delete
+
+    alpha = dict(NETAPP_VOLUME_ALPHA)
+    alpha["id"] = (
+        "/subscriptions/sub/resourceGroups/group/providers/Microsoft.NetApp/"
+        "netAppAccounts/NetAppAccount/capacityPools/NetAppPoolName/"
+        "volumes/NetAppVolumeAlpha"
+    )
+    fetch.return_value = [alpha, dict(NETAPP_VOLUME_BETA)]
+
+    result = delete_netapp_volumes(None, CONFIG, SECRETS, wait_timeout=1)
+
+    client.volumes.begin_delete.assert_any_call(
+        "group", "NetAppAccount", "NetAppPoolName", "NetAppVolumeAlpha"
+    )
+    outcomes = {r["name"]: r["outcome"] for r in result["resources"]}
+    assert outcomes == {
+        NETAPP_VOLUME_ALPHA["name"]: "deleted",
+        NETAPP_VOLUME_BETA["name"]: "deleting",
+    }
+
+
+@patch("chaosazure.netapp.actions.__fetch_netapp_volumes", autospec=True)
+@patch("chaosazure.netapp.actions.__netapp_mgmt_client", autospec=True)
+def test_delete_netapp_volumes_with_invalid_identifier(init, fetch):
+    client = MagicMock()
+    init.return_value = client
+    alpha = dict(NETAPP_VOLUME_ALPHA)
+    alpha["id"] = "/subscriptions/sub/resourceGroups/group"
+    fetch.return_value = [alpha]
+
+    result = delete_netapp_volumes(None, CONFIG, SECRETS)
+
+    client.volumes.begin_delete.assert_not_called()
+    record = result["resources"][0]
+    assert record["outcome"] == "failed"
+    assert "Invalid NetApp volume identifier" in record["error"]
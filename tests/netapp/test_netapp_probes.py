@@ -28,7 +28,7 @@ def test_count_netapp_volumes(fetch):
     assert count == 2
 
 
-@patch("chaosazure.netapp.probes.fetch_resources", autospec=True)
+@patch("chaosazure.netapp.probes.iter_resources", autospec=True)
 def test_describe_netapp_volumes(fetch):
     resource_list = [NETAPP_VOLUME_ALPHA]
     fetch.return_value = resource_list
@@ -43,7 +43,7 @@ def test_delete_one_server(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_delete.call_count == 1
 
 
@@ -59,7 +59,7 @@ def test_delete_one_server_china(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_servers(f, CONFIG, SECRETS_CHINA)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA)
+    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA, None, None, None)
     assert client.servers.begin_delete.call_count == 1
 
 
@@ -75,7 +75,7 @@ def test_delete_two_servers(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     delete_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_delete.call_count == 2
 
 
@@ -101,7 +101,7 @@ def test_restart_one_server(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     restart_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_restart.call_count == 1
 
 
@@ -117,7 +117,7 @@ def test_restart_two_server(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     restart_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_restart.call_count == 2
 
 
@@ -60,7 +60,7 @@ def test_delete_one_server(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_delete.call_count == 1
 
 
@@ -79,7 +79,7 @@ def test_delete_one_server_china(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     delete_servers(f, CONFIG, SECRETS_CHINA)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA)
+    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA, None, None, None)
     assert client.servers.begin_delete.call_count == 1
 
 
@@ -98,7 +98,7 @@ def test_delete_two_servers(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     delete_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_delete.call_count == 2
 
 
@@ -137,7 +137,7 @@ def test_stop_one_server(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     stop_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_stop.call_count == 1
 
 
@@ -156,7 +156,7 @@ def test_stop_two_servers(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     stop_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_stop.call_count == 2
 
 
@@ -175,7 +175,7 @@ def test_restart_one_server(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 1"
     restart_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_restart.call_count == 1
 
 
@@ -194,7 +194,7 @@ def test_restart_two_server(init, fetch):
     f = "where resourceGroup=='myresourcegroup' | sample 2"
     restart_servers(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.servers.begin_restart.call_count == 2
 
 
@@ -430,3 +430,71 @@ def test_delete_tables_existing_table(
     assert (
         conn.run.call_args_list[2][0][0] == f"DROP TABLE {table_name} CASCADE"
     )
+
+
+@patch(
+    "chaosazure.postgresql_flexible.actions.ClientSecretCredential",
+    autospec=True,
+)
+@patch("chaosazure.postgresql_flexible.actions.__fetch_servers", autospec=True)
+@patch(
+    "chaosazure.postgresql_flexible.actions.__postgresql_flexible_mgmt_client",
+    autospec=True,
+)
+@patch("chaosazure.postgresql_flexible.actions.SecretClient", autospec=True)
+@patch(
+    "chaosazure.postgresql_flexible.actions.pg8000.native.Connection",
+    autospec=True,
+)
+def test_delete_tables_reports_deleted_tables_along_with_failures(
+    connect_mock: MagicMock,
+    secret_client_mock,
+    init_mock,
+    fetch_servers_mock,
+    ClientSecretCredential_mock,
+):
+    client_mock = MagicMock()
+    init_mock.return_value = client_mock
+    fetch_servers_mock.return_value = [SERVER_ALPHA]
+
+    secret_client_mock.return_value = MagicMock(
+        get_secret=MagicMock(return_value=MagicMock(value="secret_value"))
+    )
+
+    first_db = MagicMock()
+    first_db.name = "first"
+    second_db = MagicMock()
+    second_db.name = "second"
+    client_mock.databases.list_by_server.return_value = [first_db, second_db]
+
+    # the first database is unreachable, the table of the second is dropped
+    conn = MagicMock()
+    conn.run.side_effect = [None, [True], None, None]
+    connect_mock.side_effect = [Exception("unreachable"), conn]
+
+    result = delete_tables(
+        "where resourceGroup=='myresourcegroup'",
+        "existing_table",
+        None,
+        CONFIG,
+        SECRETS["azure"],
+        "key_vault_url",
+    )
+
+    assert len(result["resources"]) == 1
+    assert result["failures"] == ["ServerAlpha/first: unreachable"]
+    conn.run.assert_any_call("DROP TABLE existing_table CASCADE")
+
+    # nothing deleted at all fails the activity
+    client_mock.databases.list_by_server.return_value = [first_db]
+    connect_mock.side_effect = [Exception("unreachable")]
+    with pytest.raises(FailedActivity) as x:
+        delete_tables(
+            "where resourceGroup=='myresourcegroup'",
+            "existing_table",
+            None,
+            CONFIG,
+            SECRETS["azure"],
+            "key_vault_url",
+        )
+    assert "ServerAlpha/first: unreachable" in str(x.value)
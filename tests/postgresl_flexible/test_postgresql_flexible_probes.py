@@ -23,7 +23,7 @@ def test_count_servers(fetch):
     assert count == 1
 
 
-@patch("chaosazure.postgresql_flexible.probes.fetch_resources", autospec=True)
+@patch("chaosazure.postgresql_flexible.probes.iter_resources", autospec=True)
 def test_describe_servers(fetch):
     resource_list = [resource]
     fetch.return_value = resource_list
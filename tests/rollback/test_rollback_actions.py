@@ -0,0 +1,159 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+from chaoslib.exceptions import FailedActivity
+
+from chaosazure.machine.actions import delete_machines
+from chaosazure.rollback.actions import rollback_resources
+
+CONFIG = {"azure_subscription_id": "X", "azure_max_concurrency": 4}
+
+SECRETS = {"client_id": "X", "client_secret": "X", "tenant_id": "X"}
+
+
+def provide_records():
+    return {
+        "resources": [
+            {
+                "name": "vm",
+                "resourceGroup": "rg",
+                "type": "microsoft.compute/virtualmachines",
+            },
+            {
+                "name": "pool-vmss",
+                "resourceGroup": "rg",
+                "type": "Microsoft.Compute/virtualMachineScaleSets",
+                "virtualMachines": [
+                    {"name": "pool-vmss_0", "instance_id": "0"},
+                    {"name": "pool-vmss_1", "instance_id": "1"},
+                ],
+            },
+            {
+                "cluster": "aks",
+                "resourceGroup": "rg",
+                "pool": "nodepool1",
+                "nodes": [
+                    {
+                        "name": "aks-nodepool1-vmss_3",
+                        "resourceGroup": "mc_rg",
+                        "scale_set": "aks-nodepool1-vmss",
+                        "instance_id": "3",
+                    }
+                ],
+            },
+            {
+                "name": "aks-nodepool1-vmss_4",
+                "resourceGroup": "mc_rg",
+                "type": "microsoft.compute/virtualmachinescalesets/"
+                "virtualmachines",
+                "scale_set": "aks-nodepool1-vmss",
+                "instance_id": "4",
+            },
+            {
+                "name": "app",
+                "resourceGroup": "rg",
+                "type": "microsoft.web/sites",
+                "slot": "staging",
+            },
+            {
+                "name": "pg",
+                "resourceGroup": "rg",
+                "type": "microsoft.dbforpostgresql/flexibleservers",
+            },
+            {"name": "volume", "type": "microsoft.netapp/volumes"},
+        ]
+    }
+
+
+@patch("chaosazure.rollback.actions.init_postgresql_flexible_management_client")
+@patch("chaosazure.rollback.actions.init_website_management_client")
+@patch("chaosazure.rollback.actions.init_compute_management_client")
+def test_rollback_resources(compute, website, postgresql):
+    for init in (compute, website, postgresql):
+        init.return_value = MagicMock()
+
+    result = rollback_resources(provide_records(), 10, 3, CONFIG, SECRETS)
+
+    compute.assert_called_once()
+    client = compute.return_value
+    client.virtual_machines.begin_start.assert_called_once_with("rg", "vm")
+    scale_sets = client.virtual_machine_scale_sets.begin_start
+    assert scale_sets.call_count == 2
+    ids = {c[0][1]: c[0][2].instance_ids for c in scale_sets.call_args_list}
+    assert ids == {"pool-vmss": ["0", "1"], "aks-nodepool1-vmss": ["3", "4"]}
+    website.return_value.web_apps.start_slot.assert_called_once_with(
+        "rg", "app", "staging"
+    )
+    postgresql.return_value.servers.begin_start.assert_called_once_with(
+        "rg", "pg"
+    )
+
+    outcomes = sorted((r["name"], r["outcome"]) for r in result["resources"])
+    assert outcomes == [
+        ("aks-nodepool1-vmss", "restored"),
+        ("app", "restored"),
+        ("pg", "restored"),
+        ("pool-vmss", "restored"),
+        ("vm", "restored"),
+        ("volume", "skipped"),
+    ]
+
+
+@patch("chaosazure.common.submission.time.sleep")
+@patch("chaosazure.rollback.actions.init_compute_management_client")
+def test_rollback_retries_then_fails(compute, sleep):
+    client = MagicMock()
+    compute.return_value = client
+    error = HttpResponseError("busy")
+    error.status_code = 503
+    client.virtual_machines.begin_start.side_effect = error
+    records = provide_records()["resources"][:1]
+
+    result = rollback_resources(records, 10, 3, CONFIG, SECRETS)
+
+    (record,) = result["resources"]
+    assert record["outcome"] == "failed"
+    assert record["attempts"] == 3
+    assert record["error"] == "busy"
+    assert sleep.call_count == 2
+
+
+@patch("chaosazure.rollback.actions.init_compute_management_client")
+def test_rollback_reports_timeout(compute):
+    client = MagicMock()
+    compute.return_value = client
+    client.virtual_machines.begin_start.return_value.done.return_value = False
+    records = provide_records()["resources"][:1]
+
+    result = rollback_resources(records, 1, 1, CONFIG, SECRETS)
+
+    (record,) = result["resources"]
+    assert record["outcome"] == "timeout"
+
+
+def test_rollback_without_records():
+    with pytest.raises(FailedActivity):
+        rollback_resources({"resources": []})
+
+
+@patch("chaosazure.machine.actions.__fetch_machines", autospec=True)
+@patch("chaosazure.machine.actions.__compute_mgmt_client", autospec=True)
+@patch("chaosazure.rollback.actions.init_compute_management_client")
+def test_rollback_skips_deleted_resources(compute, init, fetch):
+    init.return_value = MagicMock()
+    fetch.return_value = [
+        {
+            "name": "vm",
+            "resourceGroup": "rg",
+            "type": "microsoft.compute/virtualmachines",
+        }
+    ]
+    records = delete_machines(None, CONFIG, SECRETS)
+
+    result = rollback_resources(records, 10, 3, CONFIG, SECRETS)
+
+    compute.assert_not_called()
+    (record,) = result["resources"]
+    assert record["outcome"] == "skipped"
+    assert record["reason"] == "deleted"
@@ -58,7 +58,7 @@ def test_delete_one_storage_account(init, fetch):
     f = "where resourceGroup=='group' | sample 1"
     delete_storage_accounts(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.storage_accounts.delete.call_count == 1
 
 
@@ -74,7 +74,7 @@ def test_delete_one_storage_account_china(init, fetch):
     f = "where resourceGroup=='group'"
     delete_storage_accounts(f, CONFIG, SECRETS_CHINA)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA)
+    fetch.assert_called_with(f, CONFIG, SECRETS_CHINA, None, None, None)
     assert client.storage_accounts.delete.call_count == 1
 
 
@@ -90,7 +90,7 @@ def test_delete_two_storage_accounts(init, fetch):
     f = "where resourceGroup=='group' | sample 2"
     delete_storage_accounts(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, None, None, None)
     assert client.storage_accounts.delete.call_count == 2
 
 
@@ -154,3 +154,29 @@ def test_delete_blob_container_with_no_blob_containers(init, fetch):
 
         fetch.assert_called_with(f, CONFIG, SECRETS)
     assert "No blob containers to target found" in str(x.value)
+
+
+@patch("chaosazure.storage.actions.__fetch_storage_accounts", autospec=True)
+@patch("chaosazure.storage.actions.__storage_mgmt_client", autospec=True)
+def test_delete_containers_across_accounts_records_outcome(init, fetch):
+    client = MagicMock()
+    init.return_value = client
+    client.blob_containers.list.return_value = BLOB_CONTAINERS
+
+    def delete(group, storage_name, container_name):
+        if storage_name == STORAGE_ACCOUNT_BETA["name"]:
+            raise ValueError("locked")
+
+    client.blob_containers.delete.side_effect = delete
+
+    fetch.return_value = [STORAGE_ACCOUNT_ALPHA, STORAGE_ACCOUNT_BETA]
+
+    result = delete_blob_containers(
+        None, "alpha$", None, {"azure_max_concurrency": 2}, SECRETS
+    )
+
+    records = sorted(result["resources"], key=lambda r: r["storage_name"])
+    assert client.blob_containers.list.call_count == 2
+    assert [r["outcome"] for r in records] == ["deleted", "failed"]
+    assert records[1]["error"] == "terminal error after 0 retries: locked"
+    assert all(r["latency"] >= 0 for r in records)
@@ -1,12 +1,15 @@
 from unittest.mock import MagicMock, patch
 
+import pytest
+from azure.core.exceptions import HttpResponseError
+from chaoslib.exceptions import FailedActivity
 
 from chaosazure.storage.probes import (
     count_storage_accounts,
     describe_storage_accounts,
     count_blob_containers,
+    count_blob_containers_per_account,
 )
-from azure.mgmt.storage.v2022_09_01.models import ListContainerItem
 
 STORAGE_ACCOUNT_ALPHA = {
     "name": "chaos-storageaccount-alpha",
@@ -18,12 +21,6 @@ STORAGE_ACCOUNT_BETA = {
     "resourceGroup": "group",
 }
 
-container_resource_alpha = ListContainerItem()
-container_resource_alpha.name = "chaos-blobcontainer-alpha"
-container_resource_beta = ListContainerItem()
-container_resource_beta.name = "chaos-blobcontainer-beta"
-BLOB_CONTAINERS = [container_resource_alpha, container_resource_beta]
-
 CONFIG = {"azure": {"subscription_id": "***REMOVED***"}}
 
 SECRETS = {
@@ -43,7 +40,7 @@ def test_count_storage_accounts(fetch):
     assert count == 2
 
 
-@patch("chaosazure.storage.probes.fetch_resources", autospec=True)
+@patch("chaosazure.storage.probes.iter_resources", autospec=True)
 def test_describe_storage_accounts(fetch):
     resource_list = [STORAGE_ACCOUNT_ALPHA, STORAGE_ACCOUNT_BETA]
     fetch.return_value = resource_list
@@ -54,17 +51,79 @@ def test_describe_storage_accounts(fetch):
     assert description[0]["resourceGroup"] == resource_list[0]["resourceGroup"]
 
 
+def provide_pipeline(pages):
+    """
+    Storage client whose pipeline serves, for each account name, its raw
+    pages of containers.
+    """
+    client = MagicMock()
+    client._config.subscription_id = "sub"
+    client._client.format_url.side_effect = lambda p: "https://arm" + p
+
+    def send_request(request):
+        name = request.url.split("/storageAccounts/")[1].split("/")[0]
+        if name not in pages:
+            raise HttpResponseError("forbidden")
+        response = MagicMock()
+        response.json.return_value = pages[name].pop(0)
+        return response
+
+    client._client.send_request.side_effect = send_request
+    return client
+
+
 @patch("chaosazure.storage.probes.fetch_resources", autospec=True)
 @patch("chaosazure.storage.probes.__storage_mgmt_client", autospec=True)
 def test_count_containers(init, fetch):
-    client = MagicMock()
+    next_link = (
+        "https://arm/subscriptions/sub/resourceGroups/group/providers/"
+        "Microsoft.Storage/storageAccounts/{}/blobServices/default/"
+        "containers?api-version=2022-09-01&$skipToken=x"
+    ).format(STORAGE_ACCOUNT_ALPHA["name"])
+    client = provide_pipeline(
+        {
+            STORAGE_ACCOUNT_ALPHA["name"]: [
+                {"value": [{"name": "a"}], "nextLink": next_link},
+                {"value": [{"name": "b"}]},
+            ]
+        }
+    )
     init.return_value = client
 
-    client.blob_containers.list.return_value = BLOB_CONTAINERS
-
     storage_accounts = [STORAGE_ACCOUNT_ALPHA]
     fetch.return_value = storage_accounts
 
     count = count_blob_containers(None, None)
 
     assert count == 2
+    first, second = client._client.send_request.call_args_list
+    assert "maxpagesize=5000" in first[0][0].url
+    assert "include" not in first[0][0].url
+    assert second[0][0].url == next_link
+
+
+@patch("chaosazure.storage.probes.fetch_resources", autospec=True)
+@patch("chaosazure.storage.probes.__storage_mgmt_client", autospec=True)
+def test_count_containers_per_account(init, fetch):
+    init.return_value = provide_pipeline(
+        {STORAGE_ACCOUNT_ALPHA["name"]: [{"value": [{}, {}, {}]}]}
+    )
+    fetch.return_value = [STORAGE_ACCOUNT_BETA, STORAGE_ACCOUNT_ALPHA]
+
+    result = count_blob_containers_per_account(None, None)
+
+    assert result["total"] == 3
+    alpha, beta = result["storage_accounts"]
+    assert alpha["count"] == 3
+    assert beta["count"] is None
+    assert "forbidden" in beta["error"]
+
+
+@patch("chaosazure.storage.probes.fetch_resources", autospec=True)
+@patch("chaosazure.storage.probes.__storage_mgmt_client", autospec=True)
+def test_count_containers_fails_when_an_account_cannot_be_counted(init, fetch):
+    init.return_value = provide_pipeline({})
+    fetch.return_value = [STORAGE_ACCOUNT_ALPHA]
+
+    with pytest.raises(FailedActivity):
+        count_blob_containers(None, None)
@@ -63,6 +63,33 @@ def test_restart_vmss(client, fetch_instances, fetch_vmss):
     restart_vmss(None, None, None)
 
 
+@patch("chaosazure.vmss.actions.fetch_vmss", autospec=True)
+@patch("chaosazure.vmss.actions.fetch_all_instances", autospec=True)
+@patch("chaosazure.vmss.actions.init_compute_management_client", autospec=True)
+def test_restart_vmss_one_instance_per_zone(
+    client, fetch_all_instances, fetch_vmss
+):
+    fetch_vmss.return_value = [vmss_provider.provide_scale_set()]
+    instances = []
+    for i in range(6):
+        instance = vmss_provider.provide_instance()
+        instance["name"] = "chaos-pool_{}".format(i)
+        instance["instance_id"] = str(i)
+        instance["zones"] = [str(i % 3 + 1)]
+        instances.append(instance)
+    fetch_all_instances.return_value = instances
+
+    client.return_value = MockComputeManagementClient()
+
+    result = restart_vmss(
+        selection={"strategy": "one-per-group", "group_by": "zone", "seed": 1}
+    )
+
+    restarted = result["resources"][0]["virtualMachines"]
+    assert len(restarted) == 3
+    fetch_all_instances.assert_called_once()
+
+
 @patch("chaosazure.vmss.actions.fetch_vmss", autospec=True)
 @patch("chaosazure.vmss.actions.fetch_instances", autospec=True)
 @patch("chaosazure.vmss.actions.init_compute_management_client", autospec=True)
@@ -148,6 +175,7 @@ def test_stress_cpu(
             "script": ["cpu_stress_test.sh"],
             "parameters": [
                 {"name": "duration", "value": 60},
+                {"name": "load", "value": 100},
             ],
         },
         secrets,
@@ -250,7 +278,12 @@ def test_burn_io(
         {
             "command_id": "RunShellScript",
             "script": ["burn_io.sh"],
-            "parameters": [{"name": "duration", "value": 60}],
+            "parameters": [
+                {"name": "duration", "value": 60},
+                {"name": "block_size", "value": "32K"},
+                {"name": "queue_depth", "value": 1},
+                {"name": "direct", "value": 0},
+            ],
         },
         secrets,
         config,
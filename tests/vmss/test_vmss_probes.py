@@ -1,6 +1,9 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
-from chaosazure.vmss.probes import count_instances
+import pytest
+from chaoslib.exceptions import FailedActivity
+
+from chaosazure.vmss.probes import count_instances, count_instances_by_state
 
 resource = {"name": "vmss_instance_0", "resourceGroup": "group"}
 
@@ -12,3 +15,85 @@ def test_count_instances(fetch):
     count = count_instances(None, None)
 
     assert count == 1
+
+
+@patch("chaosazure.vmss.probes.query_resources", autospec=True)
+def test_count_instances_by_state_from_graph(query):
+    query.return_value = [
+        {
+            "scaleSet": "ss",
+            "powerState": "running",
+            "provisioningState": "succeeded",
+            "health": "healthy",
+            "zone": "1",
+            "count": 3,
+        },
+        {
+            "scaleSet": "ss",
+            "powerState": "deallocated",
+            "provisioningState": "succeeded",
+            "health": None,
+            "zone": "2",
+            "count": 1,
+        },
+    ]
+
+    counts = count_instances_by_state("where name=='ss'")
+
+    statement = query.call_args[0][0].lower()
+    assert "where name=='ss'" in statement
+    assert "microsoft.compute/virtualmachinescalesets/virtualmachines" in (
+        statement
+    )
+    assert counts["total"] == 4
+    assert counts["power_states"] == {"running": 3, "deallocated": 1}
+    assert counts["provisioning_states"] == {"succeeded": 4}
+    assert counts["health_states"] == {"healthy": 3, "": 1}
+    assert counts["zones"] == {"1": 3, "2": 1}
+    assert counts["groups"][1]["health"] == ""
+
+
+@patch("chaosazure.vmss.probes.init_compute_management_client", autospec=True)
+@patch("chaosazure.vmss.probes.fetch_vmss", autospec=True)
+def test_count_instances_by_state_from_compute(fetch, init):
+    fetch.return_value = [resource]
+    instance = MagicMock()
+    # the selected payload leaves the provisioning state to the statuses
+    instance.as_dict.return_value = {
+        "zones": ["3"],
+        "instance_view": {
+            "statuses": [
+                {"code": "ProvisioningState/succeeded"},
+                {"code": "PowerState/running"},
+            ],
+            "vm_health": {"status": {"code": "HealthState/unhealthy"}},
+        },
+    }
+    client = init.return_value
+    client.virtual_machine_scale_set_vms.list.return_value = [
+        instance,
+        instance,
+    ]
+
+    counts = count_instances_by_state(source="compute")
+
+    client.virtual_machine_scale_set_vms.list.assert_called_once_with(
+        "group",
+        "vmss_instance_0",
+        expand="instanceView",
+        select="instanceView",
+    )
+    assert counts["total"] == 2
+    assert counts["groups"] == [
+        {
+            "scaleSet": "vmss_instance_0",
+            "powerState": "running",
+            "provisioningState": "succeeded",
+            "health": "unhealthy",
+            "zone": "3",
+            "count": 2,
+        }
+    ]
+
+    with pytest.raises(FailedActivity):
+        count_instances_by_state(source="cache")
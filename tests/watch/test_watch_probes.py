@@ -0,0 +1,104 @@
+from unittest.mock import patch
+
+import pytest
+from chaoslib.exceptions import FailedActivity
+
+from chaosazure import init_resource_graph_client
+from chaosazure.common.session import session
+from chaosazure.watch.probes import watch_states
+
+CONFIG = {"azure_subscription_id": "X"}
+
+
+class Clock:
+    def __init__(self, latency=0.0):
+        self.now = 0.0
+        self.latency = latency
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1000.0 + self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def counts(*values):
+    # each query takes the latency of the clock
+    def query(statement, secrets, configuration):
+        clock.now += clock.latency
+        return [{"state": "ready", "count": next(values)}]
+
+    values = iter(values)
+    clock = Clock()
+    return clock, query
+
+
+@patch("chaosazure.watch.probes.query_resources", autospec=True)
+def test_watch_samples_at_each_interval(query):
+    clock, query.side_effect = counts(3, 2, 2, 3)
+
+    with patch("chaosazure.watch.probes.time", clock):
+        result = watch_states(
+            "postgresql_flexible_server_states",
+            state="ready",
+            interval=1,
+            duration=3,
+            configuration=CONFIG,
+        )
+
+    statement = query.call_args[0][0]
+    assert "flexibleservers" in statement.lower()
+    assert "summarize count=count() by state" in statement
+    assert result["samples"] == [
+        [1000.0, 3],
+        [1001.0, 2],
+        [1002.0, 2],
+        [1003.0, 3],
+    ]
+    assert result["states"] == {"ready": 3}
+    assert result["reached"] is False
+
+
+@patch("chaosazure.watch.probes.query_resources", autospec=True)
+def test_watch_stops_once_the_threshold_is_reached(query):
+    clock, query.side_effect = counts(0, 1, 3, 3)
+    clock.latency = 1.5
+
+    with patch("chaosazure.watch.probes.time", clock):
+        result = watch_states(
+            "application_gateway_operational_states",
+            interval=1,
+            duration=60,
+            until_at_least=3,
+            configuration=CONFIG,
+        )
+
+    # samples outlasting the interval start on the next one
+    assert result["samples"] == [[1000.0, 0], [1002.0, 1], [1004.0, 3]]
+    assert result["reached"] is True
+
+
+def test_watch_rejects_unknown_metrics():
+    with pytest.raises(FailedActivity):
+        watch_states("disk_states")
+    with pytest.raises(FailedActivity):
+        watch_states("machine_power_states", interval=0.5)
+
+
+@patch("chaosazure.ResourceGraphClient", autospec=True)
+@patch("chaosazure.auth", autospec=True)
+def test_session_reuses_clients(auth, client):
+    secrets = {"client_id": "X", "client_secret": "X", "tenant_id": "X"}
+
+    with session():
+        first = init_resource_graph_client(secrets, CONFIG)
+        assert init_resource_graph_client(secrets, CONFIG) is first
+        assert client.call_count == 1
+        init_resource_graph_client(secrets, {})
+        assert client.call_count == 2
+
+    init_resource_graph_client(secrets, CONFIG)
+    assert client.call_count == 3
@@ -5,6 +5,8 @@ from chaosazure.webapp.actions import (
     restart_webapp,
     start_webapp,
     delete_webapp,
+    restart_webapps,
+    stop_webapps,
 )
 
 CONFIG = {"azure": {"subscription_id": "X"}}
@@ -27,7 +29,7 @@ def test_stop_webapp(init, fetch):
     f = "where resourceGroup=~'rg'"
     stop_webapp(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, count=1)
     client.web_apps.stop.assert_called_with(
         resource["resourceGroup"], resource["name"]
     )
@@ -46,7 +48,7 @@ def test_restart_webapp(init, fetch):
     f = "where resourceGroup=~'rg'"
     restart_webapp(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, count=1)
     client.web_apps.restart.assert_called_with(
         resource["resourceGroup"], resource["name"]
     )
@@ -65,7 +67,7 @@ def test_start_webapp(init, fetch):
     f = "where resourceGroup=~'rg'"
     start_webapp(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, count=1)
     client.web_apps.start.assert_called_with(
         resource["resourceGroup"], resource["name"]
     )
@@ -84,7 +86,56 @@ def test_delete_webapp(init, fetch):
     f = "where resourceGroup=~'rg'"
     delete_webapp(f, CONFIG, SECRETS)
 
-    fetch.assert_called_with(f, CONFIG, SECRETS)
+    fetch.assert_called_with(f, CONFIG, SECRETS, count=1)
     client.web_apps.delete.assert_called_with(
         resource["resourceGroup"], resource["name"]
     )
+
+
+def provide_webapps(count):
+    return [
+        {"name": "chaos-webapp-{}".format(i), "resourceGroup": "rg"}
+        for i in range(count)
+    ]
+
+
+@patch("chaosazure.webapp.actions.fetch_webapps", autospec=True)
+@patch(
+    "chaosazure.webapp.actions.init_website_management_client", autospec=True
+)
+def test_restart_webapps_slot_softly(init, fetch):
+    client = MagicMock()
+    init.return_value = client
+    fetch.return_value = provide_webapps(5)
+
+    result = restart_webapps(
+        None, slot="staging", soft_restart=True, configuration=CONFIG
+    )
+
+    init.assert_called_once()
+    assert client.web_apps.restart_slot.call_count == 5
+    client.web_apps.restart_slot.assert_any_call(
+        "rg", "chaos-webapp-0", "staging", soft_restart=True
+    )
+    records = result["resources"]
+    assert len(records) == 5
+    assert all(r["slot"] == "staging" for r in records)
+    assert all(r["outcome"] == "succeeded" for r in records)
+
+
+@patch("chaosazure.webapp.actions.fetch_webapps", autospec=True)
+@patch(
+    "chaosazure.webapp.actions.init_website_management_client", autospec=True
+)
+def test_stop_webapps_sample(init, fetch):
+    client = MagicMock()
+    init.return_value = client
+    client.web_apps.stop.side_effect = [None, ValueError("conflict")]
+    fetch.return_value = provide_webapps(2)
+
+    result = stop_webapps(None, count=2, configuration=CONFIG)
+
+    fetch.assert_called_with(None, CONFIG, None, 2, None, None)
+    assert client.web_apps.stop.call_count == 2
+    outcomes = sorted(r["outcome"] for r in result["resources"])
+    assert outcomes == ["failed", "succeeded"]
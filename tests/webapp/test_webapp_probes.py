@@ -22,7 +22,7 @@ def test_count_webapp(fetch):
     fetch.assert_called_with(f, RES_TYPE_WEBAPP, SECRETS, CONFIG)
 
 
-@patch("chaosazure.webapp.probes.fetch_resources", autospec=True)
+@patch("chaosazure.webapp.probes.iter_resources", autospec=True)
 def test_describe_webapp(fetch):
     resource_list = [resource]
     fetch.return_value = resource_list